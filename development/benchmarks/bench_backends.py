@@ -0,0 +1,63 @@
+"""Throughput comparison of the NumPy and CuPy backends.
+
+Runs a fixed number of iterations of ``pdlp_gpu``, ``SCSSolver`` and
+``linprog10`` on transportation problems from ``test_data`` and reports
+iterations per second for every backend available on this machine.
+
+Run from the development/ directory:
+    python -m benchmarks.bench_backends --sizes 50 100 200 --iters 200
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from pdlp_implementation.src.pdlp_solver import pdlp_gpu
+from scs_implementation.src.scs_solver import SCSSolver
+from test_data.generate_transportation import generate_transportation_problem
+from utils.backend import available_backends, get_backend
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..",
+                                "experiments", "gpu_scs_solver"))
+from scs import linprog10  # noqa: E402
+
+
+def time_solver(solver, problem, backend, iters, dtype):
+    """Return iterations per second for ``iters`` iterations of ``solver``."""
+    # Zero tolerances force exactly ``iters`` iterations; one check at the end.
+    tol = dict(eps_pri=0.0, eps_dual=0.0, eps_gap=0.0, tolcheck=iters)
+    if solver == "pdlp_gpu":
+        run = lambda: pdlp_gpu(**problem, max_itr=iters, dtype=dtype, backend=backend, **tol)
+    elif solver == "SCSSolver":
+        scs = SCSSolver(**problem, dtype=dtype, backend=backend)
+        run = lambda: scs.solve(max_itr=iters, **tol)
+    else:
+        run = lambda: linprog10(**problem, max_itr=iters, dtype=dtype, backend=backend, **tol)
+
+    run()  # warm-up (kernel compilation, allocator pools)
+    start = backend.timer()
+    run()
+    return iters / (backend.timer() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--iters", type=int, default=200)
+    parser.add_argument("--solvers", nargs="+", default=["pdlp_gpu", "SCSSolver", "linprog10"])
+    parser.add_argument("--dtype", default="float32")
+    args = parser.parse_args()
+
+    backends = [get_backend(name) for name in available_backends()]
+    print(f"{'solver':>10} {'m=n':>6} {'nnz':>9} " + " ".join(f"{b.name + ' it/s':>14}" for b in backends))
+    for size in args.sizes:
+        problem = generate_transportation_problem(size, size)
+        nnz = problem["A_ub"].nnz + problem["A_eq"].nnz
+        for solver in args.solvers:
+            rates = [time_solver(solver, problem, b, args.iters, np.dtype(args.dtype)) for b in backends]
+            print(f"{solver:>10} {size:6d} {nnz:9d} " + " ".join(f"{r:14.1f}" for r in rates))
+
+
+if __name__ == "__main__":
+    main()
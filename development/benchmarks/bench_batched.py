@@ -0,0 +1,55 @@
+"""Throughput (LPs/s) of one batched pdlp_gpu call against k separate calls.
+
+The k LPs share the constraint matrix of a transportation problem and differ
+in their cost vectors, so a batched call turns every SpMV into one SpMM.
+
+Run from the development/ directory:
+    python -m benchmarks.bench_batched --size 10 --batches 1 2 4 8 16 32 64
+"""
+import argparse
+
+import numpy as np
+
+from pdlp_implementation.src.pdlp_solver import pdlp_gpu
+from test_data.generate_transportation import generate_transportation_problem
+from utils.backend import get_backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--batches", type=int, nargs="+",
+                        default=[1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024])
+    parser.add_argument("--eps", type=float, default=1e-4)
+    parser.add_argument("--max-itr", type=int, default=100000)
+    parser.add_argument("--tolcheck", type=int, default=64)
+    parser.add_argument("--separate-limit", type=int, default=64,
+                        help="skip the one-call-per-LP baseline above this batch size")
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--dtype", default="float64")
+    args = parser.parse_args()
+    backend = get_backend(args.backend)
+    problem = generate_transportation_problem(args.size, args.size)
+    rng = np.random.default_rng(0)
+    options = dict(max_itr=args.max_itr, tolcheck=args.tolcheck, eps_pri=args.eps,
+                   eps_dual=args.eps, eps_gap=args.eps, dtype=np.dtype(args.dtype), backend=backend)
+
+    print(f"{'k':>6} {'batched LP/s':>13} {'separate LP/s':>14} {'speedup':>8}")
+    for k in args.batches:
+        C = problem["c"][:, None] * rng.uniform(0.5, 1.5, size=(problem["c"].shape[0], k))
+        start = backend.timer()
+        pdlp_gpu(**{**problem, "c": C}, **options)
+        batched = k / (backend.timer() - start)
+
+        if k > args.separate_limit:
+            print(f"{k:6d} {batched:13.2f} {'-':>14} {'-':>8}")
+            continue
+        start = backend.timer()
+        for j in range(k):
+            pdlp_gpu(**{**problem, "c": C[:, j]}, **options)
+        separate = k / (backend.timer() - start)
+        print(f"{k:6d} {batched:13.2f} {separate:14.2f} {batched / separate:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
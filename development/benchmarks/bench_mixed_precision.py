@@ -0,0 +1,54 @@
+"""float32 vs float64 vs mixed-precision PDLP at tight tolerances.
+
+Solves a transportation problem (nonnegativity as bounds) to ``--eps`` in
+all three modes and reports iterations, time, the float64-measured
+residuals and the objective error against HiGHS.
+
+Run from the development/ directory:
+    python -m benchmarks.bench_mixed_precision --size 40 --eps 1e-8 --mode pdlp
+"""
+import argparse
+
+import numpy as np
+import scipy.optimize
+
+from pdlp_implementation.src.pdlp_solver import pdlp_gpu
+from test_data.generate_transportation import generate_transportation_problem
+from utils.backend import get_backend
+from utils.bounds import singleton_rows_to_bounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=40)
+    parser.add_argument("--eps", type=float, default=1e-8)
+    parser.add_argument("--mode", default="pdlp", choices=["pdhg", "pdlp"])
+    parser.add_argument("--max-itr", type=int, default=50000)
+    parser.add_argument("--tolcheck", type=int, default=10)
+    parser.add_argument("--backend", default=None)
+    args = parser.parse_args()
+    backend = get_backend(args.backend)
+    problem = generate_transportation_problem(args.size, args.size)
+    A_ub, b_ub, lb, ub = singleton_rows_to_bounds(problem["A_ub"], problem["b_ub"])
+    problem = {**problem, "A_ub": A_ub, "b_ub": b_ub, "lb": lb, "ub": ub}
+    ref = scipy.optimize.linprog(problem["c"], A_ub, b_ub, problem["A_eq"], problem["b_eq"],
+                                 bounds=list(zip(lb, ub))).fun
+    options = dict(max_itr=args.max_itr, tolcheck=args.tolcheck, eps_pri=args.eps,
+                   eps_dual=args.eps, eps_gap=args.eps, backend=backend, mode=args.mode,
+                   full_output=True)
+
+    print(f"{'precision':>9} {'status':>16} {'iters':>7} {'s':>7} {'primal':>9} {'dual':>9} "
+          f"{'gap':>9} {'obj err':>9}")
+    for name, extra in (("float32", dict(dtype=np.float32)), ("float64", dict(dtype=np.float64)),
+                        ("mixed", dict(dtype=np.float32, mixed_precision=True))):
+        start = backend.timer()
+        x, info = pdlp_gpu(**problem, **options, **extra)
+        elapsed = backend.timer() - start
+        err = abs(float(problem["c"] @ backend.to_host(x)) - ref) / abs(ref)
+        print(f"{name:>9} {info['status']:>16} {info['iterations']:7d} {elapsed:7.3f} "
+              f"{info['primal_feas']:9.2e} {info['dual_feas']:9.2e} {info['dual_gap']:9.2e} "
+              f"{err:9.2e}")
+
+
+if __name__ == "__main__":
+    main()
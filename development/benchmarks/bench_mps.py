@@ -0,0 +1,68 @@
+"""MPS parse throughput in MB/s, and the load time of the binary cache.
+
+Writes a transportation problem of about ``--mb`` megabytes as free MPS
+(or uses ``--path``), then times ``read_mps`` without a cache, the first
+cached read (parse plus writing the problem file) and a cached read, which
+only memory-maps the problem file. Multi-gigabyte runs need a few times the
+problem size in memory for the generated instance.
+
+Run from the development/ directory:
+    python -m benchmarks.bench_mps --mb 2048
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from test_data.generate_transportation import generate_transportation_problem
+from utils.mps import read_mps, write_mps
+
+# Approximate bytes of free MPS per nonzero of a transportation problem
+BYTES_PER_NNZ = 35
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=64)
+    parser.add_argument("--path", default=None, help="existing MPS file to parse instead")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.path
+        if path is None:
+            k = max(2, int(np.sqrt(args.mb * 2**20 / (3 * BYTES_PER_NNZ))))
+            path = os.path.join(tmp, f"transportation_{k}.mps")
+            start = time.perf_counter()
+            write_mps(path, **generate_transportation_problem(k, k))
+            print(f"Wrote {path} in {time.perf_counter() - start:.1f} s")
+        size = os.path.getsize(path) / 2**20
+
+        times = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            problem, metadata = read_mps(path)
+            times.append(time.perf_counter() - start)
+        parse = min(times)
+        nnz = metadata["nnz"]
+        print(f"{metadata['name']}: {metadata['rows']} rows, {metadata['columns']} columns, "
+              f"{nnz} nonzeros, {size:.1f} MB")
+        print(f"parse          {parse:8.3f} s  {size / parse:8.1f} MB/s  "
+              f"{nnz / parse / 1e6:6.2f} M nnz/s")
+
+        cache_dir = os.path.join(tmp, "cache")
+        start = time.perf_counter()
+        read_mps(path, cache=cache_dir)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        cached, _ = read_mps(path, cache=cache_dir)
+        load = time.perf_counter() - start
+        assert (cached["A_ub"] != problem["A_ub"]).nnz == 0
+        print(f"parse + cache  {first:8.3f} s")
+        print(f"cached load    {load:8.3f} s  ({parse / load:.0f}x faster than parsing)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Microbenchmark of the fused K / K^T operator against the split products.
+
+"split" is the previous implementation: two SpMVs per application, a negated
+temporary for A_ub, implicit transposes and slicing of ``y`` on every call.
+"fused" is ``StackedOperator``: one SpMV on a pre-assembled CSR K or K^T.
+
+Run from the development/ directory:
+    python -m benchmarks.bench_operator --sizes 50 100 200 --repeats 200
+"""
+import argparse
+
+import numpy as np
+
+from test_data.generate_transportation import generate_transportation_problem
+from utils.backend import available_backends, get_backend
+from utils.matrix_operations import StackedOperator
+
+
+def split_operators(A_eq, A_ub, K_out, Kt_out):
+    """The original create_linear_operators closures."""
+    def apply_K(x, out=K_out):
+        out[:A_eq.shape[0]] = A_eq.dot(x)
+        out[A_eq.shape[0]:] = -A_ub.dot(x)
+        return out
+
+    def apply_Kt(y, out=Kt_out):
+        out[:] = A_eq.T.dot(y[:A_eq.shape[0]])
+        out[:] -= A_ub.T.dot(y[A_eq.shape[0]:])
+        return out
+
+    return apply_K, apply_Kt
+
+
+def time_call(backend, fn, arg, repeats):
+    """Mean seconds per call of ``fn(arg)`` after one warm-up call."""
+    fn(arg)
+    start = backend.timer()
+    for _ in range(repeats):
+        fn(arg)
+    return (backend.timer() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--dtype", default="float32")
+    args = parser.parse_args()
+    dtype = np.dtype(args.dtype)
+
+    print(f"{'backend':>8} {'m=n':>6} {'nnz':>9} {'op':>4} {'split us':>10} {'fused us':>10} {'speedup':>8}")
+    for name in available_backends():
+        backend = get_backend(name)
+        xp = backend.xp
+        for size in args.sizes:
+            problem = generate_transportation_problem(size, size)
+            A_eq = backend.csr_matrix(problem["A_eq"], dtype)
+            A_ub = backend.csr_matrix(problem["A_ub"], dtype)
+            K = StackedOperator(A_eq, A_ub, dtype=dtype, backend=backend)
+            apply_K, apply_Kt = split_operators(A_eq, A_ub, xp.empty(K.shape[0], dtype),
+                                                xp.empty(K.shape[1], dtype))
+            x = xp.ones(K.shape[1], dtype=dtype)
+            y = xp.ones(K.shape[0], dtype=dtype)
+            for op, split, fused, arg in (("K", apply_K, K.matvec, x),
+                                          ("K^T", apply_Kt, K.rmatvec, y)):
+                t_split = time_call(backend, split, arg, args.repeats)
+                t_fused = time_call(backend, fused, arg, args.repeats)
+                print(f"{name:>8} {size:6d} {K.nnz:9d} {op:>4} {1e6 * t_split:10.1f} "
+                      f"{1e6 * t_fused:10.1f} {t_split / t_fused:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
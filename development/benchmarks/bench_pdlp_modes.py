@@ -0,0 +1,39 @@
+"""Iterations-to-tolerance of restarted PDLP against the plain PDHG loop.
+
+Run from the development/ directory:
+    python -m benchmarks.bench_pdlp_modes --sizes 10 30 50 --eps 1e-4
+"""
+import argparse
+
+import numpy as np
+
+from pdlp_implementation.src.pdlp_solver import pdlp_gpu
+from test_data.generate_transportation import generate_transportation_problem
+from utils.backend import get_backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 30, 50])
+    parser.add_argument("--eps", type=float, default=1e-4)
+    parser.add_argument("--max-itr", type=int, default=100000)
+    parser.add_argument("--tolcheck", type=int, default=64)
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--dtype", default="float64")
+    args = parser.parse_args()
+    backend = get_backend(args.backend)
+
+    print(f"{'m=n':>6} {'mode':>5} {'iters':>8} {'status':>16} {'time s':>9}")
+    for size in args.sizes:
+        problem = generate_transportation_problem(size, size)
+        for mode in ("pdhg", "pdlp"):
+            start = backend.timer()
+            _, info = pdlp_gpu(**problem, mode=mode, full_output=True, max_itr=args.max_itr,
+                               tolcheck=args.tolcheck, eps_pri=args.eps, eps_dual=args.eps,
+                               eps_gap=args.eps, dtype=np.dtype(args.dtype), backend=backend)
+            elapsed = backend.timer() - start
+            print(f"{size:6d} {mode:>5} {info['iterations']:8d} {info['status']:>16} {elapsed:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
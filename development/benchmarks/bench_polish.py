@@ -0,0 +1,65 @@
+"""Wall time to 1e-8: plain iteration vs iteration to 1e-4 plus polishing.
+
+Solves a transportation problem with ``pdlp_gpu`` (nonnegativity as bounds)
+and ``SCSSolver`` to ``--eps``, with and without ``polish=True``, and
+reports status, iterations, polish attempts, time and the objective error
+against HiGHS.
+
+Run from the development/ directory:
+    python -m benchmarks.bench_polish --size 40 --eps 1e-8
+"""
+import argparse
+
+import numpy as np
+import scipy.optimize
+
+from pdlp_implementation.src.pdlp_solver import pdlp_gpu
+from scs_implementation.src.scs_solver import SCSSolver
+from test_data.generate_transportation import generate_transportation_problem
+from utils.backend import get_backend
+from utils.bounds import singleton_rows_to_bounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=40)
+    parser.add_argument("--eps", type=float, default=1e-8)
+    parser.add_argument("--max-itr", type=int, default=100000)
+    parser.add_argument("--tolcheck", type=int, default=10)
+    parser.add_argument("--backend", default=None)
+    args = parser.parse_args()
+    backend = get_backend(args.backend)
+    problem = generate_transportation_problem(args.size, args.size)
+    A_ub, b_ub, lb, ub = singleton_rows_to_bounds(problem["A_ub"], problem["b_ub"])
+    bounded = {**problem, "A_ub": A_ub, "b_ub": b_ub, "lb": lb, "ub": ub}
+    ref = scipy.optimize.linprog(problem["c"], A_ub, b_ub, problem["A_eq"], problem["b_eq"],
+                                 bounds=list(zip(lb, ub))).fun
+    tolerances = dict(tolcheck=args.tolcheck, eps_pri=args.eps, eps_dual=args.eps,
+                      eps_gap=args.eps)
+
+    def run_pdlp(dtype, polish):
+        x, info = pdlp_gpu(**bounded, **tolerances, max_itr=args.max_itr, mode="pdlp",
+                           dtype=dtype, backend=backend, full_output=True, polish=polish)
+        return x, info
+
+    def run_scs(dtype, polish):
+        solver = SCSSolver(**bounded, dtype=dtype, backend=backend, linsys="direct")
+        x = solver.solve(**tolerances, max_itr=args.max_itr, polish=polish)
+        return x, solver.info
+
+    print(f"{'solver':>10} {'dtype':>8} {'polish':>6} {'status':>16} {'iters':>7} {'tries':>5} "
+          f"{'s':>7} {'obj err':>9}")
+    for name, run in (("pdlp_gpu", run_pdlp), ("SCS", run_scs)):
+        for dtype in (np.float32, np.float64):
+            for polish in (False, True):
+                start = backend.timer()
+                x, info = run(dtype, polish)
+                elapsed = backend.timer() - start
+                err = abs(float(problem["c"] @ backend.to_host(x)) - ref) / abs(ref)
+                print(f"{name:>10} {np.dtype(dtype).name:>8} {str(polish):>6} "
+                      f"{info['status']:>16} {info['iterations']:7d} "
+                      f"{info.get('polish_attempts', 0):5d} {elapsed:7.3f} {err:9.2e}")
+
+
+if __name__ == "__main__":
+    main()
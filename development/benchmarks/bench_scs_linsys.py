@@ -0,0 +1,41 @@
+"""Per-iteration time of SCS with the indirect (CG) and direct (cached KKT factor) linear systems.
+
+Run from the development/ directory:
+    python -m benchmarks.bench_scs_linsys --sizes 10 20 40 --iters 200
+"""
+import argparse
+
+import numpy as np
+
+from scs_implementation.src.scs_solver import SCSSolver
+from test_data.generate_transportation import generate_transportation_problem
+from utils.backend import get_backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 40])
+    parser.add_argument("--iters", type=int, default=200)
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--dtype", default="float64")
+    args = parser.parse_args()
+    backend = get_backend(args.backend)
+
+    print(f"{'m=n':>6} {'linsys':>8} {'setup s':>8} {'ms/iter':>8} {'factor nnz':>11}")
+    for size in args.sizes:
+        problem = generate_transportation_problem(size, size)
+        for linsys in ("indirect", "direct"):
+            start = backend.timer()
+            solver = SCSSolver(**problem, dtype=np.dtype(args.dtype), backend=backend,
+                               linsys=linsys)
+            setup = backend.timer() - start
+            # tolcheck > iters: time the iteration itself, not the convergence checks
+            start = backend.timer()
+            solver.solve(max_itr=args.iters, tolcheck=args.iters + 1)
+            per_iter = (backend.timer() - start) / args.iters
+            fill = getattr(solver.linsys, "fill", "-")
+            print(f"{size:6d} {linsys:>8} {setup:8.3f} {1e3 * per_iter:8.3f} {fill:>11}")
+
+
+if __name__ == "__main__":
+    main()
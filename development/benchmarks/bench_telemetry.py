@@ -0,0 +1,63 @@
+"""Per-iteration cost of solver telemetry: disabled vs recording every check.
+
+Runs a fixed number of iterations (the tolerances are out of reach, so no solve
+stops early) of ``pdlp_gpu`` in both modes and of ``SCSSolver`` on a
+transportation problem, without telemetry and with a ``Telemetry`` that
+records every check, and prints the best time per iteration of each and the
+phase breakdown of the recorded run.
+
+Run from the development/ directory:
+    python -m benchmarks.bench_telemetry --size 100 --iters 2000
+"""
+import argparse
+
+import numpy as np
+
+from pdlp_implementation.src.pdlp_solver import pdlp_gpu
+from scs_implementation.src.scs_solver import SCSSolver
+from test_data.generate_transportation import generate_transportation_problem
+from utils.backend import get_backend
+from utils.telemetry import Telemetry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--iters", type=int, default=2000)
+    parser.add_argument("--tolcheck", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--dtype", default="float32")
+    args = parser.parse_args()
+    backend = get_backend(args.backend)
+    dtype = np.dtype(args.dtype)
+    problem = generate_transportation_problem(args.size, args.size)
+    tols = dict(tolcheck=args.tolcheck, eps_pri=1e-30, eps_dual=1e-30, eps_gap=1e-30)
+
+    def pdlp(mode):
+        return lambda telemetry: pdlp_gpu(**problem, dtype=dtype, backend=backend, mode=mode,
+                                          max_itr=args.iters, telemetry=telemetry, **tols)
+
+    def scs(telemetry):
+        solver = SCSSolver(**problem, dtype=dtype, backend=backend, telemetry=telemetry)
+        solver.solve(max_itr=args.iters, **tols)
+
+    print(f"{'solver':>8} {'off us/it':>10} {'on us/it':>10} {'overhead':>9} {'checks':>7}")
+    for name, run in (("pdhg", pdlp("pdhg")), ("pdlp", pdlp("pdlp")), ("scs", scs)):
+        # Interleaved, so drift in machine load hits both variants alike
+        best = {False: np.inf, True: np.inf}
+        for _ in range(args.repeats):
+            for enabled in (False, True):
+                telemetry = Telemetry() if enabled else None
+                start = backend.timer()
+                run(telemetry)
+                best[enabled] = min(best[enabled], backend.timer() - start)
+        off, on = (best[enabled] / args.iters * 1e6 for enabled in (False, True))
+        print(f"{name:>8} {off:10.1f} {on:10.1f} {(on / off - 1) * 100:8.1f}% "
+              f"{len(telemetry.checks):7d}")
+        print("         " + ", ".join(f"{phase} {entry['seconds']:.3f} s"
+                                      for phase, entry in telemetry.phases.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Strong scaling of the row-blocked CPU SpMV over 1..N threads.
+
+Times K @ x and K^T @ y of ``StackedOperator`` on one transportation problem
+for every thread count, and optionally a fixed number of PDHG iterations
+through ``pdlp_gpu``, reporting speedup and parallel efficiency against one
+thread.
+
+Run from the development/ directory:
+    python -m benchmarks.bench_threads --size 1000 --threads 1 2 4 8 16 32 64
+"""
+import argparse
+import os
+
+import numpy as np
+
+from pdlp_implementation.src.pdlp_solver import pdlp_gpu
+from test_data.generate_transportation import generate_transportation_problem
+from utils.backend import get_backend
+from utils.matrix_operations import StackedOperator
+
+
+def time_call(backend, fn, arg, repeats):
+    """Mean seconds per call of ``fn(arg)`` after one warm-up call."""
+    fn(arg)
+    start = backend.timer()
+    for _ in range(repeats):
+        fn(arg)
+    return (backend.timer() - start) / repeats
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=500)
+    parser.add_argument("--threads", type=int, nargs="+",
+                        default=[t for t in (1, 2, 4, 8, 16, 32, 64) if t <= cores])
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--dtype", default="float64")
+    parser.add_argument("--solve-iters", type=int, default=0,
+                        help="Also time this many pdlp_gpu iterations (0 to skip)")
+    args = parser.parse_args()
+    dtype = np.dtype(args.dtype)
+    problem = generate_transportation_problem(args.size, args.size)
+
+    print(f"{cores} cores, m=n={args.size}")
+    print(f"{'threads':>7} {'K ms':>9} {'K^T ms':>9} {'speedup':>8} {'eff':>6}"
+          + (f" {'solve s':>8}" if args.solve_iters else ""))
+    base = None
+    for threads in args.threads:
+        backend = get_backend("numpy", threads=threads)
+        K = StackedOperator(problem["A_eq"], problem["A_ub"], dtype=dtype, backend=backend)
+        x, y = np.ones(K.shape[1], dtype), np.ones(K.shape[0], dtype)
+        t = [time_call(backend, K.matvec, x, args.repeats),
+             time_call(backend, K.rmatvec, y, args.repeats)]
+        base = base or sum(t)
+        line = (f"{threads:7d} {1e3 * t[0]:9.3f} {1e3 * t[1]:9.3f} {base / sum(t):8.2f} "
+                f"{base / sum(t) / threads:6.2f}")
+        if args.solve_iters:
+            start = backend.timer()
+            pdlp_gpu(**problem, max_itr=args.solve_iters, tolcheck=args.solve_iters,
+                     eps_pri=1e-30, eps_dual=1e-30, eps_gap=1e-30, dtype=dtype, backend=backend)
+            line += f" {backend.timer() - start:8.3f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
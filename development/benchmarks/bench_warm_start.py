@@ -0,0 +1,70 @@
+"""Cold vs warm re-solves of a drifting sequence of LPs with PDLPSolver.
+
+Each step perturbs the costs and supplies of a transportation problem
+slightly, as in receding-horizon planning, and re-solves it three ways:
+one-shot ``pdlp_gpu`` (full setup every time), ``PDLPSolver`` from zero
+(setup reused) and ``PDLPSolver`` warm-started from the previous solution.
+
+Run from the development/ directory:
+    python -m benchmarks.bench_warm_start --size 20 --steps 10 --mode pdlp
+"""
+import argparse
+
+import numpy as np
+
+from pdlp_implementation.src.pdlp_solver import PDLPSolver, pdlp_gpu
+from test_data.generate_transportation import generate_transportation_problem
+from utils.backend import get_backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--drift", type=float, default=0.001,
+                        help="relative size of the per-step perturbation")
+    parser.add_argument("--mode", default="pdlp", choices=["pdhg", "pdlp"])
+    parser.add_argument("--eps", type=float, default=1e-4)
+    parser.add_argument("--max-itr", type=int, default=200000)
+    parser.add_argument("--tolcheck", type=int, default=64)
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--dtype", default="float64")
+    args = parser.parse_args()
+    backend = get_backend(args.backend)
+    problem = generate_transportation_problem(args.size, args.size)
+    rng = np.random.default_rng(0)
+    tols = dict(tolcheck=args.tolcheck, eps_pri=args.eps, eps_dual=args.eps, eps_gap=args.eps)
+    dtype = np.dtype(args.dtype)
+
+    cold = PDLPSolver(**problem, dtype=dtype, backend=backend, mode=args.mode)
+    warm = PDLPSolver(**problem, dtype=dtype, backend=backend, mode=args.mode)
+    warm.solve(max_iter=args.max_itr, **tols)
+
+    c, b_ub = problem["c"].copy(), problem["b_ub"].copy()
+    totals = np.zeros((3, 2))
+    print(f"{'step':>4} {'one-shot it':>11} {'s':>7} {'cold it':>8} {'s':>7} {'warm it':>8} {'s':>7}")
+    for step in range(args.steps):
+        c *= 1 + args.drift * rng.standard_normal(c.shape[0])
+        b_ub[:args.size] *= 1 + args.drift * rng.uniform(size=args.size)
+        row = []
+        start = backend.timer()
+        _, info = pdlp_gpu(**{**problem, "c": c, "b_ub": b_ub}, max_itr=args.max_itr,
+                           dtype=dtype, backend=backend, mode=args.mode, full_output=True,
+                           **tols)
+        row.append((info["iterations"], backend.timer() - start))
+        for solver, warm_start in ((cold, False), (warm, True)):
+            start = backend.timer()
+            solver.update_c(c)
+            solver.update_b(b_ub=b_ub)
+            solver.solve(max_iter=args.max_itr, warm_start=warm_start, **tols)
+            row.append((solver.info["iterations"], backend.timer() - start))
+        totals += row
+        print(f"{step:4d} " + " ".join(f"{it:11d} {t:7.3f}" if i == 0 else f"{it:8d} {t:7.3f}"
+                                       for i, (it, t) in enumerate(row)))
+    (oi, ot), (ci, ct), (wi, wt) = totals
+    print(f"total {oi:10.0f} {ot:7.3f} {ci:8.0f} {ct:7.3f} {wi:8.0f} {wt:7.3f}")
+    print(f"warm vs one-shot: {oi / max(wi, 1):.2f}x fewer iterations, {ot / wt:.2f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Benchmark suite: problem families x sizes x solvers, with JSON results and regression checks.
+
+``run`` generates every (family, size) LP, solves it with each solver after
+``--warmup`` untimed runs, and times ``--repeats`` runs of the full pipeline:
+
+* ``transfer_s``: moving c, b and the matrices onto the backend,
+* ``setup_s``: constructing the solver (transfer, operator assembly,
+  preconditioning, norm estimate or factorization),
+* ``solve_s`` and ``per_iter_s``: the iterations, and ``total_s`` = setup + solve.
+
+Every phase is reported as the median over repeats (all samples are kept
+under ``samples``). Each record also holds the status, iterations, the
+relative primal residual and objective error of x (against
+``scipy.optimize.linprog``'s HiGHS) and the peak RSS and device allocator
+pool usage, sampled on a background thread. Results go to ``--output`` as
+JSON.
+
+``compare`` matches the records of two result files and flags regressions:
+``total_s`` or iterations up by more than ``--threshold``, a lost
+``"optimal"`` status, or an objective error up tenfold.
+
+Run from the development/ directory:
+    python benchmarks/run_all.py run --families transportation grid_flow --sizes 20 40
+    python benchmarks/run_all.py compare baseline.json benchmarks/results/latest.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+
+import numpy as np
+import scipy
+import scipy.optimize
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.simulate_decentralized import grid_flow_problem  # noqa: E402
+from pdlp_implementation.src.pdlp_solver import PDLPSolver  # noqa: E402
+from scs_implementation.src.scs_solver import SCSSolver  # noqa: E402
+from test_data.generators import (FAMILIES as GENERATOR_FAMILIES, lp_arguments,  # noqa: E402
+                                  problem_for_size)
+from utils.backend import get_backend  # noqa: E402
+from utils.bounds import normalize_bounds  # noqa: E402
+from utils.polish import kkt_residuals  # noqa: E402
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "latest.json")
+PHASES = ("transfer_s", "setup_s", "solve_s", "total_s")
+# Differences below this many seconds are noise, whatever the ratio
+MIN_TIME_DELTA = 1e-3
+
+
+def _grid_flow(size, seed):
+    problem, _ = grid_flow_problem(size, n_pairs=max(size // 3, 1), seed=seed)
+    return problem
+
+
+# Families of test_data.generators (cached on disk) plus the decentralized simulator's grid
+FAMILIES = {**{name: (lambda size, seed, name=name: lp_arguments(problem_for_size(name, size,
+                                                                                 seed)))
+               for name in GENERATOR_FAMILIES},
+            "grid_flow": _grid_flow}
+SOLVERS = ("pdlp_gpu", "SCSSolver", "highs")
+
+
+class MemorySampler:
+    """Peak resident set size and device allocator pool, sampled on a background thread.
+
+    RSS is read from /proc/self/statm; elsewhere the process-wide
+    ``ru_maxrss`` high-water mark stands in. The pool is CuPy's default
+    memory pool (0 on CPU).
+    """
+
+    def __init__(self, backend, interval=0.002):
+        self.backend = backend
+        self.interval = interval
+        self.peak_rss = self.peak_pool = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def rss_bytes():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            scale = 1 if sys.platform == "darwin" else 1024
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    def pool_bytes(self):
+        if not self.backend.is_gpu:
+            return 0
+        return self.backend.xp.get_default_memory_pool().total_bytes()
+
+    def _sample(self):
+        self.peak_rss = max(self.peak_rss, self.rss_bytes())
+        self.peak_pool = max(self.peak_pool, self.pool_bytes())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def _transfer(problem, dtype, backend):
+    """Move the LP data onto the backend, as the solvers do on construction."""
+    moved = [backend.as_matrix(problem[name], dtype) for name in ("A_eq", "A_ub")]
+    moved += [backend.asarray(problem[name], dtype) for name in ("c", "b_eq", "b_ub")]
+    backend.synchronize()
+    return moved
+
+
+def run_once(solver, problem, backend, dtype, eps, max_itr):
+    """One timed pipeline run; returns the phase times, status, iterations and host x."""
+    timer = backend.timer
+    if solver == "highs":
+        start = timer()
+        res = scipy.optimize.linprog(problem["c"], problem["A_ub"], problem["b_ub"],
+                                     problem["A_eq"], problem["b_eq"],
+                                     bounds=list(zip(*normalize_bounds(problem.get("lb"),
+                                                                       problem.get("ub"),
+                                                                       problem["c"].size))))
+        solve = timer() - start
+        return {"transfer_s": 0.0, "setup_s": 0.0, "solve_s": solve, "total_s": solve,
+                "status": "optimal" if res.status == 0 else res.message, "iterations": int(res.nit),
+                "x": res.x}
+
+    start = timer()
+    _transfer(problem, dtype, backend)
+    transfer = timer() - start
+
+    tolerances = dict(eps_pri=eps, eps_dual=eps, eps_gap=eps)
+    start = timer()
+    if solver == "pdlp_gpu":
+        instance = PDLPSolver(**problem, dtype=dtype, backend=backend, mode="pdlp", ruiz_iters=10,
+                              pock_chambolle=True)
+        setup = timer() - start
+        start = timer()
+        x, _ = instance.solve(max_iter=max_itr, **tolerances)
+    elif solver == "SCSSolver":
+        instance = SCSSolver(**problem, dtype=dtype, backend=backend)
+        setup = timer() - start
+        start = timer()
+        x = instance.solve(max_itr=max_itr, **tolerances)
+    else:
+        raise ValueError(f"Unknown solver {solver!r}")
+    solve = timer() - start
+    return {"transfer_s": transfer, "setup_s": setup, "solve_s": solve, "total_s": setup + solve,
+            "status": instance.info["status"], "iterations": int(instance.info["iterations"]),
+            "x": backend.to_host(x)}
+
+
+def bench_case(family, size, solver, problem, reference, backend, dtype, args):
+    """Warm up, then time ``args.repeats`` runs of one solver on one LP."""
+    for _ in range(args.warmup):
+        run_once(solver, problem, backend, dtype, args.eps, args.max_itr)
+    runs, sampler = [], MemorySampler(backend)
+    with sampler:
+        for _ in range(args.repeats):
+            runs.append(run_once(solver, problem, backend, dtype, args.eps, args.max_itr))
+
+    last = runs[-1]
+    x = np.asarray(last["x"], dtype=np.float64)
+    lb, ub = normalize_bounds(problem.get("lb"), problem.get("ub"), x.size)
+    m = problem["b_eq"].size + problem["b_ub"].size
+    primal_feas = kkt_residuals(problem["c"], problem["A_ub"], problem["b_ub"], problem["A_eq"],
+                                problem["b_eq"], lb, ub, x, np.zeros(m))[0]
+    objective = float(problem["c"] @ x)
+    samples = {phase: [run[phase] for run in runs] for phase in PHASES}
+    record = {"family": family, "size": size, "solver": solver, "backend": backend.name,
+              "dtype": np.dtype(dtype).name, "n": int(x.size), "m": int(m),
+              "nnz": int(problem["A_eq"].nnz + problem["A_ub"].nnz),
+              "status": last["status"], "iterations": last["iterations"],
+              **{phase: statistics.median(values) for phase, values in samples.items()},
+              "per_iter_s": statistics.median(samples["solve_s"]) / max(last["iterations"], 1),
+              "primal_feas": float(primal_feas), "objective": objective,
+              "obj_rel_err": abs(objective - reference) / max(abs(reference), 1.0),
+              "peak_rss_mb": sampler.peak_rss / 2**20, "peak_pool_mb": sampler.peak_pool / 2**20,
+              "samples": samples}
+    return record
+
+
+def _meta(args, backend):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": commit, "python": platform.python_version(), "numpy": np.__version__,
+            "scipy": scipy.__version__, "platform": platform.platform(),
+            "backend": backend.name, "threads": backend.threads,
+            "args": {k: v for k, v in vars(args).items() if k != "func"}}
+
+
+def run(args):
+    backend = get_backend(args.backend)
+    dtype = np.dtype(args.dtype)
+    results = []
+    print(f"{'family':>14} {'size':>5} {'solver':>10} {'status':>16} {'iters':>7} "
+          f"{'transfer':>9} {'setup':>9} {'solve':>9} {'per itr':>9} {'obj err':>9} {'RSS MB':>8}")
+    for family in args.families:
+        for size in args.sizes:
+            problem = FAMILIES[family](size, args.seed)
+            reference = float(problem["c"] @ run_once("highs", problem, backend, dtype,
+                                                      args.eps, args.max_itr)["x"])
+            for solver in args.solvers:
+                record = bench_case(family, size, solver, problem, reference, backend, dtype, args)
+                results.append(record)
+                print(f"{family:>14} {size:5d} {solver:>10} {record['status']:>16.16} "
+                      f"{record['iterations']:7d} {record['transfer_s']:9.4f} "
+                      f"{record['setup_s']:9.4f} {record['solve_s']:9.4f} "
+                      f"{record['per_iter_s']:9.2e} {record['obj_rel_err']:9.2e} "
+                      f"{record['peak_rss_mb']:8.1f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"meta": _meta(args, backend), "results": results}, f, indent=1)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+def _key(record):
+    return tuple(record[k] for k in ("family", "size", "solver", "backend", "dtype"))
+
+
+def find_regressions(base, new, threshold=0.1):
+    """Pairs of matching records with the list of regressions found in each.
+
+    Returns ``(rows, missing)``: one ``(key, base, new, problems)`` row per
+    record present in both runs, and the keys found in only one of them.
+    """
+    base = {_key(r): r for r in base["results"]}
+    new = {_key(r): r for r in new["results"]}
+    rows = []
+    for key in sorted(base.keys() & new.keys()):
+        old, cur = base[key], new[key]
+        problems = []
+        if (cur["total_s"] > (1 + threshold) * old["total_s"]
+                and cur["total_s"] - old["total_s"] > MIN_TIME_DELTA):
+            problems.append("time")
+        if cur["iterations"] > (1 + threshold) * old["iterations"]:
+            problems.append("iterations")
+        if old["status"] == "optimal" and cur["status"] != "optimal":
+            problems.append("status")
+        if cur["obj_rel_err"] > max(10 * old["obj_rel_err"], 1e-6):
+            problems.append("accuracy")
+        rows.append((key, old, cur, problems))
+    return rows, sorted(base.keys() ^ new.keys())
+
+
+def compare(args):
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    rows, missing = find_regressions(base, new, args.threshold)
+    print(f"{'family':>14} {'size':>5} {'solver':>10} {'total':>9} {'ratio':>6} {'iters':>13} "
+          f"{'status':>16}  regressions")
+    for (family, size, solver, _, _), old, cur, problems in rows:
+        ratio = cur["total_s"] / old["total_s"] if old["total_s"] > 0 else float("nan")
+        print(f"{family:>14} {size:5d} {solver:>10} {cur['total_s']:9.4f} {ratio:6.2f} "
+              f"{old['iterations']:6d}>{cur['iterations']:<6d} {cur['status']:>16.16}  "
+              f"{', '.join(problems) or '-'}")
+    for key in missing:
+        print(f"Only in one run: {key}")
+    flagged = sum(bool(problems) for *_, problems in rows)
+    print(f"{flagged} of {len(rows)} cases regressed (threshold {args.threshold:.0%})")
+    return 1 if flagged else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command")
+    run_parser = commands.add_parser("run", help="run the suite and write JSON results")
+    run_parser.add_argument("--families", nargs="+", default=["transportation", "network_flow",
+                                                              "planted", "set_cover"],
+                            choices=list(FAMILIES))
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 30])
+    run_parser.add_argument("--solvers", nargs="+", default=list(SOLVERS), choices=SOLVERS)
+    run_parser.add_argument("--repeats", type=int, default=3)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--eps", type=float, default=1e-4)
+    run_parser.add_argument("--max-itr", type=int, default=20000)
+    run_parser.add_argument("--dtype", default="float32")
+    run_parser.add_argument("--backend", default=None)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    run_parser.set_defaults(func=run)
+    compare_parser = commands.add_parser("compare", help="flag regressions between two results")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser.set_defaults(func=compare)
+
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(argv or ["run"])
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""Decentralized PDHG: the LP is split across agent processes that only talk to graph neighbors.
+
+Every variable x_j belongs to one agent (``assignment``) and every row of
+K = [A_eq; -A_ub] to the agent holding most of its nonzeros. An agent keeps
+the full rows it owns (for K x) and the full columns it owns (for K^T y),
+so one PDHG iteration needs only the primal values of the halo columns in
+its rows and the dual values of the halo rows in its columns, which are
+owned by neighboring agents. These are exchanged over per-agent inbox
+queues; no agent ever holds global vectors.
+
+Step sizes are the diagonal Pock-Chambolle steps tau_j = 1 / sum_i |K_ij|,
+sigma_i = 1 / sum_j |K_ij|, which each agent computes from its own rows and
+columns and which keep PDHG convergent without a global norm estimate.
+
+With ``staleness=0`` the agents run synchronous PDHG and reproduce the
+centralized iterates exactly. With ``staleness=s > 0`` an agent may use
+neighbor values up to s iterations old instead of waiting (bounded-staleness
+asynchronous mode); both steps are then damped by 1 / (1 + s), and loosely
+coupled partitions tolerate staleness much better than dense agent graphs.
+Only the convergence test is global: every ``tolcheck``
+iterations the agents send four partial sums to a monitor, which would be a
+tree reduction in a real swarm.
+"""
+import multiprocessing
+import queue
+import time
+
+import numpy as np
+import scipy.sparse
+
+from utils.backend import get_backend
+from utils.bounds import normalize_bounds
+from utils.telemetry import resolve
+
+
+class Partition:
+    """Ownership of the variables and rows of K and the per-agent local problems.
+
+    Attributes:
+        col_owner (ndarray): Agent of every variable, shape (n,).
+        row_owner (ndarray): Agent of every row of K, shape (m,).
+        neighbors (list[set]): Agents every agent exchanges values with.
+        locals (list[dict]): Local rows, columns and exchange index lists.
+    """
+
+    def __init__(self, K, n_eq, n_agents, assignment=None):
+        K = scipy.sparse.csr_matrix(K)
+        m, n = K.shape
+        if assignment is None:
+            assignment = np.arange(n) * n_agents // max(n, 1)
+        self.col_owner = col_owner = np.asarray(assignment, dtype=np.int64)
+        if (col_owner.shape != (n,) or col_owner.min(initial=0) < 0
+                or col_owner.max(initial=0) >= n_agents):
+            raise ValueError(f"assignment must give every one of the {n} variables an agent "
+                             f"in [0, {n_agents})")
+        self.n_agents = n_agents
+        # Row owner: the agent holding most of the row's nonzeros (empty rows go to agent 0)
+        pattern = K.copy()
+        pattern.data = np.ones_like(pattern.data)
+        counts = pattern @ scipy.sparse.csr_matrix((np.ones(n), (np.arange(n), col_owner)),
+                                                   shape=(n, n_agents))
+        self.row_owner = row_owner = np.asarray(counts.argmax(axis=1)).ravel()
+
+        Kt = K.T.tocsr()
+        cols = [np.flatnonzero(col_owner == p) for p in range(n_agents)]
+        rows = [np.flatnonzero(row_owner == p) for p in range(n_agents)]
+        self.locals = []
+        for p in range(n_agents):
+            K_rows, Kt_cols = K[rows[p]], Kt[cols[p]]
+            xcols = np.union1d(cols[p], K_rows.indices)
+            ycols = np.union1d(rows[p], Kt_cols.indices)
+            self.locals.append({
+                "cols": cols[p], "rows": rows[p], "n_eq": int(np.sum(rows[p] < n_eq)),
+                "K": K_rows[:, xcols].tocsr(), "Kt": Kt_cols[:, ycols].tocsr(),
+                "own_x": np.searchsorted(xcols, cols[p]), "own_y": np.searchsorted(ycols, rows[p]),
+                "xcols": xcols, "ycols": ycols,
+                "send": {"x": {}, "y": {}}, "recv": {"x": {}, "y": {}},
+            })
+
+        # Halo values: x_j goes from col_owner[j] to every agent whose rows touch j,
+        # y_i from row_owner[i] to every agent whose columns touch i
+        self.neighbors = [set() for _ in range(n_agents)]
+        for r, loc in enumerate(self.locals):
+            for kind, index, owner, own in (("x", loc["xcols"], col_owner, cols),
+                                            ("y", loc["ycols"], row_owner, rows)):
+                halo = np.flatnonzero(owner[index] != r)
+                for p in np.unique(owner[index[halo]]):
+                    mine = halo[owner[index[halo]] == p]
+                    loc["recv"][kind][int(p)] = mine
+                    self.locals[p]["send"][kind][r] = np.searchsorted(own[p], index[mine])
+                    self.neighbors[r].add(int(p))
+                    self.neighbors[p].add(r)
+
+    @property
+    def edges(self):
+        """Number of communicating agent pairs."""
+        return sum(len(nbrs) for nbrs in self.neighbors) // 2
+
+
+class _Agent:
+    """One agent's local PDHG state and its message handling."""
+
+    def __init__(self, rank, local, c, q, lb, ub, inboxes, staleness):
+        self.rank = rank
+        self.local = local
+        self.inbox = inboxes[rank]
+        self.outboxes = {r: inboxes[r] for r in set(local["send"]["x"]) | set(local["send"]["y"])}
+        for box in self.outboxes.values():
+            # Halo messages still queued when the neighbors stop are not needed
+            box.cancel_join_thread()
+        self.staleness = staleness
+        self.c, self.q, self.lb, self.ub = c, q, lb, ub
+        self.n_eq = local["n_eq"]
+        K, Kt = local["K"], local["Kt"]
+        row_sum = np.asarray(abs(K).sum(axis=1)).ravel()
+        col_sum = np.asarray(abs(Kt).sum(axis=1)).ravel()
+        damping = 1 / (1 + staleness)
+        self.sigma = damping / np.where(row_sum > 0, row_sum, 1)
+        self.tau = damping / np.where(col_sum > 0, col_sum, 1)
+
+        self.x = np.clip(np.zeros(c.size), lb, ub)
+        self.y = np.zeros(q.size)
+        self.x_loc = np.zeros(local["xcols"].size)
+        self.y_loc = np.zeros(local["ycols"].size)
+        self.x_loc[local["own_x"]] = self.x
+        self.latest = {"x": {}, "y": {}}
+        self.control = {}
+        self.messages = self.floats = 0
+
+    def send(self, kind, k, values):
+        for r, index in self.local["send"][kind].items():
+            self.outboxes[r].put((kind, self.rank, k, values[index]))
+            self.messages += 1
+            self.floats += index.size
+
+    def _store(self, message):
+        kind, sender, k, payload = message
+        if kind == "stop":
+            self.control[k] = payload
+        elif k > self.latest[kind].get(sender, (-1, None))[0]:
+            self.latest[kind][sender] = (k, payload)
+
+    def receive(self, kind, k):
+        """Fill the ``kind`` halo with neighbor values of iteration >= k - staleness."""
+        senders = self.local["recv"][kind]
+        try:
+            while True:
+                self._store(self.inbox.get_nowait())
+        except queue.Empty:
+            pass
+        oldest = max(k - self.staleness, 0)
+        while any(self.latest[kind].get(p, (-1, None))[0] < oldest for p in senders):
+            self._store(self.inbox.get())
+        halo = self.x_loc if kind == "x" else self.y_loc
+        for p, index in senders.items():
+            halo[index] = self.latest[kind][p][1]
+
+    def wait_for_monitor(self, k):
+        while k not in self.control:
+            self._store(self.inbox.get())
+        return self.control.pop(k)
+
+    def stats(self):
+        """Partial sums of the global residuals at the current (x, y)."""
+        r = self.q - self.local["K"] @ self.x_loc
+        r[self.n_eq:] = np.maximum(r[self.n_eq:], 0)
+        lam = self.c - self.local["Kt"] @ self.y_loc
+        lower, upper = np.isfinite(self.lb), np.isfinite(self.ub)
+        bound_term = (self.lb[lower] @ np.maximum(lam[lower], 0)
+                      - self.ub[upper] @ np.maximum(-lam[upper], 0))
+        lam[(lam > 0) & lower] = 0
+        lam[(lam < 0) & upper] = 0
+        return np.array([r @ r, lam @ lam, self.c @ self.x, self.q @ self.y + bound_term])
+
+    def step(self, k):
+        """One PDHG iteration k -> k + 1, exchanging halo values on the way."""
+        own_x, own_y = self.local["own_x"], self.local["own_y"]
+        x_new = self.x - self.tau * (self.c - self.local["Kt"] @ self.y_loc)
+        np.clip(x_new, self.lb, self.ub, out=x_new)
+        x_prev = self.x_loc.copy()
+        self.x = x_new
+        self.x_loc[own_x] = x_new
+        self.send("x", k + 1, x_new)
+        self.receive("x", k + 1)
+        y = self.y + self.sigma * (self.q - self.local["K"] @ (2 * self.x_loc - x_prev))
+        y[self.n_eq:] = np.maximum(y[self.n_eq:], 0)
+        self.y = y
+        self.y_loc[own_y] = y
+        self.send("y", k + 1, y)
+
+
+def _run_agent(rank, local, c, q, lb, ub, inboxes, monitor, staleness, tolcheck, max_itr):
+    """Process target: iterate until the monitor says stop, then report the local solution."""
+    agent = _Agent(rank, local, c, q, lb, ub, inboxes, staleness)
+    agent.send("x", 0, agent.x)
+    agent.send("y", 0, agent.y)
+    agent.receive("x", 0)
+    k = 0
+    while True:
+        agent.receive("y", k)
+        if k > 0 and (k % tolcheck == 0 or k >= max_itr):
+            monitor.put(("stats", rank, k, agent.stats()))
+            if agent.wait_for_monitor(k):
+                break
+        agent.step(k)
+        k += 1
+    monitor.put(("done", rank, k, (agent.x, agent.y, agent.messages, agent.floats)))
+
+
+def decentralized_pdhg(c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, lb=None, ub=None,
+                       n_agents=4, assignment=None, staleness=0, tolcheck=10, eps_pri=1e-6,
+                       eps_dual=1e-4, eps_gap=1e-4, max_itr=100000, full_output=False,
+                       telemetry=None):
+    """PDHG with the LP partitioned across ``n_agents`` worker processes.
+
+    ``assignment`` maps every variable to an agent (default: contiguous
+    blocks of equal size); rows follow the majority of their nonzeros, and
+    the resulting coupling decides which agents communicate. ``staleness``
+    bounds how many iterations old a neighbor's values may be (0 runs
+    synchronously). Runs on the host in float64; criteria match
+    ``pdlp_gpu``.
+
+    With ``full_output=True`` returns ``(x, info)`` where ``info`` holds the
+    dual ``y``, iterations, status, residuals, the number of neighbor
+    messages and floats sent, the agent graph size and setup/solve times.
+    ``telemetry`` (a ``utils.telemetry.Telemetry``) receives the global
+    residuals of every convergence check and times the setup, iteration and
+    check phases.
+    """
+    telemetry = resolve(telemetry, get_backend("numpy"))
+    start = time.perf_counter()
+    with telemetry.phase("setup"):
+        c = np.asarray(c, dtype=np.float64)
+        n = c.size
+        A_eq = scipy.sparse.csr_matrix((0, n)) if A_eq is None else scipy.sparse.csr_matrix(A_eq)
+        A_ub = scipy.sparse.csr_matrix((0, n)) if A_ub is None else scipy.sparse.csr_matrix(A_ub)
+        b_eq = np.zeros(0) if b_eq is None else np.asarray(b_eq, dtype=np.float64)
+        b_ub = np.zeros(0) if b_ub is None else np.asarray(b_ub, dtype=np.float64)
+        if c.ndim != 1 or b_eq.ndim != 1 or b_ub.ndim != 1:
+            raise ValueError("decentralized_pdhg solves a single (1-D) LP")
+        lb, ub = normalize_bounds(lb, ub, n)
+        K = scipy.sparse.vstack((A_eq, -A_ub), format="csr").astype(np.float64)
+        q = np.concatenate((b_eq, -b_ub))
+        partition = Partition(K, b_eq.size, n_agents, assignment)
+        c_norm, q_norm = np.linalg.norm(c), np.linalg.norm(q)
+    setup_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with telemetry.phase("iterations"):
+        inboxes = [multiprocessing.Queue() for _ in range(n_agents)]
+        monitor = multiprocessing.Queue()
+        workers = []
+        for p, loc in enumerate(partition.locals):
+            cols, rows = loc["cols"], loc["rows"]
+            workers.append(multiprocessing.Process(
+                target=_run_agent, daemon=True,
+                args=(p, loc, c[cols], q[rows], lb[cols], ub[cols], inboxes, monitor, staleness,
+                      tolcheck, max_itr)))
+            workers[-1].start()
+
+        pending, status, done = {}, None, {}
+        while len(done) < n_agents:
+            try:
+                kind, rank, k, payload = monitor.get(timeout=1)
+            except queue.Empty:
+                if any(worker.exitcode not in (None, 0) for worker in workers):
+                    for worker in workers:
+                        worker.terminate()
+                    raise RuntimeError("A decentralized PDHG agent process failed")
+                continue
+            if kind == "done":
+                done[rank] = payload
+                continue
+            pending.setdefault(k, []).append(payload)
+            if len(pending[k]) < n_agents:
+                continue
+            with telemetry.phase("checks"):
+                p2, d2, cx, qy = np.sum(pending.pop(k), axis=0)
+                p_feas, d_feas = np.sqrt(p2) / (1 + q_norm), np.sqrt(d2) / (1 + c_norm)
+                gap = abs(qy - cx) / (1 + abs(cx) + abs(qy))
+            if telemetry.enabled:
+                telemetry.check("decentralized", k, primal_feas=float(p_feas),
+                                dual_feas=float(d_feas), dual_gap=float(gap))
+            converged = p_feas < eps_pri and d_feas < eps_dual and gap < eps_gap
+            stop = converged or k >= max_itr
+            if stop:
+                status = "optimal" if converged else "iteration_limit"
+                iterations, residuals = k, (p_feas, d_feas, gap)
+            for box in inboxes:
+                box.put(("stop", -1, k, stop))
+        for worker in workers:
+            worker.join()
+    solve_time = time.perf_counter() - start
+
+    x, y = np.empty(n), np.empty(q.size)
+    for p, (x_p, y_p, _, _) in done.items():
+        x[partition.locals[p]["cols"]] = x_p
+        y[partition.locals[p]["rows"]] = y_p
+    telemetry.event("decentralized", f"Decentralized PDHG: {status} after {iterations} "
+                    f"iterations on {n_agents} agents ({partition.edges} links) in "
+                    f"{solve_time:.3f} seconds", status=status, iterations=iterations)
+    if not full_output:
+        return x
+    return x, {"y": y, "iterations": iterations, "status": status, "primal_feas": residuals[0],
+               "dual_feas": residuals[1], "dual_gap": residuals[2],
+               "messages": sum(v[2] for v in done.values()),
+               "floats_sent": sum(v[3] for v in done.values()),
+               "n_agents": n_agents, "edges": partition.edges, "setup_time": setup_time,
+               "solve_time": solve_time}
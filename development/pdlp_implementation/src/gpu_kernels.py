@@ -1,24 +1,35 @@
-import cupy as cp
-import cupyx.scipy.sparse
-from cupyx.scipy.sparse.linalg import LinearOperator
+import numpy as np
+from utils.backend import get_backend
+from utils.matrix_operations import StackedOperator
 
 
-def create_linear_operators(A_eq, A_ub, c_size, q_size, dtype=cp.float32):
-    """Create K and K^T operators with pre-allocated output arrays."""
-    apply_K_out = cp.empty(q_size, dtype=dtype)
-    apply_Kt_out = cp.empty(c_size, dtype=dtype)
+def create_linear_operators(A_eq, A_ub, c_size, q_size, dtype=np.float32, backend=None):
+    """Create K and K^T operators with pre-allocated output arrays.
 
-    def apply_K(x, out=apply_K_out):
-        """Apply K operator: [A_eq; -A_ub] * x."""
-        out[:A_eq.shape[0]] = A_eq.dot(x)
-        out[A_eq.shape[0]:] = -A_ub.dot(x)
-        return out
+    K = [A_eq; -A_ub] is assembled once as a single CSR matrix with an
+    explicit CSR K^T, so each application is one SpMV.
+    """
+    backend = get_backend(backend, A_eq, A_ub)
+    K = StackedOperator(A_eq, A_ub, ub_sign=-1.0, dtype=dtype, backend=backend)
+    assert K.shape == (q_size, c_size), "operator shape does not match c and q"
+    return K.matvec, K.rmatvec, K
 
-    def apply_Kt(y, out=apply_Kt_out):
-        """Apply K^T operator: A_eq^T * y_eq - A_ub^T * y_ub."""
-        out[:] = A_eq.T.dot(y[:A_eq.shape[0]])
-        out[:] -= A_ub.T.dot(y[A_eq.shape[0]:])
-        return out
 
-    K_linop = LinearOperator((q_size, c_size), matvec=apply_K, rmatvec=apply_Kt)
-    return apply_K, apply_Kt, K_linop
\ No newline at end of file
+def create_update_kernels(backend):
+    """Fused elementwise PDHG update kernels for the GPU backend.
+
+    Returns (primal_update, dual_update), or (None, None) on CPU where the
+    workspace falls back to a sequence of in-place ``out=`` ufunc calls.
+    """
+    if not backend.is_gpu:
+        return None, None
+    cp = backend.xp
+    primal_update = cp.ElementwiseKernel(
+        "T x, T Kty, T c, T tau, T lb, T ub", "T new_x, T x_bar",
+        "new_x = min(max(x - tau * (c - Kty), lb), ub); x_bar = 2 * new_x - x;",
+        "pdhg_primal_update")
+    dual_update = cp.ElementwiseKernel(
+        "T q, T Kx, T sigma, int64 n_eq", "T y",
+        "T v = y + sigma * (q - Kx); y = (i >= n_eq && v < 0) ? (T)0 : v;",
+        "pdhg_dual_update")
+    return primal_update, dual_update
@@ -1,49 +1,779 @@
-import cupy as cp
+import math
+import numpy as np
+import scipy.sparse
+from utils.backend import get_backend
+from utils.bounds import DeviceBounds, normalize_bounds
+from utils.convergence import ConvergenceMonitor, StallDetector
+from utils.polish import polish as run_polish
+from utils.presolve import presolve as run_presolve
+from utils.telemetry import NO_TELEMETRY, resolve
 from .gpu_kernels import create_linear_operators
-from .utils import (prepare_gpu_data, initialize_parameters,
-                    initialize_variables, check_convergence)
+from .utils import (prepare_gpu_data, initialize_parameters, InfeasibilityDetector,
+                    PDLPWorkspace, RestartedPDLPWorkspace, check_convergence, operator_key,
+                    preprocess_operator, estimate_spectral_norm)
+
+# Restart criteria on the KKT error (Applegate et al., PDLP)
+RESTART_SUFFICIENT = 0.2
+RESTART_NECESSARY = 0.8
+RESTART_ARTIFICIAL = 0.36
+# Smoothing of the primal weight update
+PRIMAL_WEIGHT_THETA = 0.5
+# Mixed precision: relative accuracy asked of every float32 (correction) solve,
+# iterations without progress before a float32 solve counts as stalled, and
+# the largest growth of the refinement scale factors per pass
+MIXED_INNER_EPS = 1e-5
+MIXED_STALL_ITERS = 5000
+MIXED_MAX_SCALE_GROWTH = 1e6
+# Polishing: loosest tolerance of the first PDLP solve, and how much each
+# failed polish tightens the tolerances before iterating further
+POLISH_START_EPS = 1e-4
+POLISH_TIGHTEN = 10
 
 
 def pdlp_gpu(c, A_ub=None, b_ub=None, A_eq=None, b_eq=None,
              tolcheck=10, eps_pri=1e-6, eps_dual=1e-4, eps_gap=1e-4,
-             eps_ubdd=1e-4, eps_infeas=1e-4, max_itr=100000, dtype=cp.float32):
-    """Primal Dual Hybrid Gradient for Linear Programs on GPU."""
-    # Prepare data
-    c, A_ub, A_eq, q = prepare_gpu_data(c, A_ub, b_ub, A_eq, b_eq, dtype)
+             eps_ubdd=1e-4, eps_infeas=1e-4, max_itr=100000, dtype=np.float32,
+             backend=None, mode="pdhg", full_output=False, ruiz_iters=0,
+             pock_chambolle=False, lb=None, ub=None, presolve=False, mixed_precision=False,
+             max_refinements=10, polish=False, cache=None, telemetry=None):
+    """Primal Dual Hybrid Gradient for Linear Programs on GPU or CPU.
+
+    ``backend`` selects the array backend (``"numpy"`` or ``"cupy"``); by
+    default CuPy is used only when the inputs already live on the GPU.
+
+    ``mode="pdhg"`` runs plain PDHG with the fixed step 0.9/||K||.
+    ``mode="pdlp"`` adds adaptive step sizes, primal weight updates and
+    restarts to the step-size weighted average based on the KKT error.
+
+    ``ruiz_iters`` Ruiz equilibration passes, optionally followed by a
+    Pock-Chambolle pass, precondition K before solving. Solutions and
+    residuals are always returned in the original units.
+
+    ``lb``/``ub`` bound the variables (scalars or (n,) vectors, may be
+    infinite; by default x is free). Bounds are enforced by projecting the
+    primal step onto the box rather than as rows of A_ub, so they add
+    neither dual variables nor SpMV work; ``utils.bounds.singleton_rows_to_bounds``
+    converts existing single-variable rows.
+
+    ``presolve=True`` reduces the LP on the host first (``utils.presolve``)
+    and maps x and y back to the original problem afterwards; ``info`` then
+    also holds the presolve statistics and presolve and solve times.
+
+    ``mixed_precision=True`` iterates in ``dtype`` (float32) but measures
+    convergence in float64 against a float64 copy of the data. While the
+    float64 residuals miss the tolerances, up to ``max_refinements``
+    iterative-refinement passes each solve a rescaled float32 correction LP
+    and add its solution to the float64 iterate, so tolerances far below
+    float32 resolution (1e-8) are reached at float32 bandwidth. x and y are
+    returned in float64. Single (1-D) LPs only.
+
+    ``polish=True`` iterates only to a loose tolerance (``POLISH_START_EPS``)
+    and then polishes: the active set is read off complementarity and the
+    reduced equality systems are solved with a sparse LU on the host
+    (``utils.polish``). If the polished pair misses the tolerances the
+    tolerances are tightened and PDLP continues from where it stopped, so
+    a wrong active-set guess costs iterations, not accuracy. x and y are
+    returned in float64 when polishing succeeds; ``info["polished"]`` and
+    ``info["polish_attempts"]`` report it. Single (1-D) LPs only.
+
+    ``cache`` (an ``utils.operator_cache.OperatorCache``, or True for the
+    shared default) keeps the preprocessed operator (scaled K and K^T, the
+    scaling vectors and ||K||) under a fingerprint of A_eq, A_ub and the
+    preconditioning settings, so re-solving with the same matrix and new
+    c or b skips operator assembly, preconditioning and the norm estimate.
+
+    ``telemetry`` (a ``utils.telemetry.Telemetry``) records every
+    convergence check (residuals, step sizes, elapsed time) and times the
+    transfer, setup, spectral norm, iteration and check phases; its
+    callback sees each check as it happens. Nothing is printed otherwise.
+
+    Batched solves: a ``c`` of shape (n, k) and/or ``b_eq``/``b_ub`` of shape
+    (m, k) solve k LPs sharing the same constraint matrix in one call (1-D
+    vectors are shared by all k). The iteration runs as SpMM, convergence is
+    tracked per column, and converged columns are compacted out. Batched
+    solves use ``mode="pdhg"``; ``x`` and ``info`` entries gain a k axis.
+
+    Single LPs are also checked for infeasibility whenever convergence is
+    checked: normalized iterate differences that form a certificate within
+    ``eps_infeas`` (a dual ray) or ``eps_ubdd`` (a primal ray) stop the solve
+    with status ``"primal_infeasible"`` or ``"dual_infeasible"`` (unbounded),
+    and ``info["certificate"]`` holds the ray in original units. The returned
+    x is then the last iterate and carries no meaning.
+
+    With ``full_output=True`` returns ``(x, info)`` where ``info`` holds the
+    dual solution ``y``, the iteration count, the status (``"optimal"``,
+    ``"primal_infeasible"``, ``"dual_infeasible"``, ``"iteration_limit"``) and
+    final residuals.
+    """
+    if mode not in ("pdhg", "pdlp"):
+        raise ValueError(f"Unknown mode {mode!r}; expected 'pdhg' or 'pdlp'")
+    backend = get_backend(backend, c, A_ub, A_eq)
+    telemetry = resolve(telemetry, backend)
+    if presolve:
+        return _presolved_pdlp(c, A_ub, b_ub, A_eq, b_eq, lb, ub, backend, full_output, dtype,
+                               dict(tolcheck=tolcheck, eps_pri=eps_pri, eps_dual=eps_dual,
+                                    eps_gap=eps_gap, max_itr=max_itr, mode=mode,
+                                    ruiz_iters=ruiz_iters, pock_chambolle=pock_chambolle,
+                                    eps_infeas=eps_infeas, eps_ubdd=eps_ubdd,
+                                    mixed_precision=mixed_precision,
+                                    max_refinements=max_refinements, polish=polish,
+                                    cache=cache, telemetry=telemetry))
+    if polish:
+        if mixed_precision:
+            raise ValueError("polish and mixed_precision cannot be combined")
+        x, info = _polished_pdlp(c, A_ub, b_ub, A_eq, b_eq, lb, ub, dtype, backend, mode,
+                                 ruiz_iters, pock_chambolle, tolcheck, eps_pri, eps_dual, eps_gap,
+                                 max_itr, eps_infeas, eps_ubdd, cache, telemetry)
+        return (x, info) if full_output else x
+    if mixed_precision:
+        x, info = _mixed_precision_pdlp(c, A_ub, b_ub, A_eq, b_eq, lb, ub, dtype, backend, mode,
+                                        ruiz_iters, pock_chambolle, tolcheck, eps_pri, eps_dual,
+                                        eps_gap, max_itr, max_refinements, eps_infeas, eps_ubdd,
+                                        cache, telemetry)
+        return (x, info) if full_output else x
+
+    if np.ndim(c) == 2 and mode != "pdhg":
+        raise ValueError("Batched (n, k) problems are only supported with mode='pdhg'")
+
+    # Prepare data; the cache key hashes the caller's (host) matrices, before the transfer
+    key = operator_key(A_eq, A_ub, dtype, ruiz_iters, pock_chambolle) if cache else None
+    with telemetry.phase("transfer"):
+        c, A_ub, A_eq, q = prepare_gpu_data(c, A_ub, b_ub, A_eq, b_eq, dtype, backend)
+
+    with telemetry.phase("setup"):
+        # Setup linear operators, with optional diagonal preconditioning (possibly cached)
+        K, scaling, norm = preprocess_operator(A_eq, A_ub, c.shape[0], q.shape[0], dtype,
+                                               backend, ruiz_iters, pock_chambolle, cache, key,
+                                               telemetry)
+
+        # Relative criteria stay in original units
+        c_norm, q_norm = backend.xp.linalg.norm(c, axis=0), backend.xp.linalg.norm(q, axis=0)
+        if scaling is not None:
+            c, q = scaling.scale_primal(c), scaling.scale_dual(q)
+        bounds = DeviceBounds.create(lb, ub, c.shape[0], dtype, backend, scaling)
+
+        # Initialize parameters
+        eta, tau, sigma, _, _ = initialize_parameters(c, q, K, dtype, backend, norm)
+
+        detector = None
+        if c.ndim == 1:
+            detector = InfeasibilityDetector(K, c, q, b_eq.shape[0], eps_infeas, eps_ubdd,
+                                             scaling, bounds)
+
+    if mode == "pdlp":
+        c_norm, q_norm = float(c_norm), float(q_norm)
+        ws = RestartedPDLPWorkspace(c.shape[0], q.shape[0], b_eq.shape[0], dtype, backend, bounds)
+        with telemetry.phase("iterations"):
+            info = _restarted_pdlp(ws, c, q, K, float(eta), _initial_primal_weight(c_norm, q_norm),
+                                   c_norm, q_norm, tolcheck, eps_pri, eps_dual, eps_gap,
+                                   max_itr, scaling, detector=detector, telemetry=telemetry)
+    else:
+        tau, sigma = np.dtype(dtype).type(float(tau)), np.dtype(dtype).type(float(sigma))
+        if c.ndim == 2:
+            with telemetry.phase("iterations"):
+                x, info = _batched_pdhg(c, q, K, b_eq.shape[0], tau, sigma, c_norm, q_norm,
+                                        tolcheck, eps_pri, eps_dual, eps_gap, max_itr, dtype,
+                                        backend, scaling, bounds, telemetry)
+            return (x, info) if full_output else x
+
+        # Initialize variables; every vector the iteration touches is preallocated
+        ws = PDLPWorkspace(c.shape[0], q.shape[0], b_eq.shape[0], dtype, backend, bounds=bounds)
+        with telemetry.phase("iterations"):
+            info = _pdhg(ws, c, q, K, tau, sigma, c_norm, q_norm, tolcheck, eps_pri, eps_dual,
+                         eps_gap, max_itr, scaling, detector=detector, telemetry=telemetry)
+
+    if scaling is not None:
+        scaling.unscale_primal(ws.x, out=ws.x)
+        scaling.unscale_dual(ws.y, out=ws.y)
+    return (ws.x, {"y": ws.y, **info}) if full_output else ws.x
+
+
+def _presolved_pdlp(c, A_ub, b_ub, A_eq, b_eq, lb, ub, backend, full_output, dtype, options):
+    """``pdlp_gpu`` on the presolved LP, with the solution postsolved.
+
+    An infeasibility certificate, if any, refers to the presolved LP.
+    """
+    if np.ndim(c) != 1:
+        raise ValueError("presolve supports a single (1-D) LP only")
+    to_host = backend.to_host
+    reduced = run_presolve(to_host(c), to_host(A_ub), to_host(b_ub), to_host(A_eq), to_host(b_eq),
+                           lb, ub)
+    stats = reduced.stats
+    options["telemetry"].event(
+        "presolve", f"Presolve took {reduced.time:.4f} seconds: "
+        + ", ".join(f"{k} {stats[k][0]} -> {stats[k][1]}" for k in ("rows", "columns", "nnz")),
+        seconds=reduced.time, stats=stats)
+
+    start = backend.timer()
+    problem = reduced.problem
+    if problem["c"].size:
+        x, info = pdlp_gpu(**problem, dtype=dtype, backend=backend, full_output=True, **options)
+        x, y = reduced.postsolve(to_host(x), to_host(info["y"]))
+    else:
+        # Presolve fixed every variable
+        info = {"iterations": 0, "status": "optimal", "primal_feas": 0.0, "dual_feas": 0.0,
+                "dual_gap": 0.0}
+        x, y = reduced.postsolve(np.zeros(0), np.zeros(problem["b_eq"].size + problem["b_ub"].size))
+    info.update(y=backend.asarray(y, dtype), presolve=stats, presolve_time=reduced.time,
+                solve_time=backend.timer() - start)
+    x = backend.asarray(x, dtype)
+    return (x, info) if full_output else x
+
+
+class PDLPSolver:
+    """Persistent PDLP solver for sequences of closely related LPs.
+
+    Keeps the backend-resident operator, the preconditioning, the step sizes
+    and the last (x, y) between solves. After ``update_c``, ``update_b`` or
+    ``update_matrix_values`` a re-solve skips the data transfer, operator
+    assembly and spectral norm estimate, and warm-starts from the previous
+    solution, which pays off in receding-horizon use where consecutive LPs
+    differ only slightly.
+
+    Arguments match ``pdlp_gpu``; only single (1-D) LPs are supported.
+    """
+
+    def __init__(self, c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, dtype=np.float32,
+                 backend=None, mode="pdhg", ruiz_iters=0, pock_chambolle=False, lb=None, ub=None,
+                 cache=None, telemetry=None):
+        if mode not in ("pdhg", "pdlp"):
+            raise ValueError(f"Unknown mode {mode!r}; expected 'pdhg' or 'pdlp'")
+        if np.ndim(c) != 1:
+            raise ValueError("PDLPSolver solves a single LP; use pdlp_gpu for batched (n, k) data")
+        self.backend = get_backend(backend, c, A_ub, A_eq)
+        self.dtype = np.dtype(dtype)
+        self.mode = mode
+        self.telemetry = resolve(telemetry, self.backend)
+        xp = self.backend.xp
+
+        # Host-side blocks are kept so update_matrix_values can replace just one of them
+        self._A_eq, self._A_ub = A_eq, A_ub
+        key = operator_key(A_eq, A_ub, dtype, ruiz_iters, pock_chambolle) if cache else None
+        with self.telemetry.phase("transfer"):
+            c, A_ub, A_eq, q = prepare_gpu_data(c, A_ub, b_ub, A_eq, b_eq, dtype, self.backend)
+        with self.telemetry.phase("setup"):
+            self.K, self.scaling, norm = preprocess_operator(
+                A_eq, A_ub, c.shape[0], q.shape[0], dtype, self.backend, ruiz_iters,
+                pock_chambolle, cache, key, self.telemetry)
+            self.n_eq = self.K.n_eq
+
+            # Problem data in original units (c may alias the caller's array on the
+            # NumPy backend, so it is copied), and the scaled copies the iteration uses
+            self.c_orig, self.q_orig = c.copy(), q
+            self.c, self.q = xp.empty_like(c), xp.empty_like(q)
+            self._scale_data()
+            self._estimate_steps(norm)
+
+        bounds = DeviceBounds.create(lb, ub, c.shape[0], dtype, self.backend, self.scaling)
+        if mode == "pdlp":
+            self.ws = RestartedPDLPWorkspace(c.shape[0], q.shape[0], self.n_eq, dtype, self.backend,
+                                             bounds)
+        else:
+            self.ws = PDLPWorkspace(c.shape[0], q.shape[0], self.n_eq, dtype, self.backend,
+                                    bounds=bounds)
+        self.info = None
+
+    def _scale_data(self):
+        """Refresh the norms and scaled copies of c and q after an update."""
+        xp = self.backend.xp
+        self.c_norm = float(xp.linalg.norm(self.c_orig))
+        self.q_norm = float(xp.linalg.norm(self.q_orig))
+        if self.scaling is None:
+            self.c[...] = self.c_orig
+            self.q[...] = self.q_orig
+        else:
+            self.scaling.scale_primal(self.c_orig, out=self.c)
+            self.scaling.scale_dual(self.q_orig, out=self.q)
+
+    def _estimate_steps(self, norm=None):
+        """Estimate ||K|| (unless known) and derive the initial step sizes."""
+        if norm is None:
+            with self.telemetry.phase("spectral_norm"):
+                norm = estimate_spectral_norm(self.K, dtype=self.dtype, backend=self.backend)
+        eta, tau, sigma, _, _ = initialize_parameters(self.c, self.q, self.K, self.dtype,
+                                                      self.backend, norm)
+        self.eta = float(eta)
+        self.tau, self.sigma = self.dtype.type(float(tau)), self.dtype.type(float(sigma))
+
+    def _vector(self, v, size, name):
+        v = self.backend.asarray(v, self.dtype)
+        if v.shape != (size,):
+            raise ValueError(f"{name} must have shape ({size},), got {v.shape}")
+        return v
+
+    def update_c(self, c):
+        """Replace the cost vector."""
+        self.c_orig[...] = self._vector(c, self.c_orig.shape[0], "c")
+        self._scale_data()
+
+    def update_b(self, b_ub=None, b_eq=None):
+        """Replace the inequality and/or equality right-hand sides."""
+        if b_eq is not None:
+            self.q_orig[:self.n_eq] = self._vector(b_eq, self.n_eq, "b_eq")
+        if b_ub is not None:
+            self.q_orig[self.n_eq:] = -self._vector(b_ub, self.q_orig.shape[0] - self.n_eq, "b_ub")
+        self._scale_data()
+
+    def update_matrix_values(self, A_ub=None, A_eq=None):
+        """Replace the values of A_ub and/or A_eq, keeping their sparsity pattern.
+
+        K is overwritten in place and ||K|| re-estimated. An existing
+        preconditioning keeps its (now slightly stale) scaling vectors, which
+        stays valid: only the conditioning, not the solution, depends on them.
+        """
+        self._A_eq = self._A_eq if A_eq is None else A_eq
+        self._A_ub = self._A_ub if A_ub is None else A_ub
+        self.K.set_values(self._A_eq, self._A_ub)
+        if self.scaling is not None:
+            self.K.scale(self.scaling.row, self.scaling.col)
+        self._estimate_steps()
+
+    def update_bounds(self, lb=None, ub=None):
+        """Replace the variable bounds (None: unbounded on that side)."""
+        self.ws.set_bounds(DeviceBounds.create(lb, ub, self.c.shape[0], self.dtype, self.backend,
+                                               self.scaling))
+
+    def solve(self, max_iter=100000, tolcheck=10, eps_pri=1e-6, eps_dual=1e-4, eps_gap=1e-4,
+              warm_start=True, stall_iters=None, eps_infeas=1e-4, eps_ubdd=1e-4):
+        """Solve the current LP and return ``(x, y)`` in original units.
 
-    # Setup linear operators
-    apply_K, apply_Kt, K_linop = create_linear_operators(A_eq, A_ub, c.shape[0],
-                                                         q.shape[0], dtype)
+        With ``warm_start`` the iteration starts from the previous solution,
+        otherwise from zero. In ``mode="pdlp"`` the adaptive step size and
+        primal weight restart from their initial values either way, which
+        measured slightly better than carrying them over. Statistics of the
+        solve are left in ``self.info``. With ``stall_iters`` the solve also
+        stops (status ``"stalled"``) once that many iterations pass without
+        the worst residual/tolerance ratio improving by 10%. Infeasible and
+        unbounded LPs stop with a certificate as in ``pdlp_gpu``.
+        """
+        ws = self.ws
+        if not warm_start or self.info is None:
+            ws.x[...] = 0
+            ws.y[...] = 0
+        detector = InfeasibilityDetector(self.K, self.c, self.q, self.n_eq, eps_infeas, eps_ubdd,
+                                         self.scaling, ws.bounds)
 
-    # Initialize parameters
-    eta, tau, sigma, c_norm, q_norm = initialize_parameters(c, q, K_linop, dtype)
-    print("eta estimate is:", eta)
+        with self.telemetry.phase("iterations"):
+            if self.mode == "pdlp":
+                self.info = _restarted_pdlp(ws, self.c, self.q, self.K, self.eta,
+                                            _initial_primal_weight(self.c_norm, self.q_norm),
+                                            self.c_norm, self.q_norm, tolcheck, eps_pri, eps_dual,
+                                            eps_gap, max_iter, self.scaling, stall_iters, detector,
+                                            self.telemetry)
+            else:
+                self.info = _pdhg(ws, self.c, self.q, self.K, self.tau, self.sigma, self.c_norm,
+                                  self.q_norm, tolcheck, eps_pri, eps_dual, eps_gap, max_iter,
+                                  self.scaling, stall_iters, detector, self.telemetry)
 
-    # Initialize variables
-    x, y, new_x = initialize_variables(c.shape[0], q.shape[0], dtype)
+        x, y = ws.x.copy(), ws.y.copy()
+        if self.scaling is not None:
+            self.scaling.unscale_primal(x, out=x)
+            self.scaling.unscale_dual(y, out=y)
+        return x, y
 
-    # Main iteration
+
+def _mixed_precision_pdlp(c, A_ub, b_ub, A_eq, b_eq, lb, ub, dtype, backend, mode, ruiz_iters,
+                          pock_chambolle, tolcheck, eps_pri, eps_dual, eps_gap, max_itr,
+                          max_refinements, eps_infeas=1e-4, eps_ubdd=1e-4, cache=None,
+                          telemetry=NO_TELEMETRY):
+    """Low-precision PDLP with float64 residuals and iterative refinement.
+
+    After a float32 solve of the LP, each pass measures the float64 residuals
+    of (x, y) and solves the correction LP (Gleixner et al.) in float32
+
+        min  alpha_d lambda^T dx   s.t.  K' dx = alpha_p r,
+             alpha_p (lb' - x') <= dx <= alpha_p (ub' - x')
+
+    with reduced costs lambda = c' - K'^T y and primal residual r, then
+    updates x' += dx / alpha_p, y' += dy / alpha_d in float64. The scale
+    factors blow the remaining error up to order one (the primal and dual
+    violations, floored at sqrt(|gap|) so that the complementarity error is
+    scaled up as well), so every pass gains the float32 accuracy again. A
+    pass that does not improve the iterate is discarded and ends refinement.
+    Corrections run on the slack form K' = [A_eq 0; A_ub I], whose rows are
+    all equalities: a correction may
+    then lower an inequality multiplier, which the sign constraint y_ub >= 0
+    of the original form would not allow.
+    """
+    xp = backend.xp
+    f32 = dict(tolcheck=tolcheck, eps_pri=max(eps_pri, MIXED_INNER_EPS),
+               eps_dual=max(eps_dual, MIXED_INNER_EPS), eps_gap=max(eps_gap, MIXED_INNER_EPS),
+               max_iter=max_itr, stall_iters=MIXED_STALL_ITERS)
+    solver = PDLPSolver(c, A_ub, b_ub, A_eq, b_eq, dtype, backend, mode, ruiz_iters, pock_chambolle,
+                        lb, ub, cache, telemetry)
+    x, y = solver.solve(**f32, eps_infeas=eps_infeas, eps_ubdd=eps_ubdd)
+    iterations = solver.info["iterations"]
+    if "certificate" in solver.info:
+        return x.astype(np.float64), {**solver.info, "y": y.astype(np.float64), "refinements": 0}
+
+    # float64 copies of the data measure the residuals
+    with telemetry.phase("transfer"):
+        c64, A_ub64, A_eq64, q64 = prepare_gpu_data(c, A_ub, b_ub, A_eq, b_eq, np.float64,
+                                                    backend)
+    _, _, K64 = create_linear_operators(A_eq64, A_ub64, c64.shape[0], q64.shape[0], np.float64,
+                                        backend)
+    n, n_eq, m = c64.shape[0], K64.n_eq, q64.shape[0]
+    lb, ub = normalize_bounds(lb, ub, n)
+    bounds64 = DeviceBounds.create(lb, ub, n, np.float64, backend)
+    c_norm, q_norm = float(xp.linalg.norm(c64)), float(xp.linalg.norm(q64))
+    x, y = x.astype(np.float64), y.astype(np.float64)
+    correction = best = None
+    alpha_p = alpha_d = 1.0
+
+    for refinement in range(max_refinements + 1):
+        with telemetry.phase("checks"):
+            p_feas, d_feas, dual_gap = (float(v) for v in check_convergence(
+                x, y, c64, q64, K64.matvec, K64.rmatvec, c_norm, q_norm, eps_pri, eps_dual,
+                eps_gap, n_eq, backend, bounds=bounds64))
+        telemetry.event("mixed_precision",
+                        f"Refinement {refinement}: float64 primal_feas {p_feas:.2e} "
+                        f"dual_feas {d_feas:.2e} gap {dual_gap:.2e}", refinement=refinement,
+                        primal_feas=p_feas, dual_feas=d_feas, dual_gap=dual_gap)
+        ratio = max(p_feas / eps_pri, d_feas / eps_dual, dual_gap / eps_gap)
+        if best is not None and not ratio < best[0]:
+            telemetry.event("mixed_precision",
+                            "Refinement made no progress; keeping the previous iterate")
+            ratio, x, y, p_feas, d_feas, dual_gap = best
+            break
+        best = (ratio, x, y, p_feas, d_feas, dual_gap)
+        if ratio < 1 or refinement == max_refinements:
+            break
+
+        if correction is None:
+            # Slack form: [A_eq 0; A_ub I] [x; s] = [b_eq; b_ub], s >= 0
+            to_host = backend.to_host
+            sparse = scipy.sparse.issparse(to_host(A_eq)) or scipy.sparse.issparse(to_host(A_ub))
+            m_ub = m - n_eq
+            A_slack = scipy.sparse.bmat(
+                [[scipy.sparse.csr_matrix(to_host(A_eq)), None],
+                 [scipy.sparse.csr_matrix(to_host(A_ub)), scipy.sparse.identity(m_ub)]],
+                format="csr")
+            A_slack = A_slack if sparse else A_slack.toarray()
+            empty = scipy.sparse.csr_matrix((0, n + m_ub)) if sparse else np.zeros((0, n + m_ub))
+            lb_slack = backend.asarray(np.concatenate((lb, np.zeros(m_ub))), np.float64)
+            ub_slack = backend.asarray(np.concatenate((ub, np.full(m_ub, np.inf))), np.float64)
+            correction = PDLPSolver(np.zeros(n + m_ub), empty, np.zeros(0), A_slack,
+                                    np.zeros(m), dtype, backend, mode, ruiz_iters,
+                                    pock_chambolle, lb_slack, ub_slack, telemetry=telemetry)
+
+        # Residuals in float64; the slack s = b_ub - A_ub x absorbs the inequality residual
+        r = q64 - K64.matvec(x)
+        reduced_costs = c64 - K64.rmatvec(y)
+        x_slack = xp.concatenate((x, -r[n_eq:]))
+        y_slack = xp.concatenate((y[:n_eq], -y[n_eq:]))
+        r[n_eq:] = 0
+        primal_violation = max(float(xp.abs(r).max(initial=0)),
+                               float(xp.maximum(lb_slack - x_slack, 0).max(initial=0)))
+        dual_violation = reduced_costs.copy()
+        bound_term = 0.0 if bounds64 is None else float(bounds64.dual_residual(dual_violation))
+        dual_violation = float(xp.abs(dual_violation).max(initial=0))
+        gap_floor = math.sqrt(abs(float(q64 @ y) + bound_term - float(c64 @ x)))
+        alpha_p = min(1 / max(primal_violation, gap_floor, 1e-300), MIXED_MAX_SCALE_GROWTH * alpha_p)
+        alpha_d = min(1 / max(dual_violation, gap_floor, 1e-300), MIXED_MAX_SCALE_GROWTH * alpha_d)
+
+        correction.update_c(alpha_d * xp.concatenate((reduced_costs, y[n_eq:])))
+        correction.update_b(b_eq=alpha_p * r)
+        correction.update_bounds(alpha_p * (lb_slack - x_slack), alpha_p * (ub_slack - x_slack))
+        dx, dy = correction.solve(warm_start=False, **f32)
+        iterations += correction.info["iterations"]
+        x_slack += dx / alpha_p
+        y_slack += dy / alpha_d
+        x = xp.clip(x_slack[:n], bounds64.lb, bounds64.ub) if bounds64 is not None else x_slack[:n]
+        y = xp.concatenate((y_slack[:n_eq], xp.maximum(-y_slack[n_eq:], 0)))
+
+    status = "optimal" if ratio < 1 else "iteration_limit"
+    return x, {"y": y, "iterations": iterations, "status": status, "primal_feas": p_feas,
+               "dual_feas": d_feas, "dual_gap": dual_gap, "refinements": refinement}
+
+
+def _polished_pdlp(c, A_ub, b_ub, A_eq, b_eq, lb, ub, dtype, backend, mode, ruiz_iters,
+                   pock_chambolle, tolcheck, eps_pri, eps_dual, eps_gap, max_itr, eps_infeas,
+                   eps_ubdd, cache=None, telemetry=NO_TELEMETRY):
+    """PDLP to a loose tolerance, then active-set polishing; tighten and continue on failure."""
+    if np.ndim(c) != 1:
+        raise ValueError("polish supports a single (1-D) LP only")
+    to_host = backend.to_host
+    host = dict(c=to_host(c), A_ub=to_host(A_ub), b_ub=to_host(b_ub), A_eq=to_host(A_eq),
+                b_eq=to_host(b_eq), lb=lb, ub=ub)
+    target = (eps_pri, eps_dual, eps_gap)
+    inner = [max(eps, POLISH_START_EPS) for eps in target]
+    solver = PDLPSolver(c, A_ub, b_ub, A_eq, b_eq, dtype, backend, mode, ruiz_iters, pock_chambolle,
+                        lb, ub, cache, telemetry)
+    iterations = attempts = 0
+    while True:
+        x, y = solver.solve(max_iter=max_itr - iterations, tolcheck=tolcheck, eps_pri=inner[0],
+                            eps_dual=inner[1], eps_gap=inner[2], eps_infeas=eps_infeas,
+                            eps_ubdd=eps_ubdd)
+        info = solver.info
+        iterations += info["iterations"]
+        if info["status"] != "optimal":
+            break
+        attempts += 1
+        x_pol, y_pol, stats = run_polish(**host, x=to_host(x), y=to_host(y), eps_pri=eps_pri,
+                                         eps_dual=eps_dual, eps_gap=eps_gap)
+        telemetry.event("polish", f"Polish {attempts} after {iterations} iterations: "
+                        f"{'success' if stats['success'] else 'failed'}, primal_feas "
+                        f"{stats['primal_feas']:.2e} dual_feas {stats['dual_feas']:.2e} "
+                        f"gap {stats['dual_gap']:.2e}", attempt=attempts, **stats)
+        if stats["success"]:
+            return backend.asarray(x_pol, np.float64), {
+                **info, "y": backend.asarray(y_pol, np.float64), "iterations": iterations,
+                "primal_feas": stats["primal_feas"], "dual_feas": stats["dual_feas"],
+                "dual_gap": stats["dual_gap"], "polished": True, "polish_attempts": attempts}
+        if inner == list(target) or iterations >= max_itr:
+            break
+        inner = [max(i / POLISH_TIGHTEN, eps) for i, eps in zip(inner, target)]
+    # Optimal at a loose tolerance only means the iteration budget ran out
+    status = info["status"]
+    if status == "optimal" and inner != list(target):
+        status = "iteration_limit"
+    return x, {**info, "y": y, "iterations": iterations, "status": status, "polished": False,
+               "polish_attempts": attempts}
+
+
+def _initial_primal_weight(c_norm, q_norm):
+    """PDLP's starting primal weight ||c|| / ||q|| (1 when either is zero)."""
+    return c_norm / q_norm if c_norm > 0 and q_norm > 0 else 1.0
+
+
+def _pdhg(ws, c, q, K, tau, sigma, c_norm, q_norm, tolcheck, eps_pri, eps_dual, eps_gap,
+          max_itr, scaling=None, stall_iters=None, detector=None, telemetry=NO_TELEMETRY):
+    """Plain PDHG (``mode="pdhg"``) from the iterate held in ``ws``.
+
+    Convergence is screened with residuals built from the step's own
+    products (no SpMV), read back asynchronously on an adaptive schedule;
+    only a passing screen triggers the exact, synchronizing check. Leaves
+    the final iterate in ``ws`` (in scaled units) and returns the iteration
+    count, status and final residuals. Every screen that fails also runs the
+    ``detector``, if any, on the current iterate.
+    """
+    monitor = ConvergenceMonitor(ws.backend, tolcheck)
+    stall = StallDetector(stall_iters) if stall_iters else None
+    status = "iteration_limit"
+    certificate = None
     for itr in range(max_itr):
-        # Update steps
-        new_x[:] = x - tau * (c - apply_Kt(y))
-        y += sigma * (q - apply_K(2 * new_x - x))
-        y[b_eq.shape[0]:] = cp.maximum(0, y[b_eq.shape[0]:])  # Projection
-        x[:] = new_x
+        # Update steps (in place, including extrapolation and projection)
+        ws.step(K, c, q, tau, sigma)
 
         # Check convergence
-        if itr % tolcheck == 0:
+        if monitor.due(itr):
+            monitor.submit(itr, ws.screen_stats(c, q, scaling))
+        polled = monitor.poll()
+        if polled is None:
+            continue
+        check_itr, (p_sq, d_sq, qty, cx) = polled
+        p_feas_gap = math.sqrt(p_sq) / (1 + q_norm)
+        d_feas_gap = math.sqrt(d_sq) / (1 + c_norm)
+        dual_gap = abs(qty - cx) / (1 + abs(cx) + abs(qty))
+        if telemetry.enabled:
+            telemetry.check("pdhg", check_itr, primal_feas=p_feas_gap, dual_feas=d_feas_gap,
+                            dual_gap=dual_gap, tau=float(tau), sigma=float(sigma), exact=False)
+        ratio = max(p_feas_gap / eps_pri, d_feas_gap / eps_dual, dual_gap / eps_gap)
+        monitor.update(check_itr, ratio)
+        if stall is not None and stall.update(check_itr, ratio):
+            telemetry.event("pdhg", "Residuals stalled")
+            status = "stalled"
+            break
+
+        if p_feas_gap < eps_pri and d_feas_gap < eps_dual and dual_gap < eps_gap:
+            with telemetry.phase("checks"):
+                p_feas_gap, d_feas_gap, dual_gap = check_convergence(
+                    ws.x, ws.y, c, q, K.matvec, K.rmatvec, c_norm, q_norm,
+                    eps_pri, eps_dual, eps_gap, ws.n_eq, ws.backend, ws, scaling, ws.bounds
+                )
+            if telemetry.enabled:
+                telemetry.check("pdhg", check_itr, primal_feas=float(p_feas_gap),
+                                dual_feas=float(d_feas_gap), dual_gap=float(dual_gap),
+                                tau=float(tau), sigma=float(sigma), exact=True)
+            if p_feas_gap < eps_pri and d_feas_gap < eps_dual and dual_gap < eps_gap:
+                telemetry.event("pdhg", "We're optimal. Terminating...")
+                status = "optimal"
+                break
+        if detector is not None:
+            with telemetry.phase("checks"):
+                certificate = detector.check(ws.x, ws.y)
+            if certificate is not None:
+                status, certificate = certificate
+                telemetry.event("pdhg", f"Certificate found: {status.replace('_', ' ')}. "
+                                "Terminating...")
+                break
+
+    if status != "optimal":
+        if status == "iteration_limit":
+            telemetry.event("pdhg", "Iteration limit hit")
+        with telemetry.phase("checks"):
             p_feas_gap, d_feas_gap, dual_gap = check_convergence(
-                x, y, c, q, apply_K, apply_Kt, c_norm, q_norm,
-                eps_pri, eps_dual, eps_gap, b_eq.shape[0]
+                ws.x, ws.y, c, q, K.matvec, K.rmatvec, c_norm, q_norm,
+                eps_pri, eps_dual, eps_gap, ws.n_eq, ws.backend, ws, scaling, ws.bounds
             )
-            print("| itr | primal_feas |  dual_feas  | primal/dual gap |")
-            print(f"{itr:5d} {p_feas_gap:.2e} {d_feas_gap:.2e} {dual_gap:.2e}")
+    info = {"iterations": itr + 1, "status": status, "primal_feas": float(p_feas_gap),
+            "dual_feas": float(d_feas_gap), "dual_gap": float(dual_gap)}
+    if certificate is not None:
+        info["certificate"] = certificate
+    return info
 
-            if p_feas_gap < eps_pri and d_feas_gap < eps_dual and dual_gap < eps_gap:
-                print("We're optimal. Terminating...")
+
+def _restarted_pdlp(ws, c, q, K, eta, omega, c_norm, q_norm, tolcheck, eps_pri, eps_dual,
+                    eps_gap, max_itr, scaling=None, stall_iters=None, detector=None,
+                    telemetry=NO_TELEMETRY):
+    """Adaptive-step, restarted PDHG with primal weight updates (``mode="pdlp"``).
+
+    Starts from the iterate held in ``ws`` with step size ``eta`` and primal
+    weight ``omega``; returns them updated alongside the usual statistics.
+    """
+    ws.reset(K)
+    stall = StallDetector(stall_iters) if stall_iters else None
+
+    def kkt_error(norms, omega):
+        p_norm, d_norm, qty, cx = norms
+        return math.sqrt(omega ** 2 * p_norm ** 2 + d_norm ** 2 / omega ** 2 + (qty - cx) ** 2)
+
+    norms = ws.residual_norms(c, q, scaling=scaling)
+    kkt_last_restart = kkt_prev_candidate = kkt_error(norms, omega)
+    itr_since_restart = 0
+    steps = 0
+    status = "iteration_limit"
+    certificate = None
+    p_feas_gap = d_feas_gap = dual_gap = np.inf
+
+    for itr in range(max_itr):
+        # Adaptive step: shrink eta until it satisfies the local step-size limit
+        while True:
+            steps += 1
+            eta_limit = ws.step(K, c, q, eta, omega)
+            eta_next = min((1 - (steps + 1) ** -0.3) * eta_limit,
+                           (1 + (steps + 1) ** -0.6) * eta)
+            if eta <= eta_limit:
+                ws.accept(K, eta)
+                eta = eta_next
                 break
+            eta = eta_next
+        itr_since_restart += 1
+
+        if itr % tolcheck != 0:
+            continue
+
+        # Restart candidate: whichever of the current and average iterate has smaller KKT error
+        with telemetry.phase("checks"):
+            norms_cur = ws.residual_norms(c, q, scaling=scaling)
+            norms_avg = ws.residual_norms(c, q, average=True, scaling=scaling)
+        use_average = kkt_error(norms_avg, omega) < kkt_error(norms_cur, omega)
+        norms = norms_avg if use_average else norms_cur
+        kkt_candidate = kkt_error(norms, omega)
+
+        p_norm, d_norm, qty, cx = norms
+        p_feas_gap = p_norm / (1 + q_norm)
+        d_feas_gap = d_norm / (1 + c_norm)
+        dual_gap = abs(qty - cx) / (1 + abs(cx) + abs(qty))
+        if telemetry.enabled:
+            telemetry.check("pdlp", itr, primal_feas=p_feas_gap, dual_feas=d_feas_gap,
+                            dual_gap=dual_gap, step_size=eta, primal_weight=omega,
+                            average=use_average)
+
+        if p_feas_gap < eps_pri and d_feas_gap < eps_dual and dual_gap < eps_gap:
+            telemetry.event("pdlp", "We're optimal. Terminating...")
+            if use_average:
+                ws.restart(True)
+            status = "optimal"
+            break
+        if stall is not None and stall.update(
+                itr, max(p_feas_gap / eps_pri, d_feas_gap / eps_dual, dual_gap / eps_gap)):
+            telemetry.event("pdlp", "Residuals stalled")
+            if use_average:
+                ws.restart(True)
+            status = "stalled"
+            break
+        if detector is not None:
+            with telemetry.phase("checks"):
+                certificate = detector.check(ws.x, ws.y)
+            if certificate is not None:
+                status, certificate = certificate
+                telemetry.event("pdlp", f"Certificate found: {status.replace('_', ' ')}. "
+                                "Terminating...")
+                break
+
+        if (kkt_candidate <= RESTART_SUFFICIENT * kkt_last_restart
+                or (kkt_candidate <= RESTART_NECESSARY * kkt_last_restart
+                    and kkt_candidate > kkt_prev_candidate)
+                or itr_since_restart >= RESTART_ARTIFICIAL * (itr + 1)):
+            dx_norm, dy_norm = ws.restart(use_average)
+            if dx_norm > 1e-10 and dy_norm > 1e-10:
+                omega = math.exp(PRIMAL_WEIGHT_THETA * math.log(dy_norm / dx_norm)
+                                 + (1 - PRIMAL_WEIGHT_THETA) * math.log(omega))
+            kkt_last_restart = kkt_candidate = kkt_error(norms, omega)
+            itr_since_restart = 0
+        kkt_prev_candidate = kkt_candidate
+
+    if status == "iteration_limit":
+        telemetry.event("pdlp", "Iteration limit hit")
+    info = {"iterations": itr + 1, "status": status, "primal_feas": p_feas_gap,
+            "dual_feas": d_feas_gap, "dual_gap": dual_gap, "omega": omega, "eta": eta,
+            "step_attempts": steps}
+    if certificate is not None:
+        info["certificate"] = certificate
+    return info
+
+
+def _batched_pdhg(c, q, K, n_eq, tau, sigma, c_norm, q_norm, tolcheck, eps_pri, eps_dual,
+                  eps_gap, max_itr, dtype, backend, scaling=None, bounds=None,
+                  telemetry=NO_TELEMETRY):
+    """PDHG on k LPs sharing K: one SpMM per operator application.
+
+    Columns that meet the tolerances are written out and compacted away so
+    the remaining iterations only pay for LPs that are still running.
+    """
+    xp = backend.xp
+    n_lps = c.shape[1]
+    x_out, y_out = xp.zeros_like(c), xp.zeros_like(q)
+    iterations = np.full(n_lps, max_itr)
+    status = np.array(["iteration_limit"] * n_lps, dtype=object)
+    p_out, d_out, g_out = (np.full(n_lps, np.inf) for _ in range(3))
+
+    active = np.arange(n_lps)
+    ws = PDLPWorkspace(c.shape[0], q.shape[0], n_eq, dtype, backend, n_lps, bounds)
+    for itr in range(max_itr):
+        ws.step(K, c, q, tau, sigma)
+
+        if itr % tolcheck != 0:
+            continue
+        with telemetry.phase("checks"):
+            p_feas_gap, d_feas_gap, dual_gap = (backend.to_host(v) for v in check_convergence(
+                ws.x, ws.y, c, q, K.matvec, K.rmatvec, c_norm, q_norm,
+                eps_pri, eps_dual, eps_gap, n_eq, backend, ws, scaling, bounds))
+        p_out[active], d_out[active], g_out[active] = p_feas_gap, d_feas_gap, dual_gap
+        done = (p_feas_gap < eps_pri) & (d_feas_gap < eps_dual) & (dual_gap < eps_gap)
+        if telemetry.enabled:
+            telemetry.check("pdhg_batched", itr, active=int(active.size),
+                            converged=int(done.sum()), primal_feas=float(p_feas_gap.max()),
+                            dual_feas=float(d_feas_gap.max()), dual_gap=float(dual_gap.max()),
+                            tau=float(tau), sigma=float(sigma))
+        if not done.any():
+            continue
+
+        # Retire converged columns and compact the rest
+        finished, done_dev = backend.asarray(active[done]), backend.asarray(done)
+        x_out[:, finished] = ws.x[:, done_dev]
+        y_out[:, finished] = ws.y[:, done_dev]
+        iterations[active[done]] = itr + 1
+        status[active[done]] = "optimal"
+        keep = ~done
+        active = active[keep]
+        if active.size == 0:
+            break
+        keep_dev = backend.asarray(keep)
+        ws = ws.compact(keep)
+        c, q = xp.ascontiguousarray(c[:, keep_dev]), xp.ascontiguousarray(q[:, keep_dev])
+        c_norm, q_norm = c_norm[keep_dev], q_norm[keep_dev]
 
-    if itr == max_itr - 1:
-        print("Iteration limit hit")
+    if active.size:
+        telemetry.event("pdhg_batched", f"Iteration limit hit for {active.size} LPs")
+        running = backend.asarray(active)
+        x_out[:, running] = ws.x
+        y_out[:, running] = ws.y
 
-    return x
\ No newline at end of file
+    if scaling is not None:
+        scaling.unscale_primal(x_out, out=x_out)
+        scaling.unscale_dual(y_out, out=y_out)
+    info = {"y": y_out, "iterations": iterations, "status": list(status),
+            "primal_feas": p_out, "dual_feas": d_out, "dual_gap": g_out}
+    return x_out, info
@@ -1,41 +1,100 @@
-import cupy as cp
 import numpy as np
-import scipy.sparse
-import cupyx.scipy.sparse
-import time
+from utils.backend import get_backend
+from utils.matrix_operations import StackedOperator, broadcast_columns
+from utils.operator_cache import default_cache, fingerprint
+from utils.scaling import DiagonalScaling, precondition
+from utils.telemetry import NO_TELEMETRY
+from .gpu_kernels import create_linear_operators, create_update_kernels
 
 
-def prepare_gpu_data(c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, dtype=cp.float32):
-    """Prepare and transfer problem data to GPU."""
-    start = time.time()
+def prepare_gpu_data(c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, dtype=np.float32,
+                     backend=None):
+    """Prepare and transfer problem data to the selected array backend.
+
+    The transfer is timed by the callers' ``telemetry.phase("transfer")``.
+    """
+    backend = get_backend(backend, c, A_ub, A_eq)
 
     if A_ub is not None and A_eq is not None:
-        if isinstance(A_ub, np.ndarray) and isinstance(A_eq, np.ndarray):
-            A_ub_gpu = cp.asarray(A_ub, dtype=dtype)
-            A_eq_gpu = cp.asarray(A_eq, dtype=dtype)
-        elif scipy.sparse.issparse(A_ub) and scipy.sparse.issparse(A_eq):
-            A_ub_gpu = cupyx.scipy.sparse.csr_matrix(A_ub, dtype=dtype)
-            A_eq_gpu = cupyx.scipy.sparse.csr_matrix(A_eq, dtype=dtype)
+        if backend.issparse(A_ub) and backend.issparse(A_eq):
+            A_ub_gpu = backend.csr_matrix(A_ub, dtype=dtype)
+            A_eq_gpu = backend.csr_matrix(A_eq, dtype=dtype)
+        elif not backend.issparse(A_ub) and not backend.issparse(A_eq):
+            A_ub_gpu = backend.as_matrix(A_ub, dtype=dtype)
+            A_eq_gpu = backend.as_matrix(A_eq, dtype=dtype)
         else:
             raise ValueError("Matrix format not recognized")
     else:
         raise ValueError("A_ub and A_eq must be provided")
 
+    c, b_eq, b_ub = broadcast_columns(backend.to_host(c), backend.to_host(b_eq),
+                                      backend.to_host(b_ub))
     q = np.concatenate((b_eq, -b_ub))
-    q_gpu = cp.asarray(q, dtype=dtype)
-    c_gpu = cp.asarray(c, dtype=dtype)
-
-    print(f"Took {time.time() - start} seconds to move problem data to GPU")
+    q_gpu = backend.asarray(q, dtype=dtype)
+    c_gpu = backend.asarray(c, dtype=dtype)
     return c_gpu, A_ub_gpu, A_eq_gpu, q_gpu
 
 
-def initialize_parameters(c, q, K_linop, dtype=cp.float32):
-    """Initialize algorithm parameters including eta estimation."""
-    c_norm = cp.linalg.norm(c)
-    q_norm = cp.linalg.norm(q)
+def operator_key(A_eq, A_ub, dtype, ruiz_iters, pock_chambolle):
+    """Cache key of the preprocessed PDLP operator for these blocks and settings."""
+    return fingerprint(A_eq, A_ub, solver="pdlp", dtype=np.dtype(dtype).str,
+                       ruiz_iters=ruiz_iters, pock_chambolle=bool(pock_chambolle))
+
+
+def preprocess_operator(A_eq, A_ub, c_size, q_size, dtype=np.float32, backend=None,
+                        ruiz_iters=0, pock_chambolle=False, cache=None, key=None,
+                        telemetry=NO_TELEMETRY):
+    """Stacked and preconditioned K with its spectral norm: ``(K, scaling, norm)``.
+
+    With ``cache`` (an ``OperatorCache``, or True for ``utils.operator_cache.default_cache``)
+    the scaled K and K^T, the scaling vectors and ||K|| are looked up under
+    ``key`` (by default ``operator_key`` of the blocks) and only computed on
+    a miss. The returned operator never shares memory with the cache. The
+    norm estimate is timed as ``telemetry``'s ``spectral_norm`` phase.
+    """
+    backend = get_backend(backend, A_eq, A_ub)
+    if not cache:
+        _, _, K = create_linear_operators(A_eq, A_ub, c_size, q_size, dtype, backend)
+        scaling = None
+        if ruiz_iters > 0 or pock_chambolle:
+            scaling = precondition(K, ruiz_iters, pock_chambolle)
+        with telemetry.phase("spectral_norm"):
+            norm = estimate_spectral_norm(K, dtype=dtype, backend=backend)
+        return K, scaling, norm
+
+    cache = default_cache if cache is True else cache
+    key = operator_key(A_eq, A_ub, dtype, ruiz_iters, pock_chambolle) if key is None else key
+    entry = cache.get(key)
+    if entry is None:
+        K, scaling, norm = preprocess_operator(A_eq, A_ub, c_size, q_size, dtype, backend,
+                                               ruiz_iters, pock_chambolle, telemetry=telemetry)
+        copy = lambda a: None if a is None else a.copy()
+        cache.put(key, {"K": copy(K.K), "Kt": copy(K.Kt), "norm": float(norm),
+                        "row": None if scaling is None else scaling.row.copy(),
+                        "col": None if scaling is None else scaling.col.copy()})
+        return K, scaling, norm
+    K = StackedOperator.from_matrices(entry["K"], entry["Kt"], A_eq.shape[0], -1.0, dtype, backend)
+    assert K.shape == (q_size, c_size), "cached operator shape does not match c and q"
+    scaling = None
+    if entry["row"] is not None:
+        scaling = DiagonalScaling(backend.asarray(entry["row"], dtype).copy(),
+                                  backend.asarray(entry["col"], dtype).copy(), backend)
+    return K, scaling, entry["norm"]
+
 
-    cp.random.seed(0)  # For reproducibility
-    eta = 0.9 / estimate_spectral_norm(K_linop, dtype=dtype)
+def initialize_parameters(c, q, K, dtype=np.float32, backend=None, norm=None):
+    """Initialize algorithm parameters including eta estimation.
+
+    A known ``norm`` of K (e.g. from ``preprocess_operator``) skips the estimate.
+    """
+    backend = get_backend(backend, c)
+    xp = backend.xp
+    c_norm = xp.linalg.norm(c)
+    q_norm = xp.linalg.norm(q)
+
+    if norm is None:
+        norm = estimate_spectral_norm(K, dtype=dtype, backend=backend)
+    eta = 0.9 / norm
     omega = 1.0
     tau = eta / omega
     sigma = omega * eta
@@ -43,38 +102,398 @@ def initialize_parameters(c, q, K_linop, dtype=cp.float32):
     return eta, tau, sigma, c_norm, q_norm
 
 
-def initialize_variables(c_size, q_size, dtype=cp.float32):
-    """Initialize primal and dual variables."""
-    x = cp.zeros(c_size, dtype=dtype)
-    y = cp.zeros(q_size, dtype=dtype)
-    new_x = cp.zeros(c_size, dtype=dtype)
-    return x, y, new_x
+class PDLPWorkspace:
+    """Preallocated vectors for an allocation-free PDHG iteration.
+
+    Every vector the update touches lives here, including separate buffers
+    for the convergence check so it never clobbers the iteration's products.
+    On GPU the update runs as two fused elementwise kernels; on CPU as
+    in-place ``out=`` ufunc calls. With ``bounds`` (a ``DeviceBounds``) the
+    primal step is projected onto the box.
+    """
+
+    def __init__(self, c_size, q_size, n_eq, dtype=np.float32, backend=None, n_cols=None,
+                 bounds=None):
+        self.backend = get_backend(backend)
+        xp = self.backend.xp
+        self.n_eq = n_eq
+        self.n_cols = n_cols
+        # Batched solves keep one column per LP: vectors become (size, n_cols)
+        c_shape = c_size if n_cols is None else (c_size, n_cols)
+        q_shape = q_size if n_cols is None else (q_size, n_cols)
+        self.x = xp.zeros(c_shape, dtype=dtype)
+        self.y = xp.zeros(q_shape, dtype=dtype)
+        self.new_x = xp.zeros(c_shape, dtype=dtype)
+        self.x_bar = xp.empty(c_shape, dtype=dtype)  # 2 * new_x - x
+        self.Kty = xp.empty(c_shape, dtype=dtype)
+        self.Kx = xp.empty(q_shape, dtype=dtype)
+        self.grad = xp.empty(c_shape, dtype=dtype)
+        self.dy = xp.empty(q_shape, dtype=dtype)
+        self.check_Kx = xp.empty(q_shape, dtype=dtype)
+        self.check_Kty = xp.empty(c_shape, dtype=dtype)
+        self.y_ub = self.y[n_eq:]
+        # The fused dual kernel sees a flat C-ordered array: the first n_eq rows
+        # are the first n_eq * n_cols elements
+        self.n_eq_flat = n_eq * (1 if n_cols is None else n_cols)
+        self._primal_update, self._dual_update = create_update_kernels(self.backend)
+        self.set_bounds(bounds)
+
+    def set_bounds(self, bounds):
+        """Replace the variable bounds (a ``DeviceBounds``, or None for free x)."""
+        self.bounds = bounds
+        # The fused kernel always clips; infinite scalars when x is free
+        if bounds is None:
+            self._lb, self._ub = self.x.dtype.type(-np.inf), self.x.dtype.type(np.inf)
+        else:
+            self._lb = bounds._along_rows(bounds.lb, self.x)
+            self._ub = bounds._along_rows(bounds.ub, self.x)
+
+    def compact(self, keep):
+        """Drop the columns of a batched workspace whose LPs have converged.
+
+        Returns a new, smaller workspace holding the iterates of the
+        remaining columns; subsequent SpMMs only touch active LPs.
+        """
+        keep = self.backend.asarray(keep)
+        ws = PDLPWorkspace(self.x.shape[0], self.y.shape[0], self.n_eq, self.x.dtype,
+                           self.backend, int(keep.sum()), self.bounds)
+        ws.x[...] = self.x[:, keep]
+        ws.y[...] = self.y[:, keep]
+        return ws
+
+    def step(self, K, c, q, tau, sigma):
+        """Run one PDHG iteration in place; afterwards ``x`` holds the new iterate."""
+        xp = self.backend.xp
+        K.rmatvec(self.y, out=self.Kty)
+        if self._primal_update is not None:
+            self._primal_update(self.x, self.Kty, c, tau, self._lb, self._ub,
+                                self.new_x, self.x_bar)
+        else:
+            xp.subtract(c, self.Kty, out=self.grad)
+            xp.multiply(self.grad, tau, out=self.grad)
+            xp.subtract(self.x, self.grad, out=self.new_x)
+            if self.bounds is not None:
+                self.bounds.project(self.new_x, out=self.new_x)
+            xp.multiply(self.new_x, 2, out=self.x_bar)
+            xp.subtract(self.x_bar, self.x, out=self.x_bar)
+
+        K.matvec(self.x_bar, out=self.Kx)
+        if self._dual_update is not None:
+            self._dual_update(q, self.Kx, sigma, self.n_eq_flat, self.y)
+        else:
+            xp.subtract(q, self.Kx, out=self.dy)
+            xp.multiply(self.dy, sigma, out=self.dy)
+            xp.add(self.y, self.dy, out=self.y)
+            xp.maximum(self.y_ub, 0, out=self.y_ub)  # Projection
+
+        # Swap instead of copying new_x into x
+        self.x, self.new_x = self.new_x, self.x
+
+    def screen_stats(self, c, q, scaling=None):
+        """Residual statistics from the products of the last step, without any SpMV.
+
+        K x_bar and K^T y_prev, which the step just computed, stand in for
+        K x and K^T y; they coincide at a fixed point. Returns the device
+        vector [||r_p||^2, ||r_d||^2, dual objective, c^T x_bar] so all four
+        reach the host in one transfer. Only for unbatched workspaces.
+        """
+        xp = self.backend.xp
+        xp.subtract(q, self.Kx, out=self.check_Kx)
+        r_ub = self.check_Kx[self.n_eq:]
+        xp.maximum(r_ub, 0, out=r_ub)
+        xp.subtract(c, self.Kty, out=self.check_Kty)
+        dual_obj = q @ self.y
+        if self.bounds is not None:
+            dual_obj = dual_obj + self.bounds.dual_residual(self.check_Kty)
+        if scaling is not None:
+            xp.divide(self.check_Kx, scaling.row, out=self.check_Kx)
+            xp.divide(self.check_Kty, scaling.col, out=self.check_Kty)
+        return xp.stack((self.check_Kx @ self.check_Kx, self.check_Kty @ self.check_Kty,
+                         dual_obj, c @ self.x_bar))
+
+
+class RestartedPDLPWorkspace:
+    """Preallocated state for restarted, adaptive-step PDLP (``mode="pdlp"``).
+
+    Keeps K x and K^T y for the current iterate, the candidate step and the
+    step-size weighted average, so step-size tests, averaging and restart
+    decisions need no SpMVs beyond one K and one K^T per accepted step.
+    ``bounds`` (a ``DeviceBounds``) projects the primal step onto the box.
+    """
+
+    def __init__(self, c_size, q_size, n_eq, dtype=np.float32, backend=None, bounds=None):
+        self.backend = get_backend(backend)
+        xp = self.backend.xp
+        self.n_eq = n_eq
+        self.bounds = bounds
+        self.x, self.y = xp.zeros(c_size, dtype=dtype), xp.zeros(q_size, dtype=dtype)
+        self.Kx, self.Kty = xp.zeros(q_size, dtype=dtype), xp.zeros(c_size, dtype=dtype)
+        self.x_new, self.y_new = xp.zeros(c_size, dtype=dtype), xp.zeros(q_size, dtype=dtype)
+        self.Kx_new, self.Kty_new = xp.zeros(q_size, dtype=dtype), xp.zeros(c_size, dtype=dtype)
+        self.x_avg, self.y_avg = xp.zeros(c_size, dtype=dtype), xp.zeros(q_size, dtype=dtype)
+        self.Kx_avg, self.Kty_avg = xp.zeros(q_size, dtype=dtype), xp.zeros(c_size, dtype=dtype)
+        self.x_last, self.y_last = xp.zeros(c_size, dtype=dtype), xp.zeros(q_size, dtype=dtype)
+        self.dx, self.dy = xp.empty(c_size, dtype=dtype), xp.empty(q_size, dtype=dtype)
+        self.dKx = xp.empty(q_size, dtype=dtype)
+        self.weight_sum = 0.0
+
+    def set_bounds(self, bounds):
+        """Replace the variable bounds (a ``DeviceBounds``, or None for free x)."""
+        self.bounds = bounds
+
+    def reset(self, K):
+        """Start a new solve from the current (x, y), e.g. a previous solution.
+
+        Recomputes K x and K^T y (K may have changed since) and restarts the
+        average and the restart anchor at the current iterate.
+        """
+        K.matvec(self.x, out=self.Kx)
+        K.rmatvec(self.y, out=self.Kty)
+        for dst, src in ((self.x_avg, self.x), (self.y_avg, self.y), (self.Kx_avg, self.Kx),
+                         (self.Kty_avg, self.Kty), (self.x_last, self.x), (self.y_last, self.y)):
+            dst[...] = src
+        self.weight_sum = 0.0
+
+    def step(self, K, c, q, eta, omega):
+        """Compute a candidate step of size ``eta`` and return the step-size limit.
+
+        The step is acceptable when ``eta`` does not exceed the returned
+        limit ||dz||_omega^2 / (2 |dy^T K dx|).
+        """
+        xp = self.backend.xp
+        tau, sigma = eta / omega, eta * omega
+        xp.subtract(c, self.Kty, out=self.dx)
+        xp.multiply(self.dx, tau, out=self.dx)
+        xp.subtract(self.x, self.dx, out=self.x_new)
+        if self.bounds is not None:
+            self.bounds.project(self.x_new, out=self.x_new)
+        K.matvec(self.x_new, out=self.Kx_new)
+
+        # K (2 x_new - x) = 2 K x_new - K x, so no extra SpMV for the extrapolation
+        xp.multiply(self.Kx_new, 2, out=self.dy)
+        xp.subtract(self.dy, self.Kx, out=self.dy)
+        xp.subtract(q, self.dy, out=self.dy)
+        xp.multiply(self.dy, sigma, out=self.dy)
+        xp.add(self.y, self.dy, out=self.y_new)
+        y_ub = self.y_new[self.n_eq:]
+        xp.maximum(y_ub, 0, out=y_ub)  # Projection
+
+        xp.subtract(self.x_new, self.x, out=self.dx)
+        xp.subtract(self.y_new, self.y, out=self.dy)
+        xp.subtract(self.Kx_new, self.Kx, out=self.dKx)
+        movement = 0.5 * (omega * float(self.dx @ self.dx) + float(self.dy @ self.dy) / omega)
+        interaction = abs(float(self.dy @ self.dKx))
+        return movement / interaction if interaction > 0 else np.inf
+
+    def accept(self, K, eta):
+        """Make the candidate step the current iterate and fold it into the average."""
+        xp = self.backend.xp
+        K.rmatvec(self.y_new, out=self.Kty_new)
+        self.x, self.x_new = self.x_new, self.x
+        self.y, self.y_new = self.y_new, self.y
+        self.Kx, self.Kx_new = self.Kx_new, self.Kx
+        self.Kty, self.Kty_new = self.Kty_new, self.Kty
+
+        # Step-size weighted running average; products average linearly too
+        self.weight_sum += eta
+        weight = eta / self.weight_sum
+        for avg, cur, scratch in ((self.x_avg, self.x, self.dx), (self.y_avg, self.y, self.dy),
+                                  (self.Kx_avg, self.Kx, self.dKx), (self.Kty_avg, self.Kty, self.dx)):
+            xp.subtract(cur, avg, out=scratch)
+            xp.multiply(scratch, weight, out=scratch)
+            xp.add(avg, scratch, out=avg)
+
+    def residual_norms(self, c, q, average=False, scaling=None):
+        """Return (||primal residual||, ||dual residual||, dual objective, c^T x) as floats.
+
+        The dual objective is q^T y plus the bound terms of the reduced costs.
+        With a ``scaling`` the residual norms are measured in original units.
+        """
+        xp = self.backend.xp
+        if average:
+            x, y, Kx, Kty = self.x_avg, self.y_avg, self.Kx_avg, self.Kty_avg
+        else:
+            x, y, Kx, Kty = self.x, self.y, self.Kx, self.Kty
+        xp.subtract(q, Kx, out=self.dKx)
+        r_ub = self.dKx[self.n_eq:]
+        xp.maximum(r_ub, 0, out=r_ub)
+        xp.subtract(c, Kty, out=self.dx)
+        dual_obj = float(q @ y)
+        if self.bounds is not None:
+            dual_obj += float(self.bounds.dual_residual(self.dx))
+        if scaling is not None:
+            xp.divide(self.dKx, scaling.row, out=self.dKx)
+            xp.divide(self.dx, scaling.col, out=self.dx)
+        return (float(xp.linalg.norm(self.dKx)), float(xp.linalg.norm(self.dx)),
+                dual_obj, float(c @ x))
+
+    def restart(self, to_average):
+        """Restart from the average (or current) iterate.
+
+        Returns the primal and dual distances moved since the last restart,
+        which drive the primal weight update.
+        """
+        xp = self.backend.xp
+        if to_average:
+            for cur, avg in ((self.x, self.x_avg), (self.y, self.y_avg),
+                             (self.Kx, self.Kx_avg), (self.Kty, self.Kty_avg)):
+                cur[...] = avg
+        xp.subtract(self.x, self.x_last, out=self.dx)
+        xp.subtract(self.y, self.y_last, out=self.dy)
+        dx_norm, dy_norm = float(xp.linalg.norm(self.dx)), float(xp.linalg.norm(self.dy))
+        self.x_last[...] = self.x
+        self.y_last[...] = self.y
+        self.weight_sum = 0.0
+        return dx_norm, dy_norm
 
 
 def check_convergence(x, y, c, q, apply_K, apply_Kt, c_norm, q_norm,
-                      eps_pri=1e-6, eps_dual=1e-4, eps_gap=1e-4, b_eq_size=None):
-    """Check convergence conditions."""
-    p_feas = q - apply_K(x)
-    p_feas[b_eq_size:] = cp.maximum(p_feas[b_eq_size:], 0.)
-    p_feas_gap = cp.linalg.norm(p_feas) / (1 + q_norm)
+                      eps_pri=1e-6, eps_dual=1e-4, eps_gap=1e-4, b_eq_size=None,
+                      backend=None, workspace=None, scaling=None, bounds=None):
+    """Check convergence conditions.
 
-    d_feas_gap = cp.linalg.norm(c - apply_Kt(y)) / (1 + c_norm)
-    dual_gap = cp.abs(q.T @ y - c.T @ x) / (1 + cp.abs(c.T @ x) + cp.abs(q.T @ y))
+    When a ``workspace`` is given, the K x and K^T y products go into its
+    dedicated check buffers instead of the operator's shared ones. With a
+    ``scaling``, residuals of the preconditioned problem are measured in
+    original units (the duality gap is invariant under the scaling). With
+    ``bounds`` the reduced costs absorbed by finite bounds leave the dual
+    residual and enter the dual objective. Norms and dot products are
+    accumulated in float64 whatever the iterate precision.
+    """
+    xp = get_backend(backend, x).xp
+    Kx_out = workspace.check_Kx if workspace is not None else None
+    Kty_out = workspace.check_Kty if workspace is not None else None
+    p_feas = q - apply_K(x, out=Kx_out)
+    p_feas[b_eq_size:] = xp.maximum(p_feas[b_eq_size:], 0.)
+    d_feas = c - apply_Kt(y, out=Kty_out)
+    bound_term = 0 if bounds is None else bounds.dual_residual(d_feas)
+    if scaling is not None:
+        p_feas /= scaling.row if p_feas.ndim == 1 else scaling.row[:, None]
+        d_feas /= scaling.col if d_feas.ndim == 1 else scaling.col[:, None]
+    # Batched (n, k) iterates give one value per column
+    f64 = lambda v: v.astype(np.float64, copy=False)
+    p_feas_gap = xp.linalg.norm(f64(p_feas), axis=0) / (1 + q_norm)
+
+    d_feas_gap = xp.linalg.norm(f64(d_feas), axis=0) / (1 + c_norm)
+    if x.ndim == 1:
+        qty, cx = f64(q) @ f64(y), f64(c) @ f64(x)
+    else:
+        qty, cx = (f64(q) * f64(y)).sum(axis=0), (f64(c) * f64(x)).sum(axis=0)
+    qty = qty + bound_term
+    dual_gap = xp.abs(qty - cx) / (1 + xp.abs(cx) + xp.abs(qty))
 
     return p_feas_gap, d_feas_gap, dual_gap
 
 
-def estimate_spectral_norm(A, its=20, dtype=cp.float32):
-    """Estimate the spectral norm of a linear operator."""
-    v = cp.empty(A.shape[1], dtype=dtype)
-    u = cp.empty(A.shape[0], dtype=dtype)
-    v[:] = cp.random.uniform(low=-1., high=1., size=A.shape[1])
-    v /= cp.linalg.norm(v)
-    for j in range(its):
-        u = A.matvec(v)
-        v = A.rmatvec(u)
-        snorm = cp.linalg.norm(v)
-        if snorm > 0:
-            v /= snorm
-        snorm = cp.sqrt(snorm)
-    return snorm
\ No newline at end of file
+class InfeasibilityDetector:
+    """Certificates of primal or dual infeasibility from PDHG iterate differences.
+
+    On an infeasible or unbounded LP the iterates diverge along a ray, so
+    the difference between the iterate at one check and the next, projected
+    onto the right cone, converges to a certificate (Applegate et al.,
+    "Infeasibility detection with primal-dual hybrid gradient"):
+
+    * a dual ray dy (dy_ub >= 0) with K^T dy absorbed by the bounds and
+      positive dual objective q^T dy + lb^T lambda^+ - ub^T lambda^-,
+      lambda = -K^T dy, proves the primal infeasible;
+    * a primal ray dx in the recession cone of the bounds with
+      K_eq dx = 0, K_ub dx >= 0 and c^T dx < 0 proves the dual infeasible
+      (the primal unbounded).
+
+    A ray counts once its residual, relative to its objective, drops below
+    ``eps_infeas`` (dual rays) or ``eps_ubdd`` (primal rays). Residuals are
+    measured in original units and accumulated in float64.
+    """
+
+    def __init__(self, K, c, q, n_eq, eps_infeas=1e-4, eps_ubdd=1e-4, scaling=None, bounds=None):
+        self.backend = backend = K.backend
+        xp = backend.xp
+        self.K, self.c, self.q, self.n_eq = K, c, q, n_eq
+        self.eps_infeas, self.eps_ubdd = eps_infeas, eps_ubdd
+        self.scaling, self.bounds = scaling, bounds
+        self._Kx = xp.empty(q.shape[0], dtype=q.dtype)
+        self._Kty = xp.empty(c.shape[0], dtype=c.dtype)
+        self._x_prev = self._y_prev = None
+        if bounds is not None:
+            # Recession cone of the box: dx_j >= 0 under a finite lb, <= 0 under a finite ub
+            self._ray_lb = xp.where(bounds.lb_free > 0, -xp.inf, 0).astype(c.dtype)
+            self._ray_ub = xp.where(bounds.ub_free > 0, xp.inf, 0).astype(c.dtype)
+
+    def reset(self):
+        self._x_prev = self._y_prev = None
+
+    def check(self, x, y):
+        """Compare (x, y) with the previous call's iterate.
+
+        Returns ``(status, ray)`` with status ``"primal_infeasible"`` (ray: the
+        dual certificate) or ``"dual_infeasible"`` (ray: the primal
+        certificate), in original units, or None.
+        """
+        if self._x_prev is None:
+            self._x_prev, self._y_prev = x.copy(), y.copy()
+            return None
+        dx, dy = x - self._x_prev, y - self._y_prev
+        self._x_prev[...] = x
+        self._y_prev[...] = y
+        xp = self.backend.xp
+        f64 = lambda v: v.astype(np.float64, copy=False)
+
+        dy[self.n_eq:] = xp.maximum(dy[self.n_eq:], 0)
+        lam = xp.negative(self.K.rmatvec(dy, out=self._Kty), out=self._Kty)
+        bound_term = 0 if self.bounds is None else self.bounds.dual_residual(lam)
+        dual_obj = float(f64(self.q) @ f64(dy) + bound_term)
+        if self.scaling is not None:
+            lam /= self.scaling.col
+        if dual_obj > 0 and float(xp.linalg.norm(f64(lam))) <= self.eps_infeas * dual_obj:
+            return "primal_infeasible", (dy if self.scaling is None
+                                         else self.scaling.unscale_dual(dy, out=dy))
+
+        if self.bounds is not None:
+            xp.clip(dx, self._ray_lb, self._ray_ub, out=dx)
+        primal_obj = -float(f64(self.c) @ f64(dx))
+        r = self.K.matvec(dx, out=self._Kx)
+        r[self.n_eq:] = xp.minimum(r[self.n_eq:], 0)
+        if self.scaling is not None:
+            r /= self.scaling.row
+        if primal_obj > 0 and float(xp.linalg.norm(f64(r))) <= self.eps_ubdd * primal_obj:
+            return "dual_infeasible", (dx if self.scaling is None
+                                       else self.scaling.unscale_primal(dx, out=dx))
+        return None
+
+
+def estimate_spectral_norm(A, its=100, dtype=np.float32, backend=None, tol=1e-6):
+    """Estimate the spectral norm of a linear operator (anything with matvec/rmatvec).
+
+    Golub-Kahan-Lanczos bidiagonalization from a fixed pseudo-random start:
+    the largest singular value of the k x k bidiagonal grows monotonically to
+    ||A||, and the iteration stops once it changes by less than ``tol``
+    (relative) or after ``its`` steps. This takes far fewer products than
+    power iteration for the same accuracy.
+    """
+    backend = get_backend(backend)
+    xp = backend.xp
+    m, n = A.shape
+    v = backend.asarray(np.random.default_rng(0).uniform(-1., 1., n), dtype)
+    v /= xp.linalg.norm(v)
+    u, u_prev, v_next = xp.zeros(m, dtype=dtype), xp.zeros(m, dtype=dtype), xp.empty(n, dtype=dtype)
+    alphas, betas = [], []
+    snorm = beta = 0.0
+    for _ in range(its):
+        A.matvec(v, out=u)
+        u -= beta * u_prev
+        alpha = float(xp.linalg.norm(u))
+        if alpha == 0:
+            break
+        u /= alpha
+        A.rmatvec(u, out=v_next)
+        v_next -= alpha * v
+        beta = float(xp.linalg.norm(v_next))
+        alphas.append(alpha)
+        B = np.diag(alphas) + np.diag(betas, 1)
+        previous, snorm = snorm, float(np.linalg.norm(B, 2))
+        betas.append(beta)
+        if beta == 0 or snorm - previous <= tol * snorm:
+            break
+        xp.divide(v_next, beta, out=v)
+        u, u_prev = u_prev, u
+    return snorm
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+import scipy.optimize
+import scipy.sparse
+from pdlp_implementation.src.decentralized import Partition, decentralized_pdhg
+from test_data.generate_transportation import generate_transportation_problem
+from utils.bounds import singleton_rows_to_bounds
+
+
+@pytest.fixture(scope="module")
+def transportation():
+    problem = generate_transportation_problem(5, 5)
+    A_ub, b_ub, lb, ub = singleton_rows_to_bounds(problem["A_ub"], problem["b_ub"])
+    return dict(c=problem["c"], A_ub=A_ub, b_ub=b_ub, A_eq=problem["A_eq"],
+                b_eq=problem["b_eq"], lb=lb, ub=ub)
+
+
+def test_partition_exchange_lists():
+    """Halo lists are symmetric and cover exactly the entries owned elsewhere."""
+    rng = np.random.default_rng(0)
+    K = scipy.sparse.random(20, 30, density=0.15, random_state=0, format="csr")
+    partition = Partition(K, 8, 3, rng.integers(0, 3, 30))
+    for r, loc in enumerate(partition.locals):
+        assert set(loc["recv"]["x"]) | set(loc["recv"]["y"]) <= partition.neighbors[r]
+        for kind, index, owner in (("x", loc["xcols"], partition.col_owner),
+                                   ("y", loc["ycols"], partition.row_owner)):
+            halo = np.sort(np.concatenate([v for v in loc["recv"][kind].values()] or [[]]))
+            np.testing.assert_array_equal(halo, np.flatnonzero(owner[index] != r))
+            for p, mine in loc["recv"][kind].items():
+                own = partition.locals[p]["cols" if kind == "x" else "rows"]
+                np.testing.assert_array_equal(own[partition.locals[p]["send"][kind][r]],
+                                              index[mine])
+        assert all(r in partition.neighbors[p] for p in partition.neighbors[r])
+
+
+def test_synchronous_agents_match_single_agent(transportation):
+    """Synchronous agents run the same iteration as one agent and reach the optimum."""
+    options = dict(eps_pri=1e-5, eps_dual=1e-5, eps_gap=1e-5, max_itr=20000, full_output=True)
+    x1, info1 = decentralized_pdhg(**transportation, n_agents=1, **options)
+    x3, info3 = decentralized_pdhg(**transportation, n_agents=3, **options)
+    assert info3["status"] == "optimal" and info3["edges"] > 0 and info3["messages"] > 0
+    assert info1["iterations"] == info3["iterations"]
+    np.testing.assert_allclose(x3, x1, atol=1e-10)
+    np.testing.assert_allclose(info3["y"], info1["y"], atol=1e-10)
+    t = transportation
+    ref = scipy.optimize.linprog(t["c"], t["A_ub"], t["b_ub"], t["A_eq"], t["b_eq"],
+                                 bounds=list(zip(t["lb"], t["ub"])))
+    np.testing.assert_allclose(t["c"] @ x3, ref.fun, rtol=1e-4)
+
+
+def test_bounded_staleness_converges(transportation, capsys):
+    from utils.telemetry import Telemetry
+
+    telemetry = Telemetry()
+    x, info = decentralized_pdhg(**transportation, n_agents=2, staleness=1, eps_pri=1e-4,
+                                 eps_dual=1e-4, eps_gap=1e-4, max_itr=20000, full_output=True,
+                                 telemetry=telemetry)
+    assert info["status"] == "optimal"
+    assert info["primal_feas"] < 1e-4
+    assert capsys.readouterr().out == ""
+    last = telemetry.checks[-1]
+    assert last["solver"] == "decentralized" and last["iteration"] == info["iterations"]
+    assert last["primal_feas"] == info["primal_feas"]
+    assert telemetry.events[-1]["status"] == "optimal"
+    assert {"setup", "iterations", "checks"} <= telemetry.phases.keys()
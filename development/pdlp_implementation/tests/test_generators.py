@@ -0,0 +1,67 @@
+import numpy as np
+import scipy.optimize
+from test_data.generate_transportation import (generate_transportation_problem,
+                                               write_transportation_problem)
+from test_data.utils import load_csr
+
+
+def test_rectangular_transportation_problem():
+    """m != n: every supply row covers one supplier's arcs, every demand row one consumer's."""
+    m, n = 3, 5
+    problem = generate_transportation_problem(m, n, seed=1)
+    A = problem["A_ub"].toarray()
+    arcs = np.arange(m * n).reshape(m, n)
+    for i in range(m):
+        np.testing.assert_array_equal(np.flatnonzero(A[i]), arcs[i])
+    for j in range(n):
+        np.testing.assert_array_equal(np.flatnonzero(A[m + j]), arcs[:, j])
+        assert (A[m + j, arcs[:, j]] == -1).all()
+    res = scipy.optimize.linprog(problem["c"], problem["A_ub"], problem["b_ub"], problem["A_eq"],
+                                 problem["b_eq"], bounds=(None, None))
+    assert res.status == 0
+    assert not np.array_equal(problem["c"], generate_transportation_problem(m, n, seed=2)["c"])
+
+
+def test_chunked_writer_matches_generator(tmp_path):
+    """The streamed, memory-mapped problem equals the in-memory one."""
+    shapes = write_transportation_problem(4, 6, str(tmp_path), seed=3, chunk_nnz=7)
+    problem = generate_transportation_problem(4, 6, seed=3)
+    for name in ("A_ub", "A_eq"):
+        A = load_csr(str(tmp_path), name)
+        assert (A.shape, A.nnz) == shapes[name]
+        assert (A != problem[name]).nnz == 0
+    for name in ("c", "b_ub", "b_eq"):
+        np.testing.assert_array_equal(np.load(tmp_path / f"{name}.npy"), problem[name])
+
+
+def test_problem_families_are_feasible_and_seeded():
+    """Every family solves with HiGHS, the planted LP at its planted optimum; seeds differ."""
+    from test_data.generators import FAMILIES, SIZE_PARAMS, generate, lp_arguments
+
+    for family in FAMILIES:
+        problem = generate(family, seed=0, **SIZE_PARAMS[family](8))
+        lp = lp_arguments(problem)
+        res = scipy.optimize.linprog(lp["c"], lp["A_ub"], lp["b_ub"], lp["A_eq"], lp["b_eq"],
+                                     bounds=list(zip(lp["lb"], lp["ub"])))
+        assert res.status == 0, family
+        if "objective" in problem:
+            assert abs(res.fun - problem["objective"]) < 1e-8 * (1 + abs(res.fun))
+        other = generate(family, seed=1, **SIZE_PARAMS[family](8))
+        assert not np.array_equal(other["c"], problem["c"]), family
+
+
+def test_problem_cache_is_content_addressed(tmp_path):
+    """Same family, parameters and seed load from the cache; anything else misses."""
+    from test_data.generators import load_problem, problem_cache
+
+    params = dict(n=40, m_eq=8, m_ub=8)
+    first = load_problem("planted", 1, cache_dir=str(tmp_path), **params)
+    cache = problem_cache(str(tmp_path))
+    cache.clear()
+    again = load_problem("planted", 1, cache_dir=str(tmp_path), **params)
+    assert cache.disk_hits == 1
+    assert (again["A_eq"] != first["A_eq"]).nnz == 0
+    np.testing.assert_array_equal(again["x_opt"], first["x_opt"])
+    load_problem("planted", 2, cache_dir=str(tmp_path), **params)
+    load_problem("planted", 1, cache_dir=str(tmp_path), **{**params, "m_ub": 9})
+    assert cache.misses == 3
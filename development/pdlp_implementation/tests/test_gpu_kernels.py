@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+import scipy.sparse
+from pdlp_implementation.src.gpu_kernels import create_linear_operators
+from pdlp_implementation.src.utils import estimate_spectral_norm
+
+
+@pytest.mark.parametrize("sparse", [True, False])
+def test_stacked_operator_matches_blocks(sparse):
+    """K and K^T agree with the separate A_eq / -A_ub products."""
+    rng = np.random.default_rng(0)
+    A_eq = scipy.sparse.random(3, 6, density=0.5, random_state=1, format="csr")
+    A_ub = scipy.sparse.random(4, 6, density=0.5, random_state=2, format="csr")
+    if not sparse:
+        A_eq, A_ub = A_eq.toarray(), A_ub.toarray()
+    apply_K, apply_Kt, K = create_linear_operators(A_eq, A_ub, 6, 7, dtype=np.float64,
+                                                   backend="numpy")
+    x, y = rng.standard_normal(6), rng.standard_normal(7)
+    K_dense = np.vstack((A_eq.toarray() if sparse else A_eq,
+                         -(A_ub.toarray() if sparse else A_ub)))
+
+    out = np.empty(7)
+    assert apply_K(x, out=out) is out
+    np.testing.assert_allclose(out, K_dense @ x)
+    np.testing.assert_allclose(apply_Kt(y), K_dense.T @ y)
+    np.testing.assert_allclose(estimate_spectral_norm(K, its=200, dtype=np.float64),
+                               np.linalg.norm(K_dense, 2), rtol=1e-6)
+
+
+def test_threaded_operator_matches_serial(monkeypatch):
+    """Row-blocked K and K^T on a thread pool match the serial SpMVs, also after scaling."""
+    import utils.matrix_operations as matrix_operations
+    from utils.backend import get_backend
+
+    monkeypatch.setattr(matrix_operations, "MIN_BLOCK_NNZ", 10)
+    rng = np.random.default_rng(0)
+    A_eq = scipy.sparse.random(30, 40, density=0.2, random_state=1, format="csr")
+    A_ub = scipy.sparse.random(50, 40, density=0.2, random_state=2, format="csr")
+    _, _, K = create_linear_operators(A_eq, A_ub, 40, 80, dtype=np.float64, backend="numpy")
+    _, _, K4 = create_linear_operators(A_eq, A_ub, 40, 80, dtype=np.float64,
+                                       backend=get_backend("numpy", threads=4))
+    assert len(K4._blocked[False].blocks) == 4
+
+    row, col = rng.uniform(0.5, 2, 80), rng.uniform(0.5, 2, 40)
+    K.scale(row, col)
+    K4.scale(row, col)
+    x, X, y = rng.standard_normal(40), rng.standard_normal((40, 3)), rng.standard_normal(80)
+    np.testing.assert_allclose(K4.matvec(x), K.matvec(x))
+    np.testing.assert_allclose(K4.matvec(X, out=np.empty((80, 3))),
+                               K.matvec(X, out=np.empty((80, 3))))
+    np.testing.assert_allclose(K4.rmatvec(y), K.rmatvec(y))
+    np.testing.assert_allclose(estimate_spectral_norm(K4, its=200, dtype=np.float64),
+                               np.linalg.norm(K.K.toarray(), 2), rtol=1e-6)
+
+
+def test_ruiz_equilibrates_rows_and_columns():
+    """Ruiz passes drive every row/column infinity norm of K to ~1."""
+    from utils.scaling import precondition
+
+    row_scale = 10.0 ** np.random.default_rng(0).uniform(-3, 3, 30)
+    A_eq = scipy.sparse.diags(row_scale) @ scipy.sparse.random(30, 20, density=0.3, random_state=0)
+    A_ub = scipy.sparse.random(10, 20, density=0.3, random_state=1, format="csr")
+    _, _, K = create_linear_operators(A_eq, A_ub, 20, 40, dtype=np.float64, backend="numpy")
+    K_orig = K.K.toarray()
+
+    scaling = precondition(K, ruiz_iters=20, pock_chambolle=False)
+    K_scaled = K.K.toarray()
+    np.testing.assert_allclose(K_scaled, scaling.row[:, None] * K_orig * scaling.col[None, :])
+    np.testing.assert_allclose(K.Kt.toarray(), K_scaled.T)
+    np.testing.assert_allclose(np.abs(K_scaled).max(axis=1), 1, atol=1e-3)
+    np.testing.assert_allclose(np.abs(K_scaled).max(axis=0), 1, atol=1e-3)
+
+
+@pytest.mark.parametrize("sparse", [True, False])
+def test_set_values_keeps_k_and_kt_consistent(sparse):
+    """Overwriting the values in place matches an operator built from scratch."""
+    A_eq = scipy.sparse.random(3, 6, density=0.5, random_state=1, format="csr")
+    A_ub = scipy.sparse.random(4, 6, density=0.5, random_state=2, format="csr")
+    new_eq, new_ub = A_eq.copy(), A_ub.copy()
+    new_eq.data, new_ub.data = 2 * A_eq.data + 1, -A_ub.data
+    if not sparse:
+        A_eq, A_ub, new_eq, new_ub = (M.toarray() for M in (A_eq, A_ub, new_eq, new_ub))
+    _, _, K = create_linear_operators(A_eq, A_ub, 6, 7, dtype=np.float64, backend="numpy")
+    _, _, K_ref = create_linear_operators(new_eq, new_ub, 6, 7, dtype=np.float64, backend="numpy")
+    K.set_values(new_eq, new_ub)
+
+    y = np.random.default_rng(0).standard_normal(7)
+    np.testing.assert_allclose(K.matvec(np.ones(6)), K_ref.matvec(np.ones(6)))
+    np.testing.assert_allclose(K.rmatvec(y), K_ref.rmatvec(y))
+    if sparse:
+        with pytest.raises(ValueError):
+            K.set_values(scipy.sparse.eye(3, 6, format="csr"), new_ub)
+
+
+def test_convergence_monitor_adapts_interval():
+    """Checks space out while far from tolerance and tighten to tolcheck near it."""
+    from utils.backend import get_backend
+    from utils.convergence import ConvergenceMonitor
+
+    monitor = ConvergenceMonitor(get_backend("numpy"), tolcheck=10)
+    assert monitor.due(0)
+    monitor.submit(0, np.array([1.0]))
+    assert not monitor.due(1)
+    itr, stats = monitor.poll()
+    assert itr == 0 and stats[0] == 1.0 and monitor.poll() is None
+
+    monitor.update(0, 1e6)
+    monitor.update(10, 1e5)  # one decade per 10 iterations: ~50 to go
+    assert monitor.interval == 25 and monitor.due(35) and not monitor.due(34)
+    monitor.update(35, 2e5)  # no progress: back off
+    assert monitor.interval == 50
+    monitor.update(85, 5.0)  # close to tolerance
+    assert monitor.interval == 10
+
+
+@pytest.mark.parametrize("sparse", [True, False])
+def test_singleton_rows_round_trip(sparse):
+    """Singleton rows become tightened bounds, and bounds_to_rows restores an equivalent LP."""
+    from utils.bounds import bounds_to_rows, singleton_rows_to_bounds
+
+    A_ub = np.array([[1., 1., 0.], [-2., 0., 0.], [0., 0., 4.], [0., 0., 2.], [0., 3., 0.]])
+    b_ub = np.array([5., 2., 8., 2., -3.])
+    A_ub = scipy.sparse.csr_matrix(A_ub) if sparse else A_ub
+    A, b, lb, ub = singleton_rows_to_bounds(A_ub, b_ub, ub=10.0)
+    assert scipy.sparse.issparse(A) == sparse
+    assert A.shape == (1, 3) and np.array_equal(b, [5.])
+    assert np.array_equal(lb, [-1., -np.inf, -np.inf])
+    assert np.array_equal(ub, [10., -1., 1.])
+
+    G, h = bounds_to_rows(3, lb, ub, A, b)
+    assert G.shape == (5, 3)
+    x = np.array([0.5, -2., 1.])
+    assert np.all(np.asarray(G @ x).ravel() <= h)
+    with pytest.raises(ValueError):
+        singleton_rows_to_bounds(A_ub, b_ub, lb=3.0)
+
+
+def test_stall_detector():
+    """A plateau longer than the patience counts as stalled; steady progress never does."""
+    from utils.convergence import StallDetector
+
+    detector = StallDetector(patience=100)
+    assert not any(detector.update(itr, 0.5 ** (itr / 10)) for itr in range(0, 1000, 10))
+    detector = StallDetector(patience=100)
+    stalled = [detector.update(itr, max(1.0, 100 * 0.5 ** (itr / 10))) for itr in range(0, 1000, 10)]
+    assert not stalled[10] and stalled[-1]
@@ -0,0 +1,96 @@
+import gzip
+import os
+import shutil
+import numpy as np
+import pytest
+import scipy.optimize
+import scipy.sparse
+from test_data.generators import generate, lp_arguments
+from utils.mps import read_mps, write_mps
+
+
+MPS_EXAMPLE = """* RANGES on L and E rows, every bound type, OBJSENSE MAX and an objective constant
+NAME TESTLP
+OBJSENSE
+    MAX
+ROWS
+ N  profit
+ L  lim1
+ G  lim2
+ E  bal
+ E  rng_eq
+ N  free_row
+COLUMNS
+    MARKER  'MARKER'  'INTORG'
+    x  profit 1.0  lim1 1.0
+    x  lim2 1.0  bal 1.0
+    MARKER  'MARKER'  'INTEND'
+    y  profit 2.0  lim1 1.0
+    y  rng_eq 1.0  free_row 3.0
+    z  profit -1.0  bal -1.0
+RHS
+    RHS  lim1 4.0  lim2 1.0
+    RHS  profit -10.0
+    RHS  rng_eq 1.0
+    RHS2 lim1 100
+RANGES
+    RNG  lim1 2.5  rng_eq -0.5
+BOUNDS
+ UP BND x 3.0
+ MI BND z
+ UP BND z 1.0
+ BV BND y
+ENDATA
+"""
+
+
+def test_mps_reader_sections(tmp_path):
+    """RANGES, BOUNDS, OBJSENSE and objective constants in free and fixed MPS."""
+    path = tmp_path / "example.mps"
+    path.write_text(MPS_EXAMPLE)
+    problem, metadata = read_mps(str(path))
+    assert metadata["sense"] == "max" and (metadata["rows"], metadata["nnz"]) == (4, 6)
+    np.testing.assert_array_equal(problem["lb"], [0, 0, -np.inf])
+    np.testing.assert_array_equal(problem["ub"], [3, 1, 1])
+    res = scipy.optimize.linprog(problem["c"], problem["A_ub"], problem["b_ub"], problem["A_eq"],
+                                 problem["b_eq"], bounds=list(zip(problem["lb"], problem["ub"])))
+    np.testing.assert_allclose(res.x, [1, 1, 1])
+    assert -(res.fun + metadata["objective_offset"]) == pytest.approx(12.0)  # max x + 2y - z + 10
+
+    line = lambda *f: (" {:2} {:8}  {:8}  {:12}   {:8}  {:12}".format(*f, *[""] * 6)).rstrip()
+    fixed = ["NAME          FIXED", "ROWS", line("N", "cost"), line("G", "row one"), "COLUMNS",
+             line("", "x one", "cost", "1", "row one", "1"), line("", "y", "cost", "2"),
+             line("", "y", "row one", "1"), "RHS", line("", "", "row one", "1.5"), "BOUNDS",
+             line("UP", "", "x one", "0.5"), "ENDATA"]
+    path.write_text("\n".join(fixed) + "\n")
+    problem, metadata = read_mps(str(path), fixed=True)
+    np.testing.assert_array_equal(problem["A_ub"].toarray(), [[-1, -1]])
+    np.testing.assert_array_equal(problem["b_ub"], [-1.5])
+    np.testing.assert_array_equal(problem["ub"], [0.5, np.inf])
+    assert metadata["name"] == "FIXED" and problem["A_eq"].shape == (0, 2)
+
+
+def test_mps_round_trip_and_cache(tmp_path):
+    """write_mps -> read_mps is exact (also gzipped); the cache is reused until the file changes."""
+    problem = lp_arguments(generate("network_flow", 3, n_nodes=40))
+    path = str(tmp_path / "flow.mps")
+    write_mps(path, **problem)
+    with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    for source in (path, path + ".gz"):
+        loaded, metadata = read_mps(source)
+        for key, value in problem.items():
+            if scipy.sparse.issparse(value):
+                assert (loaded[key] != value).nnz == 0, key
+            else:
+                np.testing.assert_array_equal(loaded[key], value)
+
+    cache_dir = str(tmp_path / "cache")
+    first, _ = read_mps(path, cache=cache_dir)
+    cached, metadata = read_mps(path, cache=cache_dir)
+    assert not cached["c"].flags.owndata and first["c"].flags.owndata
+    assert (cached["A_ub"] != problem["A_ub"]).nnz == 0 and "mps_source" not in metadata
+    write_mps(path, **{**problem, "c": problem["c"] + 1})
+    os.utime(path, ns=(0, 0))  # a changed file, even within the mtime resolution
+    changed, _ = read_mps(path, cache=cache_dir)
+    np.testing.assert_array_equal(changed["c"], problem["c"] + 1)
@@ -1,9 +1,23 @@
-import cupy as cp
+import sys
+import numpy as np
 import pytest
-from Research.development.pdlp_implementation.src.pdlp.pdlp_solver import pdlp_gpu
-from Research.development.test_data.utils import load_test_data
+import scipy.optimize
+from pdlp_implementation.src.pdlp_solver import pdlp_gpu
+from test_data.generate_transportation import generate_transportation_problem
+from test_data.utils import load_test_data
+from utils.backend import available_backends
 
 
+@pytest.fixture(scope="module")
+def transportation():
+    """Small transportation problem with its HiGHS reference objective."""
+    problem = generate_transportation_problem(5, 5)
+    ref = scipy.optimize.linprog(problem["c"], A_ub=problem["A_ub"], b_ub=problem["b_ub"],
+                                 A_eq=problem["A_eq"], b_eq=problem["b_eq"], bounds=(None, None))
+    return problem, ref.fun
+
+
+@pytest.mark.skipif("cupy" not in available_backends(), reason="CuPy is not available")
 def test_solver_with_data():
     """Test PDLP solver with pre-loaded test data."""
     # Load test data
@@ -21,4 +35,327 @@ def test_solver_with_data():
 
     # Placeholder for specific assertions (add if you have expected results)
     # x_np = x.get()
-    # assert np.allclose(x_np, expected_x, atol=1e-3), f"Expected {expected_x}, got {x_np}"
\ No newline at end of file
+    # assert np.allclose(x_np, expected_x, atol=1e-3), f"Expected {expected_x}, got {x_np}"
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_solver_backends(transportation, backend):
+    """PDLP reaches the reference objective on every available backend."""
+    problem, ref_obj = transportation
+    x = pdlp_gpu(**problem, max_itr=20000, tolcheck=100, eps_pri=1e-4,
+                 dtype=np.float64, backend=backend)
+
+    assert x.shape == (problem["c"].shape[0],)
+    x = x.get() if backend == "cupy" else x
+    assert np.isclose(problem["c"] @ x, ref_obj, rtol=1e-2)
+
+
+def test_numpy_backend_does_not_import_cupy(transportation):
+    """Selecting the CPU backend must not pull in cupy."""
+    if "cupy" in sys.modules:
+        pytest.skip("cupy already imported by another test")
+    problem, _ = transportation
+    x = pdlp_gpu(**problem, max_itr=10, backend="numpy")
+    assert isinstance(x, np.ndarray)
+    assert "cupy" not in sys.modules
+
+
+def test_iteration_is_allocation_free():
+    """A steady-state PDHG step allocates no full-length temporaries."""
+    import tracemalloc
+    from pdlp_implementation.src.gpu_kernels import create_linear_operators
+    from pdlp_implementation.src.utils import PDLPWorkspace, prepare_gpu_data
+
+    problem = generate_transportation_problem(60, 60)
+    c, A_ub, A_eq, q = prepare_gpu_data(**problem, dtype=np.float64, backend="numpy")
+    _, _, K = create_linear_operators(A_eq, A_ub, c.shape[0], q.shape[0], np.float64, "numpy")
+    ws = PDLPWorkspace(c.shape[0], q.shape[0], A_eq.shape[0], np.float64, "numpy")
+    tau = sigma = np.float64(0.1)
+    ws.step(K, c, q, tau, sigma)  # warm-up
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for _ in range(5):
+            ws.step(K, c, q, tau, sigma)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # A single temporary would be at least c.nbytes (28.8 kB here)
+    assert current - before == 0
+    assert peak - before < c.nbytes // 10
+
+
+def test_pdlp_mode_converges_faster(transportation):
+    """Restarted adaptive PDLP reaches tolerance in fewer iterations than plain PDHG."""
+    problem, ref_obj = transportation
+    kwargs = dict(max_itr=20000, tolcheck=64, eps_pri=1e-4, dtype=np.float64, full_output=True)
+    x_pdlp, info_pdlp = pdlp_gpu(**problem, mode="pdlp", **kwargs)
+    _, info_pdhg = pdlp_gpu(**problem, mode="pdhg", **kwargs)
+
+    assert info_pdlp["status"] == "optimal"
+    assert info_pdlp["iterations"] < info_pdhg["iterations"]
+    assert info_pdlp["y"].shape == (problem["b_eq"].shape[0] + problem["b_ub"].shape[0],)
+    assert np.isclose(problem["c"] @ x_pdlp, ref_obj, rtol=1e-3)
+
+
+def test_unknown_mode_raises(transportation):
+    problem, _ = transportation
+    with pytest.raises(ValueError):
+        pdlp_gpu(**problem, mode="simplex")
+
+
+def test_preconditioning_badly_scaled_rows(transportation):
+    """Ruiz + Pock-Chambolle recovers convergence and reports original-unit results."""
+    import scipy.sparse
+    problem, ref_obj = transportation
+    problem = dict(problem)
+    D = 10.0 ** np.random.default_rng(0).uniform(-2, 2, problem["A_ub"].shape[0])
+    problem["A_ub"] = scipy.sparse.diags(D) @ problem["A_ub"]
+    problem["b_ub"] = D * problem["b_ub"]
+
+    x, info = pdlp_gpu(**problem, mode="pdlp", max_itr=20000, tolcheck=64, eps_pri=1e-4,
+                       dtype=np.float64, full_output=True, ruiz_iters=10, pock_chambolle=True)
+    assert info["status"] == "optimal"
+    assert np.isclose(problem["c"] @ x, ref_obj, rtol=1e-3)
+
+    # The returned dual is in original units: c - K^T y ~ 0 for K = [A_eq; -A_ub]
+    n_eq = problem["A_eq"].shape[0]
+    y = info["y"]
+    d_res = problem["c"] - problem["A_eq"].T @ y[:n_eq] + problem["A_ub"].T @ y[n_eq:]
+    assert np.linalg.norm(d_res) / (1 + np.linalg.norm(problem["c"])) < 1e-4
+
+
+def test_batched_matches_separate_solves(transportation):
+    """k perturbed cost vectors solved in one call match their HiGHS objectives."""
+    problem, _ = transportation
+    rng = np.random.default_rng(1)
+    C = problem["c"][:, None] * rng.uniform(0.5, 1.5, size=(problem["c"].shape[0], 4))
+    X, info = pdlp_gpu(**{**problem, "c": C}, max_itr=200000, tolcheck=64, eps_pri=1e-4,
+                       dtype=np.float64, full_output=True)
+    assert X.shape == C.shape
+    assert info["status"] == ["optimal"] * C.shape[1]
+    for j in range(C.shape[1]):
+        ref = scipy.optimize.linprog(C[:, j], A_ub=problem["A_ub"], b_ub=problem["b_ub"],
+                                     A_eq=problem["A_eq"], b_eq=problem["b_eq"], bounds=(None, None))
+        assert np.isclose(C[:, j] @ X[:, j], ref.fun, rtol=1e-3)
+
+    # A batch of one reproduces the unbatched solve
+    x = pdlp_gpu(**problem, max_itr=2000, tolcheck=64, dtype=np.float64)
+    X1 = pdlp_gpu(**{**problem, "c": problem["c"][:, None]}, max_itr=2000, tolcheck=64,
+                  dtype=np.float64)
+    assert np.allclose(X1[:, 0], x)
+
+
+@pytest.mark.parametrize("mode", ["pdhg", "pdlp"])
+def test_persistent_solver_updates_and_warm_start(transportation, mode):
+    """PDLPSolver re-solves updated problems from the previous solution."""
+    from pdlp_implementation.src.pdlp_solver import PDLPSolver
+
+    problem, ref_obj = transportation
+    options = dict(max_iter=200000, tolcheck=64, eps_pri=1e-4)
+    solver = PDLPSolver(**problem, dtype=np.float64, mode=mode)
+    x, _ = solver.solve(**options)
+    assert np.isclose(problem["c"] @ x, ref_obj, rtol=1e-3)
+    cold = solver.info["iterations"]
+
+    # Re-solving the unchanged problem is immediate from the warm start
+    solver.solve(**options)
+    assert solver.info["iterations"] < cold
+
+    # New costs, looser supplies, and every A_ub row scaled by 2 (same feasible set)
+    c = problem["c"] * np.random.default_rng(0).uniform(0.9, 1.1, problem["c"].shape[0])
+    b_ub = problem["b_ub"].copy()
+    b_ub[:5] *= 1.05
+    solver.update_c(c)
+    solver.update_b(b_ub=2 * b_ub)
+    solver.update_matrix_values(A_ub=2 * problem["A_ub"])
+    x, y = solver.solve(**options)
+    ref = scipy.optimize.linprog(c, A_ub=problem["A_ub"], b_ub=b_ub, A_eq=problem["A_eq"],
+                                 b_eq=problem["b_eq"], bounds=(None, None))
+    assert solver.info["status"] == "optimal"
+    assert np.isclose(c @ x, ref.fun, rtol=1e-3)
+    # update_c must not write through to the caller's cost vector
+    assert np.allclose(problem["c"], generate_transportation_problem(5, 5)["c"])
+
+    with pytest.raises(ValueError):
+        solver.update_c(c[:-1])
+
+
+@pytest.mark.parametrize("mode", ["pdhg", "pdlp"])
+def test_bounds_replace_nonnegativity_rows(transportation, mode):
+    """x >= 0 as a projected bound instead of -I rows: same optimum, far fewer iterations."""
+    from utils.bounds import singleton_rows_to_bounds
+
+    problem, ref_obj = transportation
+    A_ub, b_ub, lb, ub = singleton_rows_to_bounds(problem["A_ub"], problem["b_ub"])
+    assert A_ub.shape[0] == 10 and np.all(lb == 0) and np.all(np.isinf(ub))
+    options = dict(max_itr=100000, tolcheck=10, eps_pri=1e-4, dtype=np.float64, mode=mode,
+                   full_output=True)
+    _, rows = pdlp_gpu(**problem, **options)
+    x, info = pdlp_gpu(problem["c"], A_ub, b_ub, problem["A_eq"], problem["b_eq"], lb=lb, ub=ub,
+                       **options)
+    assert info["status"] == "optimal"
+    assert np.isclose(problem["c"] @ x, ref_obj, rtol=1e-3)
+    assert x.min() >= 0
+    assert info["iterations"] < rows["iterations"]
+
+
+def test_active_upper_bounds_preconditioned_and_batched(transportation):
+    """Finite upper bounds that bind, under preconditioning and in a batch."""
+    from utils.bounds import singleton_rows_to_bounds
+
+    problem, _ = transportation
+    A_ub, b_ub, lb, _ = singleton_rows_to_bounds(problem["A_ub"], problem["b_ub"])
+    free = scipy.optimize.linprog(problem["c"], A_ub, b_ub, problem["A_eq"], problem["b_eq"],
+                                  bounds=list(zip(lb, [None] * lb.size)))
+    ub = 0.7 * free.x.max()
+    C = problem["c"][:, None] * np.random.default_rng(1).uniform(0.9, 1.1, (lb.size, 3))
+    x, info = pdlp_gpu(C, A_ub, b_ub, problem["A_eq"], problem["b_eq"], lb=lb, ub=ub,
+                       eps_pri=1e-4, dtype=np.float64, full_output=True, ruiz_iters=5,
+                       pock_chambolle=True)
+    assert x.max() <= ub
+    for j in range(3):
+        ref = scipy.optimize.linprog(C[:, j], A_ub, b_ub, problem["A_eq"], problem["b_eq"],
+                                     bounds=(0, ub))
+        assert info["status"][j] == "optimal"
+        assert np.isclose(C[:, j] @ x[:, j], ref.fun, rtol=1e-3)
+
+
+def test_mixed_precision_reaches_float64_accuracy(transportation):
+    """float32 iterations plus refinement meet 1e-8 tolerances measured in float64."""
+    from utils.bounds import singleton_rows_to_bounds
+
+    problem, _ = transportation
+    A_ub, b_ub, lb, _ = singleton_rows_to_bounds(problem["A_ub"], problem["b_ub"])
+    ref = scipy.optimize.linprog(problem["c"], A_ub, b_ub, problem["A_eq"], problem["b_eq"],
+                                 bounds=(0, None))
+    tols = dict(eps_pri=1e-8, eps_dual=1e-8, eps_gap=1e-8)
+    x, info = pdlp_gpu(problem["c"], A_ub, b_ub, problem["A_eq"], problem["b_eq"], lb=lb,
+                       mode="pdlp", dtype=np.float32, mixed_precision=True, full_output=True,
+                       **tols)
+    assert info["status"] == "optimal"
+    assert info["refinements"] >= 1
+    assert x.dtype == np.float64 and info["y"].dtype == np.float64
+    assert info["primal_feas"] < 1e-8 and info["dual_feas"] < 1e-8 and info["dual_gap"] < 1e-8
+    assert abs(problem["c"] @ x - ref.fun) < 1e-7 * abs(ref.fun)
+
+
+def test_polish_reaches_vertex_accuracy(transportation):
+    """Iterating to 1e-4 and polishing meets 1e-8 with fewer iterations than plain PDLP."""
+    from utils.bounds import singleton_rows_to_bounds
+
+    problem, _ = transportation
+    A_ub, b_ub, lb, _ = singleton_rows_to_bounds(problem["A_ub"], problem["b_ub"])
+    ref = scipy.optimize.linprog(problem["c"], A_ub, b_ub, problem["A_eq"], problem["b_eq"],
+                                 bounds=(0, None))
+    options = dict(mode="pdlp", dtype=np.float64, backend="numpy", full_output=True,
+                   eps_pri=1e-8, eps_dual=1e-8, eps_gap=1e-8)
+    _, plain = pdlp_gpu(problem["c"], A_ub, b_ub, problem["A_eq"], problem["b_eq"], lb=lb,
+                        **options)
+    x, info = pdlp_gpu(problem["c"], A_ub, b_ub, problem["A_eq"], problem["b_eq"], lb=lb,
+                       polish=True, **options)
+    assert info["status"] == "optimal" and info["polished"]
+    assert info["iterations"] < plain["iterations"]
+    assert info["primal_feas"] < 1e-8 and info["dual_feas"] < 1e-8 and info["dual_gap"] < 1e-8
+    assert abs(problem["c"] @ x - ref.fun) < 1e-12 * abs(ref.fun)
+    assert x.min() >= 0
+
+
+def test_operator_cache_reuses_setup(transportation, tmp_path):
+    """A cached operator (memory or disk) gives the same solve as a fresh setup."""
+    from utils.operator_cache import OperatorCache
+
+    problem, _ = transportation
+    options = dict(mode="pdlp", dtype=np.float64, backend="numpy", full_output=True,
+                   ruiz_iters=10, pock_chambolle=True, max_itr=500)
+    x_ref, _ = pdlp_gpu(**problem, **options)
+    cache = OperatorCache(directory=str(tmp_path))
+    for _ in range(2):
+        x, _ = pdlp_gpu(**problem, **options, cache=cache)
+        np.testing.assert_array_equal(x, x_ref)
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    cache.clear()
+    pdlp_gpu(**{**problem, "c": 2 * problem["c"]}, **options, cache=cache)
+    assert cache.disk_hits == 1
+    x_new, _ = pdlp_gpu(**problem, **options, cache=cache)
+    np.testing.assert_array_equal(x_new, x_ref)
+    pdlp_gpu(**{**problem, "A_eq": 2 * problem["A_eq"]}, **options, cache=cache)
+    assert cache.misses == 2
+
+
+def _infeasible_and_unbounded(problem):
+    """Perturbed transportation LPs: demand above supply, and a free cheap extra variable."""
+    import scipy.sparse
+    from utils.bounds import singleton_rows_to_bounds
+
+    A_ub, b_ub, lb, ub = singleton_rows_to_bounds(problem["A_ub"], problem["b_ub"])
+    infeasible = dict(c=problem["c"], A_ub=A_ub, b_ub=np.where(b_ub < 0, 10 * b_ub, b_ub),
+                      A_eq=problem["A_eq"], b_eq=problem["b_eq"], lb=lb, ub=ub)
+    extra = lambda A: scipy.sparse.hstack((A, scipy.sparse.csr_matrix((A.shape[0], 1))), "csr")
+    unbounded = dict(c=np.append(problem["c"], -1.0), A_ub=extra(A_ub), b_ub=b_ub,
+                     A_eq=extra(scipy.sparse.csr_matrix(problem["A_eq"])), b_eq=problem["b_eq"],
+                     lb=np.append(lb, 0.0), ub=np.append(ub, np.inf))
+    return infeasible, unbounded
+
+
+@pytest.mark.parametrize("mode", ["pdhg", "pdlp"])
+def test_infeasibility_certificates(transportation, mode):
+    """Infeasible and unbounded LPs stop early with a valid certificate."""
+    infeasible, unbounded = _infeasible_and_unbounded(transportation[0])
+    options = dict(mode=mode, dtype=np.float64, backend="numpy", full_output=True,
+                   max_itr=20000, ruiz_iters=10, pock_chambolle=True)
+
+    _, info = pdlp_gpu(**infeasible, **options)
+    assert info["status"] == "primal_infeasible" and info["iterations"] < 20000
+    y = info["certificate"]
+    n_eq = infeasible["b_eq"].size
+    assert y[n_eq:].min() >= 0
+    # lambda = A_ub^T y_ub - A_eq^T y_eq must be absorbed by x >= 0 (lambda >= 0 up to eps)
+    lam = infeasible["A_ub"].T @ y[n_eq:] - infeasible["A_eq"].T @ y[:n_eq]
+    dual_obj = infeasible["b_eq"] @ y[:n_eq] - infeasible["b_ub"] @ y[n_eq:]
+    assert dual_obj > 0
+    assert np.linalg.norm(np.minimum(lam, 0)) <= 1e-4 * dual_obj
+
+    _, info = pdlp_gpu(**unbounded, **options)
+    assert info["status"] == "dual_infeasible" and info["iterations"] < 20000
+    ray = info["certificate"]
+    assert unbounded["c"] @ ray < 0 and ray.min() >= 0
+    assert np.abs(unbounded["A_eq"] @ ray).max() <= 1e-4 * -(unbounded["c"] @ ray)
+    assert (unbounded["A_ub"] @ ray).max() <= 1e-4 * -(unbounded["c"] @ ray)
+
+
+def test_telemetry_trace(transportation, tmp_path, capsys):
+    """Telemetry sees every check and times each phase; without it nothing is printed."""
+    import csv
+    import json
+    from utils.telemetry import Telemetry
+
+    problem = transportation[0]
+    options = dict(dtype=np.float64, backend="numpy", mode="pdlp", full_output=True)
+    x, info = pdlp_gpu(**problem, **options)
+    assert capsys.readouterr().out == ""
+
+    seen = []
+    telemetry = Telemetry(callback=seen.append)
+    x, info = pdlp_gpu(**problem, **options, telemetry=telemetry)
+    assert info["status"] == "optimal"
+    assert seen == telemetry.checks and len(seen) > 1
+    last = seen[-1]
+    assert last["solver"] == "pdlp" and last["iteration"] < info["iterations"] + 1
+    assert {"primal_feas", "dual_feas", "dual_gap", "step_size", "elapsed"} <= last.keys()
+    assert [r["elapsed"] for r in seen] == sorted(r["elapsed"] for r in seen)
+    phases = telemetry.phases
+    assert {"transfer", "setup", "spectral_norm", "iterations", "checks"} <= phases.keys()
+    assert phases["spectral_norm"]["seconds"] <= phases["setup"]["seconds"]
+    assert phases["checks"]["seconds"] <= phases["iterations"]["seconds"]
+
+    telemetry.to_json(tmp_path / "trace.json")
+    telemetry.to_csv(tmp_path / "trace.csv")
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    assert len(trace["checks"]) == len(seen) and trace["events"]
+    with open(tmp_path / "trace.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == len(seen) and float(rows[-1]["dual_gap"]) == last["dual_gap"]
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+import scipy.optimize
+import scipy.sparse
+from pdlp_implementation.src.pdlp_solver import pdlp_gpu
+from test_data.generate_transportation import generate_transportation_problem
+from utils.presolve import presolve
+
+
+def _redundant_lp(seed):
+    """Random feasible LP with one instance of every reduction presolve knows."""
+    rng = np.random.default_rng(seed)
+    n, m = 30, 15
+    A = scipy.sparse.random(m, n, density=0.3, random_state=seed).toarray()
+    x0 = rng.random(n)
+    b = A @ x0 + rng.random(m)
+    A_ub = np.vstack((A, 3 * A[:3], 2 * np.eye(n)[:5], np.zeros((1, n)), np.ones((1, n))))
+    b_ub = np.concatenate((b, 3 * b[:3] + [0., 1., 0.], np.ones(5), [1.], [1e6]))
+    E = scipy.sparse.random(4, n, density=0.3, random_state=seed + 1).toarray()
+    A_eq = np.vstack((E, -2 * E[:1], np.eye(n)[7:8]))
+    b_eq = A_eq @ x0
+    A_ub[:, -1] = A_eq[:, -1] = 0  # an empty column
+    c = rng.standard_normal(n)
+    lb, ub = np.zeros(n), np.full(n, 2.0)
+    ub[3] = 0.0  # a fixed variable
+    return dict(c=c, A_ub=scipy.sparse.coo_matrix(A_ub), b_ub=b_ub,
+                A_eq=scipy.sparse.coo_matrix(A_eq), b_eq=b_eq, lb=lb, ub=ub)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_postsolve_recovers_primal_and_dual(seed):
+    """Every reduction fires, and postsolved (x, y) is optimal for the original LP."""
+    lp = _redundant_lp(seed)
+    full = scipy.optimize.linprog(lp["c"], lp["A_ub"], lp["b_ub"], lp["A_eq"], lp["b_eq"],
+                                  bounds=list(zip(lp["lb"], lp["ub"])))
+    reduced = presolve(**lp)
+    assert all(reduced.stats[k] > 0 for k in ("singleton_eq_rows", "singleton_ub_rows",
+                                              "fixed_columns", "empty_rows", "empty_columns",
+                                              "dominated_rows", "duplicate_rows"))
+    p = reduced.problem
+    sol = scipy.optimize.linprog(p["c"], p["A_ub"], p["b_ub"], p["A_eq"], p["b_eq"],
+                                 bounds=list(zip(p["lb"], p["ub"])))
+    assert np.isclose(sol.fun + reduced.offset, full.fun)
+
+    # HiGHS marginals in the PDLP convention: y_eq = d obj / d b_eq, y_ub = -d obj / d b_ub
+    x, y = reduced.postsolve(sol.x, np.concatenate((sol.eqlin.marginals, -sol.ineqlin.marginals)))
+    m_eq = lp["A_eq"].shape[0]
+    y_eq, y_ub = y[:m_eq], y[m_eq:]
+    assert np.all(lp["A_ub"] @ x <= lp["b_ub"] + 1e-9)
+    assert np.allclose(lp["A_eq"] @ x, lp["b_eq"])
+    assert np.all(y_ub >= 0)
+    reduced_costs = lp["c"] - lp["A_eq"].T @ y_eq + lp["A_ub"].T @ y_ub
+    dual_obj = (lp["b_eq"] @ y_eq - lp["b_ub"] @ y_ub + lp["lb"] @ np.maximum(reduced_costs, 0)
+                - lp["ub"] @ np.maximum(-reduced_costs, 0))
+    assert np.isclose(dual_obj, full.fun)
+    assert np.isclose(lp["c"] @ x, full.fun)
+
+
+def test_infeasible_singletons_raise():
+    """Singleton rows x0 <= 1 and x0 >= 2 prove infeasibility."""
+    A_ub = scipy.sparse.csr_matrix(np.array([[1., 0.], [-1., 0.], [1., 1.]]))
+    with pytest.raises(ValueError):
+        presolve(np.ones(2), A_ub, np.array([1., -2., 5.]))
+
+
+def test_pdlp_with_presolve():
+    """pdlp_gpu(presolve=True) returns the solution of the original transportation LP."""
+    problem = generate_transportation_problem(5, 5)
+    ref = scipy.optimize.linprog(problem["c"], A_ub=problem["A_ub"], b_ub=problem["b_ub"],
+                                 A_eq=problem["A_eq"], b_eq=problem["b_eq"], bounds=(None, None))
+    x, info = pdlp_gpu(**problem, eps_pri=1e-4, dtype=np.float64, mode="pdlp",
+                       full_output=True, presolve=True)
+    assert info["status"] == "optimal"
+    assert x.shape == problem["c"].shape
+    assert info["y"].shape == (problem["b_eq"].size + problem["b_ub"].size,)
+    assert info["presolve"]["rows"] == (36, 10)
+    assert info["presolve_time"] > 0
+    assert np.isclose(problem["c"] @ x, ref.fun, rtol=1e-3)
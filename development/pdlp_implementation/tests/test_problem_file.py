@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+import scipy.sparse
+from test_data.generate_transportation import (generate_transportation_problem,
+                                               write_transportation_problem)
+from test_data.generators import generate, lp_arguments
+from utils.problem_file import ProblemFile, convert_directory, load_problem_file, save_problem
+
+
+def test_problem_file_round_trip(tmp_path):
+    """A problem file maps back bit-identically, shares memory with the mapping and is checked."""
+    problem = lp_arguments(generate("network_flow", 2, n_nodes=30))
+    path = str(tmp_path / "flow.lpb")
+    checksum = save_problem(path, **problem, metadata={"family": "network_flow"})
+
+    f = ProblemFile(path, verify=True)
+    assert f.checksum == checksum and f.metadata == {"family": "network_flow"}
+    loaded = f.problem()
+    for key, value in problem.items():
+        if scipy.sparse.issparse(value):
+            assert loaded[key].shape == value.shape and (loaded[key] != value).nnz == 0
+            assert not loaded[key].data.flags.owndata and loaded[key].indices.dtype == np.int32
+        elif value is None:
+            assert loaded[key] is None
+        else:
+            np.testing.assert_array_equal(loaded[key], value)
+    cast = f.to_backend("numpy", np.float32)
+    assert cast["c"].dtype == np.float32 and cast["A_ub"].dtype == np.float32
+
+    with open(path, "r+b") as raw:  # flip one byte of c
+        raw.seek(raw.read().find(problem["c"].tobytes()))
+        byte = raw.read(1)[0]
+        raw.seek(-1, 1)
+        raw.write(bytes([byte ^ 0xFF]))
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        ProblemFile(path, verify=True)
+
+
+def test_convert_directory_layouts(tmp_path):
+    """The .mtx, dense .npy and streamed CSR .npy layouts convert to the same LP."""
+    reference = generate_transportation_problem(4, 5, write=True, data_dir=str(tmp_path / "mtx"))
+    dense = tmp_path / "dense"
+    dense.mkdir()
+    for key in ("c", "b_ub", "b_eq"):
+        np.save(dense / f"{key}.npy", reference[key])
+    for key in ("A_ub", "A_eq"):
+        np.save(dense / f"{key}.npy", reference[key].toarray())
+    write_transportation_problem(4, 5, data_dir=str(tmp_path / "csr"))
+
+    for layout in ("mtx", "dense", "csr"):
+        path = str(tmp_path / f"{layout}.lpb")
+        convert_directory(str(tmp_path / layout), path)
+        loaded = load_problem_file(path, verify=True)
+        for key in ("c", "b_ub", "b_eq"):
+            np.testing.assert_array_equal(loaded[key], reference[key])
+        for key in ("A_ub", "A_eq"):
+            assert (loaded[key] != reference[key]).nnz == 0
+        assert loaded["lb"] is None and loaded["ub"] is None
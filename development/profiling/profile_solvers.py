@@ -1,61 +1,88 @@
-import numpy as np
-import cupy as cp
-import time
-import scipy.io
-import tracemalloc
-from development.scs_implementation.src.scs_solver import SCSSolver
-from development.pdlp_implementation.src.pdlp_solver import PDLPSolver
-from development.scs_implementation.tests.baseline_solver import linprog_baseline
-
+"""Profile the solvers on one LP: harness timings and memory, plus cProfile hot spots.
 
-# Load problem data
-def load_problem_data(data_dir="development/test_data/data"):
-    """Load test problem data from disk."""
-    c = np.load(f"{data_dir}/c.npy")
-    b_eq = np.load(f"{data_dir}/b_eq.npy")
-    b_ub = np.load(f"{data_dir}/b_ub.npy")
-    A_eq = scipy.io.mmread(f"{data_dir}/A_eq.mtx")
-    A_ub = scipy.io.mmread(f"{data_dir}/A_ub.mtx")
-    return c, A_eq, b_eq, A_ub, b_ub
+The LP is read from ``--data-dir``, either an MPS file (``.mps[.gz]``,
+parsed once into a cached problem file), a problem file (``.lpb``, see
+``utils/problem_file.py``; memory-mapped) or a directory of c.npy,
+b_eq.npy, b_ub.npy, A_eq.mtx and A_ub.mtx, or, without one, generated as a
+transportation problem. Every
+solver is run once through ``benchmarks.run_all.run_once`` under cProfile
+and the ``MemorySampler``; the phase times, iterations, peak memory and the
+``--top`` functions by cumulative time are printed.
 
+Run from the development/ directory:
+    python profiling/profile_solvers.py --size 40 --top 15
+"""
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import sys
 
-# Profiling function
-def profile_solver(solver_func, solver_name, *args, **kwargs):
-    """Profiles execution time and memory usage of a solver."""
-    tracemalloc.start()
-    start_time = time.time()
-
-    result = solver_func(*args, **kwargs)
+import numpy as np
+import scipy.io
+import scipy.sparse
 
-    elapsed_time = time.time() - start_time
-    memory_used = tracemalloc.get_traced_memory()[1] / (1024 ** 2)  # MB
-    tracemalloc.stop()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.run_all import FAMILIES, SOLVERS, MemorySampler, run_once  # noqa: E402
+from utils.backend import get_backend  # noqa: E402
+from utils.mps import read_mps  # noqa: E402
+from utils.problem_file import load_problem_file  # noqa: E402
 
-    print(f"\n--- Profiling {solver_name} ---")
-    print(f"Execution Time: {elapsed_time:.6f} sec")
-    print(f"Memory Usage: {memory_used:.2f} MB")
 
-    return result
+def load_problem_data(data_dir):
+    """Load an LP from an MPS or problem file, or saved as .npy vectors and .mtx matrices."""
+    if data_dir.endswith((".mps", ".mps.gz")):
+        return read_mps(data_dir, cache=True)[0]
+    if os.path.isfile(data_dir):
+        return load_problem_file(data_dir)
+    return {"c": np.load(os.path.join(data_dir, "c.npy")),
+            "b_eq": np.load(os.path.join(data_dir, "b_eq.npy")),
+            "b_ub": np.load(os.path.join(data_dir, "b_ub.npy")),
+            "A_eq": scipy.sparse.csr_matrix(scipy.io.mmread(os.path.join(data_dir, "A_eq.mtx"))),
+            "A_ub": scipy.sparse.csr_matrix(scipy.io.mmread(os.path.join(data_dir, "A_ub.mtx")))}
 
 
-# Run profiling for all solvers
-def run_profiling():
-    """Profile all solvers and compare performance."""
-    c, A_eq, b_eq, A_ub, b_ub = load_problem_data()
+def profile_solver(solver, problem, backend, dtype, args):
+    """Run ``solver`` once under cProfile; returns the run summary and the profile stats."""
+    profiler = cProfile.Profile()
+    sampler = MemorySampler(backend)
+    with sampler:
+        profiler.enable()
+        result = run_once(solver, problem, backend, dtype, args.eps, args.max_itr)
+        profiler.disable()
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(args.top)
+    return result, sampler, stream.getvalue()
 
-    # Baseline: SciPy's linprog
-    x_baseline = profile_solver(linprog_baseline, "SciPy linprog",
-                                c, A_ub, b_ub, A_eq, b_eq)
 
-    # SCS Solver
-    scs_solver = SCSSolver(cp.asarray(c), A_ub=cp.asarray(A_ub), b_ub=cp.asarray(b_ub),
-                           A_eq=cp.asarray(A_eq), b_eq=cp.asarray(b_eq))
-    x_scs = profile_solver(scs_solver.solve, "SCS Solver", max_itr=1000)
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--size", type=int, default=30)
+    parser.add_argument("--solvers", nargs="+", default=list(SOLVERS), choices=SOLVERS)
+    parser.add_argument("--eps", type=float, default=1e-4)
+    parser.add_argument("--max-itr", type=int, default=20000)
+    parser.add_argument("--dtype", default="float32")
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    backend = get_backend(args.backend)
+    if args.data_dir is not None:
+        problem = load_problem_data(args.data_dir)
+    else:
+        problem = FAMILIES["transportation"](args.size, 0)
 
-    # PDLP Solver
-    pdlp_solver = PDLPSolver(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq)
-    x_pdlp, y_pdlp = profile_solver(pdlp_solver.solve, "PDLP Solver", max_iter=1000)
+    for solver in args.solvers:
+        result, sampler, stats = profile_solver(solver, problem, backend, np.dtype(args.dtype), args)
+        print(f"\n--- Profiling {solver} on {backend.name} ---")
+        print(f"Status: {result['status']}, iterations: {result['iterations']}")
+        print(f"Transfer {result['transfer_s']:.4f} s, setup {result['setup_s']:.4f} s, "
+              f"solve {result['solve_s']:.4f} s, total {result['total_s']:.4f} s")
+        print(f"Peak RSS {sampler.peak_rss / 2**20:.1f} MB, "
+              f"device pool {sampler.peak_pool / 2**20:.1f} MB")
+        print(stats)
 
 
 if __name__ == "__main__":
-    run_profiling()
+    main()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import ``<solver>_implementation.src``, ``utils`` and ``test_data``
+# relative to the development/ directory.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
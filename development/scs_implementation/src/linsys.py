@@ -0,0 +1,149 @@
+import numpy as np
+from utils.backend import get_backend
+
+
+def coldot(a, b):
+    """a^T b for vectors, or the per-column dot products of (n, k) arrays."""
+    return a @ b if a.ndim == 1 else (a * b).sum(axis=0)
+
+
+def conjugate_gradient(matvec, B, tol=1e-5, maxiter=None, x0=None, inv_diag=None, backend=None):
+    """Preconditioned conjugate gradient for SPD systems with one or many right-hand sides.
+
+    A 2-D ``B`` of shape (n, k) runs k independent CG recurrences in lockstep
+    so every operator application is one SpMM; columns that reach
+    ``||r|| <= tol * ||b||`` are frozen.
+
+    Args:
+        matvec (callable): Applies the SPD operator to an (n,) or (n, k) array.
+        B (array): Right-hand side(s).
+        tol (float): Relative residual tolerance.
+        maxiter (int, optional): Iteration cap; defaults to 10 * n.
+        x0 (array, optional): Starting point (warm start), shaped like ``B``.
+        inv_diag (array, optional): Inverse of a diagonal (Jacobi) preconditioner, shape (n,).
+        backend (str | Backend, optional): Array backend.
+
+    Returns:
+        tuple: (X, iterations)
+    """
+    xp = get_backend(backend, B).xp
+    if x0 is None:
+        X = xp.zeros_like(B)
+        R = B.copy()
+    else:
+        X = x0.copy()
+        R = B - matvec(X)
+    if inv_diag is not None and B.ndim == 2:
+        inv_diag = inv_diag[:, None]
+    Z = R if inv_diag is None else R * inv_diag
+    P = Z.copy()
+    rz = coldot(R, Z)
+    rr = coldot(R, R)
+    threshold = tol ** 2 * coldot(B, B)
+    maxiter = 10 * B.shape[0] if maxiter is None else maxiter
+
+    for itr in range(maxiter):
+        active = rr > threshold
+        if not bool(active.any()):
+            return X, itr
+        AP = matvec(P)
+        pAp = coldot(P, AP)
+        alpha = xp.where(active & (pAp > 0), rz / xp.where(pAp > 0, pAp, 1), 0)
+        X += alpha * P
+        R -= alpha * AP
+        if inv_diag is not None:
+            xp.multiply(R, inv_diag, out=Z)
+        rz_new = coldot(R, Z)
+        beta = xp.where(rz > 0, rz_new / xp.where(rz > 0, rz, 1), 0)
+        P *= beta
+        P += Z
+        rz = rz_new
+        rr = coldot(R, R)
+    return X, maxiter
+
+
+class IndirectSolver:
+    """Solve M z = r for M = [I A^T; -A I] through CG on (I + A^T A).
+
+    ``apply_A``/``apply_At`` are the matrix-free products; every solve reduces
+    to (I + A^T A) z_x = r_x - A^T r_y followed by z_y = r_y + A z_x. The CG
+    runs are inexact: each starts from the previous solution, is Jacobi
+    preconditioned with ``diag`` (the diagonal 1 + ||A_j||^2 of I + A^T A),
+    and stops at the tolerance chosen by ``set_accuracy``.
+    """
+
+    def __init__(self, apply_A, apply_At, n, diag=None, min_tol=1e-8, backend=None):
+        self.backend = get_backend(backend)
+        self.apply_A, self.apply_At = apply_A, apply_At
+        self.n = n
+        self.inv_diag = None if diag is None else 1 / diag
+        self.min_tol = min_tol
+        self.tol = min_tol
+        self.last_iterations = 0
+        self.total_iterations = 0
+        self._x0 = None
+
+    def set_accuracy(self, itr, residual=np.inf):
+        """Set the CG tolerance for outer iteration ``itr`` (1-based).
+
+        Follows the summable schedule (itr + 1)^-1.5 of the SCS paper,
+        tightened to a tenth of the latest outer residual and floored at
+        ``min_tol``. The first solve is therefore already below 1: a relative
+        tolerance of 1 would accept the starting point without a CG step.
+        """
+        self.tol = max(self.min_tol, min((itr + 1) ** -1.5, 0.1 * residual))
+
+    def _apply_IpAtA(self, x):
+        out = self.apply_At(self.apply_A(x))
+        out += x
+        return out
+
+    def solve(self, rhs, warm_start=True):
+        """Solve M z = rhs; ``warm_start=False`` starts CG from zero and does not
+        replace the stored warm-start point."""
+        n = self.n
+        B = rhs[:n] - self.apply_At(rhs[n:])
+        x0 = self._x0 if warm_start and self._x0 is not None and self._x0.shape == B.shape else None
+        z = self.backend.xp.empty_like(rhs)
+        z[:n], self.last_iterations = conjugate_gradient(
+            self._apply_IpAtA, B, self.tol, x0=x0, inv_diag=self.inv_diag, backend=self.backend)
+        self.total_iterations += self.last_iterations
+        if warm_start:
+            self._x0 = z[:n]
+        z[n:] = rhs[n:] + self.apply_A(z[:n])
+        return z
+
+
+class DirectSolver:
+    """Solve M z = r for M = [I A^T; -A I] with a sparse factorization computed once.
+
+    Negating the second block row turns M into the quasi-definite KKT matrix
+    [I A^T; A -I], which is symmetric and factorizable under any symmetric
+    ordering. SuperLU therefore runs with a fill-reducing minimum-degree
+    ordering on A^T + A and no pivoting (an LDL^T in LU form). Factoring the
+    KKT matrix rather than I + A^T A avoids the fill of forming A^T A, which
+    is dense whenever A has a few dense rows. Every solve is two triangular
+    solves.
+    """
+
+    def __init__(self, A, backend=None):
+        self.backend = backend = get_backend(backend, A)
+        m, n = A.shape
+        A = A if backend.issparse(A) else backend.csr_matrix(A)
+        sparse = backend.sparse
+        KKT = sparse.bmat([[sparse.identity(n, dtype=A.dtype), A.T],
+                           [A, -sparse.identity(m, dtype=A.dtype)]], format="csc")
+        self.factor = backend.splinalg.splu(KKT, permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.0,
+                                            options={"SymmetricMode": True})
+        self.n = n
+        self.fill = self.factor.L.nnz + self.factor.U.nnz
+        self.last_iterations = 0
+        self.total_iterations = 0
+
+    def set_accuracy(self, itr, residual=np.inf):
+        """Solves are exact; nothing to tighten."""
+
+    def solve(self, rhs, warm_start=True):
+        kkt_rhs = rhs.copy()
+        kkt_rhs[self.n:] *= -1
+        return self.factor.solve(kkt_rhs)
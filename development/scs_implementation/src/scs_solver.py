@@ -1,84 +1,475 @@
-import cupy as cp
-import cupyx.scipy.sparse
-import time
-from gpu_kernels import apply_A_kernel, apply_At_kernel
+import math
+import numpy as np
+import scipy.sparse
+from utils.backend import get_backend
+from utils.bounds import bounds_to_rows
+from utils.convergence import ConvergenceMonitor
+from utils.matrix_operations import StackedOperator, broadcast_columns
+from utils.polish import polish as run_polish
+from utils.scaling import precondition
+from utils.telemetry import resolve
+from .gpu_kernels import apply_A_kernel, apply_At_kernel
+from .linsys import DirectSolver, IndirectSolver, coldot
+
+# Polishing: loosest tolerance iterated to before the first polish, and how
+# much each failed polish tightens the tolerances
+POLISH_START_EPS = 1e-4
+POLISH_TIGHTEN = 10
 
 class SCSSolver:
-    def __init__(self, c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, dtype=cp.float32):
-        """Initialize the SCS solver with problem data."""
-        start = time.time()
+    def __init__(self, c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, dtype=np.float32,
+                 backend=None, ruiz_iters=0, pock_chambolle=False, linsys="indirect",
+                 lb=None, ub=None, telemetry=None):
+        """Initialize the SCS solver with problem data.
+
+        ``backend`` selects the array backend (``"numpy"`` or ``"cupy"``); by
+        default CuPy is used only when the inputs already live on the GPU.
+        ``ruiz_iters``/``pock_chambolle`` enable diagonal preconditioning of A;
+        solutions and residuals are still reported in original units.
+
+        A ``c`` of shape (n, k) and/or ``b_eq``/``b_ub`` of shape (m, k) set up
+        k LPs that share the constraint matrix; ``solve`` then runs them together.
+
+        ``linsys`` picks how the linear system of every iteration is solved:
+        ``"indirect"`` runs warm-started, Jacobi-preconditioned conjugate
+        gradient on the matrix-free I + A^T A with a decreasing tolerance,
+        ``"direct"`` factors the quasi-definite KKT matrix once and reuses the
+        factor (two triangular solves per iteration).
+
+        ``lb``/``ub`` bound the variables (by default x is free). The SCS cone
+        has no box projection, so finite bounds are appended to A_ub as
+        +-I rows; ``pdlp_gpu`` handles them natively.
+
+        ``telemetry`` (a ``utils.telemetry.Telemetry``) records the screened
+        and exact convergence checks and times the transfer, setup, iteration
+        and check phases.
+        """
+        if linsys not in ("indirect", "direct"):
+            raise ValueError(f"Unknown linsys {linsys!r}; expected 'indirect' or 'direct'")
+        self.backend = get_backend(backend, c, A_ub, A_eq)
+        self.telemetry = resolve(telemetry, self.backend)
+        xp = self.backend.xp
+
+        with self.telemetry.phase("transfer"):
+            # Missing constraint blocks become empty (0 x n) blocks
+            n = c.shape[0]
+            A_eq, b_eq = self._empty_block(A_eq, b_eq, A_ub, n)
+            A_ub, b_ub = self._empty_block(A_ub, b_ub, A_eq, n)
+            if lb is not None or ub is not None:
+                A_ub, b_ub = bounds_to_rows(n, lb, ub, self.backend.to_host(A_ub),
+                                            self.backend.to_host(b_ub))
+
+            # Combine constraints; 1-D vectors are shared across all LPs of a batch
+            to_host = self.backend.to_host
+            c, b_eq, b_ub = broadcast_columns(to_host(c), to_host(b_eq), to_host(b_ub))
+            # Host copy of the original data for polishing single LPs
+            self._host = None
+            if c.ndim == 1:
+                self._host = dict(c=c, A_ub=to_host(A_ub), b_ub=b_ub, A_eq=to_host(A_eq), b_eq=b_eq)
+            self.b = xp.concatenate((self.backend.asarray(b_eq, dtype),
+                                     self.backend.asarray(b_ub, dtype)))
+            self.h = xp.concatenate((self.backend.asarray(c, dtype), self.b))
+            self.c, self.b = self.h[:c.shape[0]], self.h[c.shape[0]:]
+            self.c_norm = xp.linalg.norm(self.c, axis=0)
+            self.b_norm = xp.linalg.norm(self.b, axis=0)
+
+            # Move data to the backend
+            self.A_eq, self.A_ub = self._convert_matrices(A_eq, A_ub, dtype)
+        with self.telemetry.phase("setup"):
+            # A = [A_eq; A_ub] is stacked once with an explicit A^T
+            self.A = StackedOperator(self.A_eq, self.A_ub, ub_sign=1.0, dtype=dtype,
+                                     backend=self.backend)
 
-        # Combine constraints
-        self.b = cp.concatenate((b_eq, b_ub))
-        self.h = cp.concatenate((c, self.b))
-        self.c, self.b = self.h[:c.shape[0]], self.h[c.shape[0]:]
+            # Optional preconditioning: A~ = D A E, c~ = E c, b~ = D b (norms above stay unscaled)
+            self.scaling = None
+            if ruiz_iters > 0 or pock_chambolle:
+                self.scaling = precondition(self.A, ruiz_iters, pock_chambolle)
+                self.scaling.scale_primal(self.c, out=self.c)
+                self.scaling.scale_dual(self.b, out=self.b)
 
-        # Move data to GPU
-        self.A_eq, self.A_ub = self._convert_matrices(A_eq, A_ub, dtype)
-        print(f"Took {time.time() - start:.4f} seconds to move problem data to GPU")
+            # Prepare backend buffers (batched (rows, k) buffers are created on first use)
+            self.dtype = np.dtype(dtype)
+            self.apply_A_out = xp.empty(self.A.shape[0], dtype=dtype)
+            self.apply_At_out = xp.empty(self.c.shape[0], dtype=dtype)
+            self._batch_out = {}
+            if linsys == "direct":
+                self.linsys = DirectSolver(self.A.K, self.backend)
+            else:
+                self.linsys = IndirectSolver(self.apply_A, self.apply_At, self.c.shape[0],
+                                             diag=1 + self.A.column_sq_norms(),
+                                             min_tol=max(1e-8, 10 * np.finfo(dtype).eps),
+                                             backend=self.backend)
+            self.cg_iterations = []
+            self.info = None
 
-        # Prepare GPU buffers
-        self.apply_A_out = cp.empty(self.A_eq.shape[0] + self.A_ub.shape[0], dtype=dtype)
-        self.apply_At_out = cp.empty(self.c.shape[0], dtype=dtype)
+            # M^{-1} h is fixed for the whole solve (Sherman-Morrison term), so it is solved
+            # accurately
+            self.Minvh = self._solve_M(self.h, warm_start=False)
+            self.h_Minvh = coldot(self.h, self.Minvh)
+
+    def _empty_block(self, A, b, other, n):
+        """Return (A, b), replacing a missing block with a 0-row block shaped like ``other``."""
+        if A is not None:
+            return A, b
+        if other is not None and self.backend.issparse(other):
+            return scipy.sparse.csr_matrix((0, n)), np.zeros(0)
+        return np.zeros((0, n)), np.zeros(0)
 
     def _convert_matrices(self, A_eq, A_ub, dtype):
-        """Convert input matrices to appropriate GPU format."""
-        if isinstance(A_eq, cp.ndarray) and isinstance(A_ub, cp.ndarray):
-            return cp.asarray(A_eq, dtype=dtype), cp.asarray(A_ub, dtype=dtype)
-        elif cupyx.scipy.sparse.issparse(A_eq) and cupyx.scipy.sparse.issparse(A_ub):
-            return cupyx.scipy.sparse.csr_matrix(A_eq, dtype=dtype), cupyx.scipy.sparse.csr_matrix(A_ub, dtype=dtype)
+        """Convert input matrices to appropriate backend format."""
+        if self.backend.issparse(A_eq) and self.backend.issparse(A_ub):
+            return self.backend.csr_matrix(A_eq, dtype), self.backend.csr_matrix(A_ub, dtype)
+        elif not self.backend.issparse(A_eq) and not self.backend.issparse(A_ub):
+            return self.backend.as_matrix(A_eq, dtype), self.backend.as_matrix(A_ub, dtype)
         else:
             raise ValueError("Matrix format not recognized")
 
+    def _out(self, name, buffer, like):
+        """Output buffer matching ``like``: the 1-D buffer, or a cached (rows, k) one."""
+        if like.ndim == 1:
+            return buffer
+        shape = (buffer.shape[0], like.shape[1])
+        out = self._batch_out.get(name)
+        if out is None or out.shape != shape:
+            out = self._batch_out[name] = self.backend.xp.empty(shape, dtype=self.dtype)
+        return out
+
     def apply_A(self, x):
-        """Apply A to x using CUDA kernel."""
-        return apply_A_kernel(x, self.A_eq, self.A_ub, self.apply_A_out)
+        """Apply A to x with one SpMV (one SpMM for batched x)."""
+        return apply_A_kernel(x, self.A, self._out("A", self.apply_A_out, x))
 
     def apply_At(self, y):
-        """Apply A^T to y using CUDA kernel."""
-        return apply_At_kernel(y, self.A_eq, self.A_ub, self.apply_At_out)
+        """Apply A^T to y with one SpMV (one SpMM for batched y)."""
+        return apply_At_kernel(y, self.A, self._out("At", self.apply_At_out, y))
+
+    def apply_IpAtA(self, x):
+        """Apply (I + A^T A) to x."""
+        out = self.apply_At(self.apply_A(x))
+        out += x
+        return out
+
+    def _solve_M(self, rhs, warm_start=True):
+        """Solve [I A^T; -A I] z = rhs with the configured linear-system solver."""
+        return self.linsys.solve(rhs, warm_start)
+
+    def solve(self, max_itr=100000, tolcheck=10, eps_pri=1e-6, eps_dual=1e-4, eps_gap=1e-4,
+              eps_infeas=1e-4, eps_ubdd=1e-4, polish=False):
+        """Solve the linear program using the SCS method.
+
+        Convergence is screened every few iterations from the linear system
+        just solved (no SpMV), read back asynchronously on an adaptive
+        schedule (``tolcheck`` is the shortest interval), and confirmed with an
+        exact check only when the screen passes. A screen that fails checks
+        the homogeneous embedding for a certificate of infeasibility instead.
+
+        ``self.info`` receives the status (``"optimal"``, ``"primal_infeasible"``,
+        ``"dual_infeasible"``, ``"iteration_limit"``) and iteration count; a
+        certificate, normalized to b^T y = -1 (dual ray) or c^T x = -1 (primal
+        ray), is kept as ``self.info["certificate"]`` and x is then NaN.
+
+        ``polish=True`` stops iterating at a loose tolerance (``POLISH_START_EPS``)
+        and polishes the iterate with ``utils.polish``; a failed polish
+        tightens the tolerances and iterating continues. A polished x is
+        returned in float64 and ``self.info["polished"]`` records the outcome.
+        Single LPs only.
 
-    def solve(self, max_itr=100000, tolcheck=10, eps_pri=1e-6, eps_dual=1e-4, eps_gap=1e-4):
-        """Solve the linear program using the SCS method."""
-        u, v = cp.zeros(self.h.shape[0]+1, dtype=self.h.dtype), cp.zeros(self.h.shape[0]+1, dtype=self.h.dtype)
+        Batched problems return x of shape (n, k); LPs that converge are
+        dropped from the remaining iterations. The CG iterations spent in each
+        outer iteration (0 with ``linsys="direct"``) are kept in ``self.cg_iterations``.
+        """
+        self.cg_iterations = []
+        self._last_check = 0
+        self._polish_attempts = 0
+        self._residual = np.inf
+        if self.h.ndim == 2:
+            if polish:
+                raise ValueError("polish supports a single (1-D) LP only")
+            with self.telemetry.phase("iterations"):
+                return self._solve_batched(max_itr, tolcheck, eps_pri, eps_dual, eps_gap)
+        xp = self.backend.xp
+        u, v = xp.zeros(self.h.shape[0]+1, dtype=self.h.dtype), xp.zeros(self.h.shape[0]+1, dtype=self.h.dtype)
         v[-1] = 1.0
         itr = 0
+        monitor = ConvergenceMonitor(self.backend, tolcheck)
+        norms = float(self.c_norm), float(self.b_norm)
+        self.info = {"status": "iteration_limit"}
+        target = (eps_pri, eps_dual, eps_gap)
+        inner = [max(eps, POLISH_START_EPS) for eps in target] if polish else list(target)
+        polished = None
 
-        while itr < max_itr:
-            itr += 1
-            # Apply GPU-accelerated linear algebra operations
-            utilde = self._compute_utilde(u, v)
-            u, v = self._update_primal_dual(utilde, u, v)
+        with self.telemetry.phase("iterations"):
+            while itr < max_itr:
+                itr += 1
+                # Apply backend linear algebra operations
+                utilde, w = self._compute_utilde(u, v, itr)
+                u, v = self._update_primal_dual(utilde, u, v)
 
-            # Check for convergence
-            if itr % tolcheck == 0 and self._check_termination(u, v, eps_pri, eps_dual, eps_gap):
-                break
+                # Screen for convergence without syncing; confirm exactly when the screen passes
+                if monitor.due(itr):
+                    monitor.submit(itr, self._screen_stats(w, utilde, v))
+                polled = monitor.poll()
+                if polled is None:
+                    continue
+                if self._screen(polled, monitor, norms, *inner):
+                    with self.telemetry.phase("checks"):
+                        converged = self._check_termination(u, v, *inner, itr)
+                    if converged:
+                        if polish:
+                            polished = self._polish(u, *target)
+                        if polished is not None or inner == list(target):
+                            self.info["status"] = "optimal"
+                            break
+                        inner = [max(i / POLISH_TIGHTEN, eps) for i, eps in zip(inner, target)]
+                else:
+                    with self.telemetry.phase("checks"):
+                        certificate = self._check_certificates(u, v, eps_infeas, eps_ubdd)
+                    if certificate is not None:
+                        self.info["status"], self.info["certificate"] = certificate
+                        self.telemetry.event("scs", f"Certificate found: "
+                                             f"{certificate[0].replace('_', ' ')}. Terminating...")
+                        break
+        self.info["iterations"] = itr
+        if polish:
+            self.info["polished"] = polished is not None
+            self.info["polish_attempts"] = self._polish_attempts
 
-        return u[:self.c.shape[0]] / u[-1]
+        if polished is not None:
+            return polished
+        if "certificate" in self.info:
+            return self.backend.xp.full(self.c.shape[0], np.nan, dtype=self.dtype)
+        x = self._recover_x(u)
+        return x if self.scaling is None else self.scaling.unscale_primal(x, out=x)
 
-    def _compute_utilde(self, u, v):
-        """Compute intermediate update step."""
+    def _polish(self, u, eps_pri, eps_dual, eps_gap):
+        """Polish the iterate u with ``utils.polish``; the float64 x on success, else None."""
+        n, n_eq = self.c.shape[0], self.A_eq.shape[0]
+        to_host = self.backend.to_host
+        x = self._recover_x(u)
+        y = u[n:n+self.b.shape[0]] / u[-1]
+        if self.scaling is not None:
+            self.scaling.unscale_primal(x, out=x)
+            self.scaling.unscale_dual(y, out=y)
+        # SCS duals satisfy A^T y + c = 0; the PDLP convention flips the equality block
+        y = to_host(y).astype(np.float64)
+        y[:n_eq] *= -1
+        x, _, stats = run_polish(**self._host, x=to_host(x), y=y, eps_pri=eps_pri,
+                                 eps_dual=eps_dual, eps_gap=eps_gap)
+        self._polish_attempts += 1
+        self.telemetry.event(
+            "scs", f"Polish {self._polish_attempts}: "
+            f"{'success' if stats['success'] else 'failed'}, primal_feas "
+            f"{stats['primal_feas']:.2e} dual_feas {stats['dual_feas']:.2e} "
+            f"gap {stats['dual_gap']:.2e}", attempt=self._polish_attempts, **stats)
+        return self.backend.asarray(x, np.float64) if stats["success"] else None
+
+    def _recover_x(self, u):
+        """x = u_x / tau, NaN where tau has collapsed to zero."""
+        xp = self.backend.xp
+        tau = u[-1]
+        x = u[:self.c.shape[0]] / xp.where(tau > 0, tau, 1)
+        x[..., tau <= 0] = np.nan
+        return x
+
+    def _check_certificates(self, u, v, eps_infeas, eps_ubdd):
+        """Look for a certificate of infeasibility in the embedding iterate (u, v).
+
+        A dual ray y (A^T y = 0, y_ub >= 0, b^T y < 0) proves the primal
+        infeasible; a primal ray x with A x + s = 0, s_ub >= 0 and c^T x < 0
+        proves it unbounded. Residuals are relative to ||b|| |b^T y|^{-1} and
+        ||c|| |c^T x|^{-1} as in SCS, and measured in original units. While a
+        candidate ray exists, the CG tolerance relative to ||u|| is tightened
+        to the residual at which the ratio meets eps_infeas / eps_ubdd; the
+        ratio itself is normalized by ||b|| / |b^T y| rather than by the CG
+        right-hand side and would stall above its threshold.
+        Returns ``(status, ray)`` with the ray in original units, or None.
+        """
+        xp = self.backend.xp
+        n, m = self.c.shape[0], self.b.shape[0]
+        f64 = lambda a: a.astype(np.float64, copy=False)
+        u_norm = float(xp.linalg.norm(f64(u)))
+        y = u[n:n+m]
+        by = float(f64(self.b) @ f64(y))
+        if by < 0:
+            d_res = self.apply_At(y)
+            if self.scaling is not None:
+                d_res /= self.scaling.col
+            ratio = float(xp.linalg.norm(f64(d_res))) * float(self.b_norm) / -by
+            self._residual = min(self._residual, eps_infeas * -by
+                                 / (float(self.b_norm) * u_norm))
+            if ratio <= eps_infeas:
+                ray = y / -by
+                return "primal_infeasible", (ray if self.scaling is None
+                                             else self.scaling.unscale_dual(ray, out=ray))
+        x = u[:n]
+        cx = float(f64(self.c) @ f64(x))
+        if cx < 0:
+            p_res = self.apply_A(x) + v[n:n+m]
+            if self.scaling is not None:
+                p_res /= self.scaling.row
+            ratio = float(xp.linalg.norm(f64(p_res))) * float(self.c_norm) / -cx
+            self._residual = min(self._residual, eps_ubdd * -cx
+                                 / (float(self.c_norm) * u_norm))
+            if ratio <= eps_ubdd:
+                ray = x / -cx
+                return "dual_infeasible", (ray if self.scaling is None
+                                           else self.scaling.unscale_primal(ray, out=ray))
+        return None
+
+    def _solve_batched(self, max_itr, tolcheck, eps_pri, eps_dual, eps_gap):
+        """Iterate k LPs in lockstep, retiring columns as they converge."""
+        xp = self.backend.xp
+        n, n_lps = self.c.shape
+        u = xp.zeros((self.h.shape[0]+1, n_lps), dtype=self.h.dtype)
+        v = xp.zeros_like(u)
+        v[-1] = 1.0
+        x = xp.zeros((n, n_lps), dtype=self.h.dtype)
+        active = np.arange(n_lps)
+        full = (self.h, self.Minvh, self.h_Minvh, self.c_norm, self.b_norm)
+
+        try:
+            for itr in range(1, max_itr + 1):
+                utilde, _ = self._compute_utilde(u, v, itr)
+                u, v = self._update_primal_dual(utilde, u, v)
+                if itr % tolcheck != 0:
+                    continue
+
+                with self.telemetry.phase("checks"):
+                    done = self.backend.to_host(
+                        self._check_termination(u, v, eps_pri, eps_dual, eps_gap, itr))
+                if not done.any():
+                    continue
+                mask = self.backend.asarray(done)
+                x[:, self.backend.asarray(active[done])] = self._recover_x(u[:, mask])
+                active = active[~done]
+                if active.size == 0:
+                    break
+                u, v = self._keep_columns(~done, u, v)
+            else:
+                self.telemetry.event("scs_batched", f"Iteration limit reached with "
+                                     f"{active.size} of {n_lps} LPs unconverged")
+                x[:, self.backend.asarray(active)] = self._recover_x(u)
+        finally:
+            # Restore the full batch so the solver can be reused
+            self.h, self.Minvh, self.h_Minvh, self.c_norm, self.b_norm = full
+            self.c, self.b = self.h[:n], self.h[n:]
+
+        return x if self.scaling is None else self.scaling.unscale_primal(x, out=x)
+
+    def _keep_columns(self, keep, u, v):
+        """Compact the iterates and per-LP data down to the ``keep`` columns."""
+        xp, keep = self.backend.xp, self.backend.asarray(keep)
+        n = self.c.shape[0]
+        self.h = xp.ascontiguousarray(self.h[:, keep])
+        self.c, self.b = self.h[:n], self.h[n:]
+        self.Minvh = xp.ascontiguousarray(self.Minvh[:, keep])
+        self.h_Minvh, self.c_norm, self.b_norm = self.h_Minvh[keep], self.c_norm[keep], self.b_norm[keep]
+        return xp.ascontiguousarray(u[:, keep]), xp.ascontiguousarray(v[:, keep])
+
+    def _compute_utilde(self, u, v, itr):
+        """Compute intermediate update step; returns it with w = u + v."""
         w = u + v
         rhs = w[:-1] - self.h * w[-1]
-        utilde = cp.empty_like(w)
-        utilde[:self.c.shape[0]], _ = cupyx.scipy.sparse.linalg.cg(self.apply_At, rhs[:self.c.shape[0]])
-        utilde[self.c.shape[0]:-1] = rhs[self.c.shape[0]:] + self.apply_A(utilde[:self.c.shape[0]])
-        return utilde
+        utilde = self.backend.xp.empty_like(w)
+        self.linsys.set_accuracy(itr, self._residual)
+        utilde[:-1] = self._solve_M(rhs)
+        self.cg_iterations.append(self.linsys.last_iterations)
+        utilde[:-1] -= coldot(self.h, utilde[:-1]) / (1 + self.h_Minvh) * self.Minvh
+        utilde[-1] = w[-1] + coldot(self.h, utilde[:-1])
+        return utilde, w
+
+    def _screen_stats(self, w, utilde, v):
+        """Residual statistics at utilde from the linear system just solved, without any SpMV.
+
+        (I + Q) utilde = w gives A^T y~ + c tau~ = (w - utilde)_x and
+        A x~ - b tau~ = (utilde - w)_y, so the residuals at
+        (x~, y~, s) = (utilde_x, utilde_y, v_y) / tau~ are vector arithmetic.
+        Returns the device vector [||r_p||^2, ||r_d||^2, c^T x~, b^T y~, tau~]
+        (before dividing by tau~) so the host reads it in one transfer.
+        """
+        xp = self.backend.xp
+        n, m = self.c.shape[0], self.b.shape[0]
+        p_res = utilde[n:n+m] - w[n:n+m] + v[n:n+m]
+        d_res = w[:n] - utilde[:n]
+        if self.scaling is not None:
+            p_res /= self.scaling.row
+            d_res /= self.scaling.col
+        return xp.stack((p_res @ p_res, d_res @ d_res, self.c @ utilde[:n],
+                         self.b @ utilde[n:n+m], utilde[-1]))
+
+    def _screen(self, polled, monitor, norms, eps_pri, eps_dual, eps_gap):
+        """Evaluate screened statistics, adapt the check interval, and report whether they pass."""
+        itr, (p_sq, d_sq, cx, by, tau) = polled
+        if tau <= 0:
+            monitor.update(itr, math.inf)
+            return False
+        c_norm, b_norm = norms
+        p_feas = math.sqrt(p_sq) / tau / (1 + b_norm)
+        d_feas = math.sqrt(d_sq) / tau / (1 + c_norm)
+        dual_gap = abs(cx + by) / (tau + abs(cx) + abs(by))
+        self._residual = max(p_feas, d_feas)
+        if self.telemetry.enabled:
+            self.telemetry.check("scs", itr, primal_feas=p_feas, dual_feas=d_feas,
+                                 dual_gap=dual_gap, exact=False, **self._cg_stats())
+        monitor.update(itr, max(p_feas / eps_pri, d_feas / eps_dual, dual_gap / eps_gap))
+        return p_feas < eps_pri and d_feas < eps_dual and dual_gap < eps_gap
+
+    def _cg_stats(self):
+        """Average CG iterations per outer iteration since the previous check record."""
+        cg_its = self.cg_iterations[self._last_check:]
+        self._last_check = len(self.cg_iterations)
+        if not isinstance(self.linsys, IndirectSolver):
+            return {}
+        return {"cg_iterations": sum(cg_its) / max(len(cg_its), 1)}
 
     def _update_primal_dual(self, utilde, u, v):
         """Update primal and dual variables."""
-        u[:-1] = cp.maximum(0, utilde[:-1] - v[:-1])
+        # x and y_eq are free; y_ub and tau are projected onto the nonnegative orthant
+        n_free = self.c.shape[0] + self.A_eq.shape[0]
+        u[:n_free] = utilde[:n_free] - v[:n_free]
+        u[n_free:] = self.backend.xp.maximum(0, utilde[n_free:] - v[n_free:])
         v += u - utilde
         return u, v
 
-    def _check_termination(self, u, v, eps_pri, eps_dual, eps_gap):
-        """Check stopping conditions for optimization."""
-        x = u[:self.c.shape[0]] / u[-1]
-        y = u[self.c.shape[0]:self.c.shape[0]+self.b.shape[0]] / u[-1]
-        p_feas = cp.linalg.norm(self.apply_A(x) - self.b) / (1 + cp.linalg.norm(self.b))
-        d_feas = cp.linalg.norm(self.apply_At(y) + self.c) / (1 + cp.linalg.norm(self.c))
-        dual_gap = cp.abs(self.c.T @ x + self.b.T @ y) / (1 + cp.abs(self.c.T @ x) + cp.abs(self.b.T @ y))
+    def _check_termination(self, u, v, eps_pri, eps_dual, eps_gap, itr):
+        """Check stopping conditions for optimization.
 
-        print(f"Iter {itr}: Primal Feasibility {p_feas:.6e}, Dual Feasibility {d_feas:.6e}, Dual Gap {dual_gap:.6e}")
+        Batched iterates return a boolean per LP; LPs with tau <= 0 never pass.
+        Norms and dot products are accumulated in float64 whatever the
+        iterate precision.
+        """
+        batched = u.ndim == 2
+        if not batched and u[-1] <= 0:
+            return False
+        xp = self.backend.xp
+        tau = xp.where(u[-1] > 0, u[-1], 1)  # columns with tau <= 0 are masked out below
+        x = u[:self.c.shape[0]] / tau
+        y = u[self.c.shape[0]:self.c.shape[0]+self.b.shape[0]] / tau
+        s = v[self.c.shape[0]:self.c.shape[0]+self.b.shape[0]] / tau
+        p_res = self.apply_A(x) + s - self.b
+        d_res = self.apply_At(y) + self.c
+        if self.scaling is not None:
+            p_res /= self.scaling._along_rows(self.scaling.row, p_res)
+            d_res /= self.scaling._along_rows(self.scaling.col, d_res)
+        f64 = lambda a: a.astype(np.float64, copy=False)
+        p_feas = xp.linalg.norm(f64(p_res), axis=0) / (1 + self.b_norm)
+        d_feas = xp.linalg.norm(f64(d_res), axis=0) / (1 + self.c_norm)
+        cx, by = coldot(f64(self.c), f64(x)), coldot(f64(self.b), f64(y))
+        dual_gap = abs(cx + by) / (1 + abs(cx) + abs(by))
 
-        return p_feas < eps_pri and d_feas < eps_dual and dual_gap < eps_gap
+        if not batched:
+            self._residual = float(max(p_feas, d_feas))
+            if self.telemetry.enabled:
+                self.telemetry.check("scs", itr, primal_feas=float(p_feas),
+                                     dual_feas=float(d_feas), dual_gap=float(dual_gap), exact=True)
+            return p_feas < eps_pri and d_feas < eps_dual and dual_gap < eps_gap
+
+        valid = u[-1] > 0
+        if bool(valid.any()):
+            self._residual = float(max(p_feas[valid].max(), d_feas[valid].max()))
+        done = valid & (p_feas < eps_pri) & (d_feas < eps_dual) & (dual_gap < eps_gap)
+        if self.telemetry.enabled:
+            self.telemetry.check("scs_batched", itr, active=int(done.shape[0]),
+                                 converged=int(done.sum()), primal_feas=float(p_feas.max()),
+                                 dual_feas=float(d_feas.max()), dual_gap=float(dual_gap.max()),
+                                 **self._cg_stats())
+        return done
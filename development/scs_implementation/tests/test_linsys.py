@@ -0,0 +1,36 @@
+import numpy as np
+import scipy.sparse
+from scs_implementation.src.linsys import conjugate_gradient
+
+
+def _spd_problem(n=50):
+    """Badly scaled SPD matrix D (I + B^T B) D and a right-hand side."""
+    rng = np.random.default_rng(0)
+    B = scipy.sparse.random(30, n, density=0.2, random_state=0)
+    D = scipy.sparse.diags(10.0 ** rng.uniform(-2, 2, n))
+    M = (D @ (scipy.sparse.identity(n) + B.T @ B) @ D).tocsr()
+    return M, rng.standard_normal(n)
+
+
+def test_jacobi_preconditioning_and_warm_start():
+    M, b = _spd_problem()
+    x_ref = scipy.sparse.linalg.spsolve(M.tocsc(), b)
+
+    x, plain = conjugate_gradient(M.dot, b, tol=1e-10, maxiter=5000)
+    x_pc, preconditioned = conjugate_gradient(M.dot, b, tol=1e-10, maxiter=5000,
+                                              inv_diag=1 / M.diagonal())
+    np.testing.assert_allclose(x_pc, x_ref, rtol=1e-6)
+    assert preconditioned < plain
+
+    # Starting from a nearby point needs fewer iterations; from the solution, none
+    _, warm = conjugate_gradient(M.dot, b, tol=1e-10, x0=x_ref * 1.01, inv_diag=1 / M.diagonal())
+    assert warm < preconditioned
+    assert conjugate_gradient(M.dot, b, tol=1e-6, x0=x_ref)[1] == 0
+
+
+def test_batched_columns_match_single_solves():
+    M, b = _spd_problem()
+    B = np.column_stack((b, 2 * b, np.zeros_like(b)))
+    X, _ = conjugate_gradient(M.dot, B, tol=1e-10, maxiter=5000, inv_diag=1 / M.diagonal())
+    x, _ = conjugate_gradient(M.dot, b, tol=1e-10, maxiter=5000, inv_diag=1 / M.diagonal())
+    np.testing.assert_allclose(X, np.column_stack((x, 2 * x, np.zeros_like(x))), rtol=1e-6, atol=1e-12)
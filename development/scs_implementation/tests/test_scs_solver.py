@@ -1,12 +1,192 @@
-import cupy as cp
+import numpy as np
 import pytest
+import scipy.optimize
+import scipy.sparse
 from scs_implementation.src.scs_solver import SCSSolver
+from test_data.generate_transportation import generate_transportation_problem
+from utils.backend import available_backends
 
-def test_solver():
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_solver(backend):
     """Simple test case for the SCS solver."""
-    c = cp.array([1, 2], dtype=cp.float32)
-    A_eq = cp.array([[1, 1]], dtype=cp.float32)
-    b_eq = cp.array([1], dtype=cp.float32)
-    solver = SCSSolver(c, A_eq=A_eq, b_eq=b_eq)
+    xp = np if backend == "numpy" else pytest.importorskip("cupy")
+    c = xp.array([1, 2], dtype=xp.float32)
+    A_eq = xp.array([[1, 1]], dtype=xp.float32)
+    b_eq = xp.array([1], dtype=xp.float32)
+    solver = SCSSolver(c, A_eq=A_eq, b_eq=b_eq, backend=backend)
     x = solver.solve(max_itr=100)
     assert x.shape == (2,)
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_solver_transportation(backend):
+    """SCS reaches the HiGHS objective on a small transportation problem."""
+    problem = generate_transportation_problem(5, 5)
+    ref = scipy.optimize.linprog(problem["c"], A_ub=problem["A_ub"], b_ub=problem["b_ub"],
+                                 A_eq=problem["A_eq"], b_eq=problem["b_eq"], bounds=(None, None))
+    solver = SCSSolver(**problem, dtype=np.float64, backend=backend)
+    x = solver.solve(max_itr=5000)
+    x = x.get() if backend == "cupy" else x
+    assert np.isclose(problem["c"] @ x, ref.fun, rtol=1e-3)
+
+
+def test_solver_preconditioned():
+    """Preconditioned SCS returns x in original units."""
+    problem = generate_transportation_problem(5, 5)
+    ref = scipy.optimize.linprog(problem["c"], A_ub=problem["A_ub"], b_ub=problem["b_ub"],
+                                 A_eq=problem["A_eq"], b_eq=problem["b_eq"], bounds=(None, None))
+    solver = SCSSolver(**problem, dtype=np.float64, backend="numpy", ruiz_iters=10,
+                       pock_chambolle=True)
+    x = solver.solve(max_itr=5000)
+    assert np.isclose(problem["c"] @ x, ref.fun, rtol=1e-3)
+
+
+def test_solver_bounds():
+    """Variable bounds give the same optimum as the equivalent -I rows."""
+    from utils.bounds import singleton_rows_to_bounds
+
+    problem = generate_transportation_problem(5, 5)
+    ref = scipy.optimize.linprog(problem["c"], A_ub=problem["A_ub"], b_ub=problem["b_ub"],
+                                 A_eq=problem["A_eq"], b_eq=problem["b_eq"], bounds=(None, None))
+    A_ub, b_ub, lb, ub = singleton_rows_to_bounds(problem["A_ub"], problem["b_ub"])
+    solver = SCSSolver(problem["c"], A_ub, b_ub, problem["A_eq"], problem["b_eq"],
+                       dtype=np.float64, backend="numpy", lb=lb, ub=ub)
+    x = solver.solve(max_itr=5000)
+    assert np.isclose(problem["c"] @ x, ref.fun, rtol=1e-3)
+    assert x.min() > -1e-4
+
+
+@pytest.mark.parametrize("linsys", ["indirect", "direct"])
+def test_solver_certificates(linsys):
+    """Infeasible and unbounded LPs stop with a certificate, status and NaN x."""
+    from utils.bounds import singleton_rows_to_bounds
+
+    problem = generate_transportation_problem(5, 5)
+    A_ub, b_ub, lb, ub = singleton_rows_to_bounds(problem["A_ub"], problem["b_ub"])
+    infeasible = SCSSolver(problem["c"], A_ub, np.where(b_ub < 0, 10 * b_ub, b_ub),
+                           problem["A_eq"], problem["b_eq"], dtype=np.float64, backend="numpy",
+                           linsys=linsys, lb=lb, ub=ub)
+    x = infeasible.solve(max_itr=5000)
+    assert infeasible.info["status"] == "primal_infeasible" and np.isnan(x).all()
+    y = infeasible.info["certificate"]
+    assert np.isclose(infeasible.b @ y, -1)
+    assert np.linalg.norm(infeasible.A.rmatvec(y)) < 1e-4
+
+    extra = lambda A: scipy.sparse.hstack((A, scipy.sparse.csr_matrix((A.shape[0], 1))), "csr")
+    unbounded = SCSSolver(np.append(problem["c"], -1.0), extra(A_ub), b_ub,
+                          extra(scipy.sparse.csr_matrix(problem["A_eq"])), problem["b_eq"],
+                          dtype=np.float64, backend="numpy", linsys=linsys,
+                          lb=np.append(lb, 0.0), ub=np.append(ub, np.inf))
+    unbounded.solve(max_itr=5000)
+    assert unbounded.info["status"] == "dual_infeasible"
+    ray = unbounded.info["certificate"]
+    assert np.isclose(unbounded.c @ ray, -1) and ray.min() > -1e-6
+
+
+def test_solver_polish():
+    """Polishing an iterate at 1e-4 recovers the HiGHS objective to round-off."""
+    problem = generate_transportation_problem(5, 5)
+    ref = scipy.optimize.linprog(problem["c"], problem["A_ub"], problem["b_ub"], problem["A_eq"],
+                                 problem["b_eq"], bounds=(None, None))
+    solver = SCSSolver(**problem, dtype=np.float64, backend="numpy", linsys="direct")
+    x = solver.solve(eps_pri=1e-8, eps_dual=1e-8, eps_gap=1e-8, polish=True)
+    assert solver.info["status"] == "optimal" and solver.info["polished"]
+    assert x.dtype == np.float64
+    assert abs(problem["c"] @ x - ref.fun) < 1e-12 * abs(ref.fun)
+
+
+def test_solver_batched():
+    """A batch of cost vectors is solved in one call and matches per-LP HiGHS objectives."""
+    problem = generate_transportation_problem(5, 5)
+    rng = np.random.default_rng(0)
+    C = problem["c"][:, None] * rng.uniform(0.5, 1.5, size=(problem["c"].shape[0], 4))
+    solver = SCSSolver(**{**problem, "c": C}, dtype=np.float64, backend="numpy")
+    X = solver.solve(max_itr=5000)
+    assert X.shape == C.shape
+    for j in range(C.shape[1]):
+        ref = scipy.optimize.linprog(C[:, j], A_ub=problem["A_ub"], b_ub=problem["b_ub"],
+                                     A_eq=problem["A_eq"], b_eq=problem["b_eq"], bounds=(None, None))
+        assert np.isclose(C[:, j] @ X[:, j], ref.fun, rtol=1e-3)
+
+
+@pytest.mark.parametrize("sparse", [True, False])
+def test_direct_linsys_matches_indirect(sparse):
+    """The cached factorization solves M z = r exactly and reaches the same optimum."""
+    problem = generate_transportation_problem(5, 5)
+    if not sparse:
+        problem = {k: v.toarray() if scipy.sparse.issparse(v) else v for k, v in problem.items()}
+    ref = scipy.optimize.linprog(problem["c"], A_ub=problem["A_ub"], b_ub=problem["b_ub"],
+                                 A_eq=problem["A_eq"], b_eq=problem["b_eq"], bounds=(None, None))
+    solver = SCSSolver(**problem, dtype=np.float64, backend="numpy", linsys="direct")
+    n = problem["c"].shape[0]
+    rhs = np.random.default_rng(0).standard_normal(solver.h.shape[0])
+    z = solver.linsys.solve(rhs)
+    np.testing.assert_allclose(z[:n] + solver.apply_At(z[n:]), rhs[:n], atol=1e-10)
+    np.testing.assert_allclose(z[n:] - solver.apply_A(z[:n]), rhs[n:], atol=1e-10)
+    x = solver.solve(max_itr=5000)
+    assert np.isclose(problem["c"] @ x, ref.fun, rtol=1e-3)
+
+    with pytest.raises(ValueError):
+        SCSSolver(**problem, linsys="cholesky")
+
+
+def test_inexact_cg_stays_cheap():
+    """Warm-started CG keeps the inner iterations per outer iteration flat as the tolerance
+    tightens by orders of magnitude."""
+    problem = generate_transportation_problem(5, 5)
+    solver = SCSSolver(**problem, dtype=np.float64, backend="numpy")
+    solver.solve(max_itr=2000)
+    cg = np.asarray(solver.cg_iterations)
+    assert cg.shape[0] > 100 and solver.linsys.tol < 1e-5
+    assert cg[:50].min() > 0
+    assert cg[-50:].mean() < 1.5 * cg[:50].mean()
+
+
+@pytest.mark.parametrize("linsys", ["indirect", "direct"])
+def test_zero_rhs(linsys):
+    """b = 0: the first inexact CG solve must not accept the zero starting point."""
+    solver = SCSSolver(np.ones(2), A_ub=-np.eye(2), b_ub=np.zeros(2), dtype=np.float64,
+                       backend="numpy", linsys=linsys)
+    x = solver.solve(max_itr=2000)
+    assert solver.info["status"] == "optimal"
+    np.testing.assert_allclose(x, 0, atol=1e-6)
+
+
+def test_screened_residuals_match_exact_check():
+    """The SpMV-free screen agrees with the exact residuals once SCS has converged."""
+    import io
+    import contextlib
+    from utils.convergence import ConvergenceMonitor
+
+    problem = generate_transportation_problem(5, 5)
+    solver = SCSSolver(**problem, dtype=np.float64, backend="numpy", linsys="direct")
+    solver.cg_iterations, solver._last_check, solver._residual = [], 0, np.inf
+    u = np.zeros(solver.h.shape[0] + 1)
+    v = np.zeros_like(u)
+    v[-1] = 1.0
+    for itr in range(1, 3001):
+        utilde, w = solver._compute_utilde(u, v, itr)
+        u, v = solver._update_primal_dual(utilde, u, v)
+    monitor = ConvergenceMonitor(solver.backend, 10)
+    norms = float(solver.c_norm), float(solver.b_norm)
+    with contextlib.redirect_stdout(io.StringIO()):
+        screened = solver._screen((itr, solver._screen_stats(w, utilde, v)), monitor, norms,
+                                  1e-6, 1e-4, 1e-4)
+        exact = solver._check_termination(u, v, 1e-6, 1e-4, 1e-4, itr)
+    assert screened and exact
+
+
+def test_telemetry_checks():
+    """Screened and exact checks reach the telemetry callback with CG statistics."""
+    from utils.telemetry import Telemetry
+
+    problem = generate_transportation_problem(4, 4)
+    seen = []
+    telemetry = Telemetry(callback=seen.append)
+    solver = SCSSolver(**problem, dtype=np.float64, backend="numpy", telemetry=telemetry)
+    solver.solve()
+    assert solver.info["status"] == "optimal"
+    assert seen[-1]["exact"] and seen[-1]["iteration"] == solver.info["iterations"]
+    assert all("cg_iterations" in r for r in seen if not r["exact"])
+    assert {"transfer", "setup", "iterations", "checks"} <= telemetry.phases.keys()
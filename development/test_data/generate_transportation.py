@@ -2,50 +2,87 @@ import numpy as np
 import scipy.sparse
 import scipy.io
 import os
-from utils import save_matrix
+try:
+    from .utils import save_matrix
+except ImportError:  # run as a script from inside test_data/
+    from utils import save_matrix
 
+# Nonzeros generated per block when streaming a problem to disk
+CHUNK_NNZ = 1 << 24
 
-def generate_transportation_problem(m, n, write=False, data_dir="data"):
+
+def _index_dtype(size):
+    return np.int32 if size < np.iinfo(np.int32).max else np.int64
+
+
+def _transportation_vectors(rng, m, n):
+    """Costs, supplies and demands; demand sums to just under the supply."""
+    c = rng.uniform(size=m * n)
+    s = rng.exponential(size=m)
+    d = rng.exponential(size=n)
+    d *= (s.sum() - 1e-1) / d.sum()  # Normalize supply and demand
+    return c, s, d
+
+
+def _rows_block(m, n, r0, r1, index_dtype):
+    """CSR column indices and values of rows [r0, r1) of A_ub (row-major order).
+
+    Variable i * n + j ships from supplier i to consumer j. Rows 0..m-1 are
+    the supply rows (+1 over one supplier's n variables), rows m..m+n-1 the
+    demand rows (-1 over one consumer's m variables), and the remaining m*n
+    rows are the nonnegativity rows -x <= 0.
+    """
+    parts, values = [], []
+    supply = np.arange(max(r0, 0), min(r1, m), dtype=index_dtype)
+    if supply.size:
+        parts.append((supply[:, None] * n + np.arange(n, dtype=index_dtype)).ravel())
+        values.append(np.ones(supply.size * n))
+    demand = np.arange(max(r0, m), min(r1, m + n), dtype=index_dtype) - m
+    if demand.size:
+        parts.append((np.arange(m, dtype=index_dtype)[None, :] * n + demand[:, None]).ravel())
+        values.append(-np.ones(demand.size * m))
+    nneg = np.arange(max(r0, m + n), r1, dtype=index_dtype) - (m + n)
+    if nneg.size:
+        parts.append(nneg)
+        values.append(-np.ones(nneg.size))
+    return np.concatenate(parts), np.concatenate(values)
+
+
+def _row_lengths(m, n):
+    """Nonzeros per row of A_ub: n per supply row, m per demand row, 1 per bound row."""
+    return np.concatenate((np.full(m, n, dtype=np.int64), np.full(n, m, dtype=np.int64),
+                           np.ones(m * n, dtype=np.int64)))
+
+
+def generate_transportation_problem(m, n, write=False, data_dir="data", seed=0):
     """Generate a feasible transportation problem with random data.
 
+    The constraint matrices are assembled directly as CSR arrays, so
+    generation is a few vectorized passes over the 3*m*n nonzeros.
+
     Args:
         m (int): Number of supply nodes.
         n (int): Number of demand nodes.
         write (bool): If True, saves generated data.
         data_dir (str): Directory to store the test data files.
+        seed (int): Seed of the random costs, supplies and demands.
 
     Returns:
         dict: A dictionary containing c, A_ub, b_ub, A_eq, b_eq.
     """
-    np.random.seed(0)
-
-    # Cost vector
-    c = np.random.uniform(size=m * n)
-
-    # Supply and demand constraints
-    s = np.random.exponential(size=m)
-    d = np.random.exponential(size=n)
-    d *= (s.sum() - 1e-1) / d.sum()  # Normalize supply and demand
+    c, s, d = _transportation_vectors(np.random.RandomState(seed), m, n)
 
     # Constraint matrices
-    supply_cons = scipy.sparse.dok_matrix((m, m * n))
-    for i in range(m):
-        for j in range(n):
-            supply_cons[i, j + i * m] = 1.0
-
-    demand_cons = scipy.sparse.dok_matrix((n, m * n))
-    for i in range(m):
-        for j in range(n):
-            demand_cons[i, j * n + i] = -1.0
-
-    nneg_cons = -scipy.sparse.eye(m * n, format='csr')
-    A_ub = scipy.sparse.vstack((supply_cons.tocsr(), demand_cons.tocsr(), nneg_cons))
+    n_rows = m + n + m * n
+    index_dtype = _index_dtype(3 * m * n)
+    indptr = np.zeros(n_rows + 1, dtype=index_dtype)
+    np.cumsum(_row_lengths(m, n), out=indptr[1:])
+    indices, data = _rows_block(m, n, 0, n_rows, index_dtype)
+    A_ub = scipy.sparse.csr_matrix((data, indices, indptr), shape=(n_rows, m * n))
     b_ub = np.concatenate((s, -d, np.zeros(m * n)))
 
     # Ensure well-defined system by fixing one variable
-    A_eq = scipy.sparse.dok_matrix((1, m * n))
-    A_eq[0, 0] = 1.0
-    A_eq = scipy.sparse.csr_matrix(A_eq)
+    A_eq = scipy.sparse.csr_matrix(([1.0], ([0], [0])), shape=(1, m * n))
     b_eq = np.array([0.0])
 
     # Save data if requested
@@ -60,5 +97,70 @@ def generate_transportation_problem(m, n, write=False, data_dir="data"):
     return {"c": c, "A_ub": A_ub, "b_ub": b_ub, "A_eq": A_eq, "b_eq": b_eq}
 
 
+def write_transportation_problem(m, n, data_dir="data", seed=0, chunk_nnz=CHUNK_NNZ):
+    """Stream a transportation problem to disk without holding it in memory.
+
+    Writes the same LP as ``generate_transportation_problem(m, n, seed=seed)``
+    as ``.npy`` files: the vectors c, b_ub and b_eq, and each matrix as its
+    CSR arrays ``<name>.indptr.npy``, ``<name>.indices.npy``,
+    ``<name>.data.npy`` plus ``<name>.shape.npy``. The arrays are filled
+    through memory maps in blocks of about ``chunk_nnz`` nonzeros, so peak
+    memory stays bounded for instances with 10^8 nonzeros and more, and
+    ``utils.load_csr`` maps them back without reading them in.
+
+    Returns:
+        dict: The shapes and nonzero counts of A_ub and A_eq.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    path = lambda name: os.path.join(data_dir, f"{name}.npy")
+    rng = np.random.RandomState(seed)
+
+    # c is drawn first, so it streams out before the supplies and demands are drawn
+    c = np.lib.format.open_memmap(path("c"), mode="w+", dtype=np.float64, shape=(m * n,))
+    for start in range(0, m * n, chunk_nnz):
+        stop = min(start + chunk_nnz, m * n)
+        c[start:stop] = rng.uniform(size=stop - start)
+    c.flush()
+    del c
+    s = rng.exponential(size=m)
+    d = rng.exponential(size=n)
+    d *= (s.sum() - 1e-1) / d.sum()
+
+    b_ub = np.lib.format.open_memmap(path("b_ub"), mode="w+", dtype=np.float64,
+                                     shape=(m + n + m * n,))
+    b_ub[:m], b_ub[m:m + n], b_ub[m + n:] = s, -d, 0.0
+    b_ub.flush()
+    del b_ub
+    np.save(path("b_eq"), np.array([0.0]))
+
+    n_rows, nnz = m + n + m * n, 3 * m * n
+    index_dtype = _index_dtype(nnz)
+    lengths = _row_lengths(m, n)
+    indptr = np.lib.format.open_memmap(path("A_ub.indptr"), mode="w+", dtype=index_dtype,
+                                       shape=(n_rows + 1,))
+    indptr[0] = 0
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.lib.format.open_memmap(path("A_ub.indices"), mode="w+", dtype=index_dtype,
+                                        shape=(nnz,))
+    data = np.lib.format.open_memmap(path("A_ub.data"), mode="w+", dtype=np.float64,
+                                     shape=(nnz,))
+    # Row blocks of about chunk_nnz nonzeros each
+    cuts = np.unique(np.concatenate((
+        [0], np.searchsorted(indptr, np.arange(chunk_nnz, nnz, chunk_nnz)), [n_rows])))
+    for r0, r1 in zip(cuts[:-1], cuts[1:]):
+        block_indices, block_data = _rows_block(m, n, int(r0), int(r1), index_dtype)
+        indices[indptr[r0]:indptr[r1]] = block_indices
+        data[indptr[r0]:indptr[r1]] = block_data
+    for array in (indptr, indices, data):
+        array.flush()
+    np.save(path("A_ub.shape"), np.array([n_rows, m * n]))
+
+    np.save(path("A_eq.indptr"), np.array([0, 1], dtype=index_dtype))
+    np.save(path("A_eq.indices"), np.array([0], dtype=index_dtype))
+    np.save(path("A_eq.data"), np.array([1.0]))
+    np.save(path("A_eq.shape"), np.array([1, m * n]))
+    return {"A_ub": ((n_rows, m * n), nnz), "A_eq": ((1, m * n), 1)}
+
+
 if __name__ == "__main__":
     generate_transportation_problem(100, 100, write=True)
@@ -0,0 +1,25 @@
+"""Seeded LP problem families, built vectorized, with a content-addressed on-disk cache.
+
+Families (``FAMILIES``) and their generators:
+
+- ``transportation``: ``generate_transportation_problem``, singleton rows as bounds;
+- ``network_flow``: min-cost flow on a random graph (``generate_network_flow``);
+- ``trajectories``: multi-agent time-expanded routing (``generate_trajectories``);
+- ``planted``: random sparse LP with a known optimum (``generate_planted``);
+- ``set_cover``: set-cover relaxation (``generate_set_cover``).
+
+Every generator returns a dict with c, A_ub, b_ub, A_eq, b_eq (CSR blocks,
+possibly 0-row) and lb, ub, plus family-specific extras (``lp_arguments`` strips them). ``load_problem``
+goes through the cache, ``problem_for_size`` maps one size knob to each
+family's parameters for sweeps.
+"""
+from .cache import DEFAULT_CACHE_DIR, load_problem, problem_cache
+from .network_flow import generate_network_flow
+from .planted import generate_planted
+from .registry import FAMILIES, LP_KEYS, SIZE_PARAMS, generate, lp_arguments, problem_for_size
+from .set_cover import generate_set_cover
+from .trajectories import generate_trajectories
+
+__all__ = ["FAMILIES", "LP_KEYS", "SIZE_PARAMS", "lp_arguments", "DEFAULT_CACHE_DIR", "generate", "load_problem",
+           "problem_cache", "problem_for_size", "generate_network_flow", "generate_planted",
+           "generate_set_cover", "generate_trajectories"]
@@ -0,0 +1,40 @@
+"""Content-addressed cache of generated problems.
+
+An instance is stored under the fingerprint of its family, parameters, seed
+and ``GENERATOR_VERSION`` (bump it whenever a generator's output changes),
+in memory and as ``<key>.npz`` in the cache directory. The directory comes
+from ``$PROBLEM_CACHE_DIR``, by default ``test_data/cache``.
+"""
+import os
+
+from utils.operator_cache import OperatorCache, fingerprint
+from .registry import generate
+
+GENERATOR_VERSION = 1
+DEFAULT_CACHE_DIR = os.environ.get("PROBLEM_CACHE_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
+_caches = {}
+
+
+def problem_cache(directory=None):
+    """The (shared) cache for ``directory``; None selects ``DEFAULT_CACHE_DIR``."""
+    directory = DEFAULT_CACHE_DIR if directory is None else directory
+    if directory not in _caches:
+        _caches[directory] = OperatorCache(maxsize=8, directory=directory)
+    return _caches[directory]
+
+
+def load_problem(family, seed=0, cache_dir=None, **params):
+    """Instance of ``family``, generated once and then read back from the cache.
+
+    The returned arrays may be shared with the cache and must not be
+    modified in place.
+    """
+    cache = problem_cache(cache_dir)
+    key = fingerprint(kind="problem", family=family, seed=seed, version=GENERATOR_VERSION,
+                      **params)
+    problem = cache.get(key)
+    if problem is None:
+        problem = generate(family, seed, **params)
+        cache.put(key, problem)
+    return dict(problem)
@@ -0,0 +1,32 @@
+"""Min-cost network flow on a random sparse directed graph."""
+import numpy as np
+import scipy.sparse
+
+
+def generate_network_flow(n_nodes, degree=4, seed=0):
+    """Min-cost flow with capacities and a planted feasible flow.
+
+    Arcs are ``degree * n_nodes`` random (tail, head) pairs plus a ring
+    i -> i+1 that keeps the graph connected. A random flow within the
+    capacities (zero on about half the arcs) fixes the node balances b_eq,
+    so the LP is feasible, and capacities keep it bounded.
+
+    Returns:
+        dict: c, A_ub, b_ub, A_eq (node-arc incidence), b_eq, lb, ub.
+    """
+    rng = np.random.default_rng(seed)
+    ring = np.arange(n_nodes)
+    tails = np.concatenate((ring, rng.integers(0, n_nodes, degree * n_nodes)))
+    heads = np.concatenate(((ring + 1) % n_nodes, rng.integers(0, n_nodes, degree * n_nodes)))
+    keep = tails != heads
+    tails, heads = tails[keep], heads[keep]
+    n_arcs = tails.size
+    arcs = np.arange(n_arcs)
+    A_eq = scipy.sparse.csr_matrix(
+        (np.concatenate((np.ones(n_arcs), -np.ones(n_arcs))),
+         (np.concatenate((tails, heads)), np.concatenate((arcs, arcs)))), shape=(n_nodes, n_arcs))
+    capacity = rng.uniform(1, 5, n_arcs)
+    flow = capacity * rng.uniform(0, 1, n_arcs) * (rng.random(n_arcs) < 0.5)
+    return {"c": rng.uniform(1, 10, n_arcs), "A_ub": scipy.sparse.csr_matrix((0, n_arcs)),
+            "b_ub": np.zeros(0), "A_eq": A_eq, "b_eq": A_eq @ flow,
+            "lb": np.zeros(n_arcs), "ub": capacity}
@@ -0,0 +1,37 @@
+"""Random sparse LPs with a known optimum, built from a planted primal-dual pair."""
+import numpy as np
+import scipy.sparse
+
+
+def generate_planted(n, m_eq, m_ub, density=None, seed=0):
+    """Random sparse LP  min c^T x  s.t.  A_eq x = b_eq, A_ub x <= b_ub, x >= 0  with known optimum.
+
+    A primal-dual pair is planted first and the data is built around it:
+    x* is positive on about half the variables, about half the inequality
+    rows are active with positive multipliers (the rest have slack and zero
+    multipliers), and the reduced costs are positive exactly where x* = 0.
+    The pair then satisfies the KKT conditions with strict complementarity,
+    so x* is optimal. ``density`` defaults to about 6 nonzeros per row.
+
+    Returns:
+        dict: c, A_ub, b_ub, A_eq, b_eq, lb, ub, plus ``x_opt``, ``y_opt``
+        (PDLP convention y = [y_eq; y_ub], y_ub >= 0) and ``objective``.
+    """
+    rng = np.random.default_rng(seed)
+    density = min(1.0, 6 / n) if density is None else density
+    A_eq = scipy.sparse.random(m_eq, n, density=density, random_state=rng, format="csr",
+                               data_rvs=rng.standard_normal)
+    A_ub = scipy.sparse.random(m_ub, n, density=density, random_state=rng, format="csr",
+                               data_rvs=rng.standard_normal)
+
+    basic = rng.random(n) < 0.5
+    x = np.where(basic, rng.uniform(0.5, 2, n), 0.0)
+    active = rng.random(m_ub) < 0.5
+    y_eq = rng.standard_normal(m_eq)
+    y_ub = np.where(active, rng.uniform(0.5, 1, m_ub), 0.0)
+    reduced_costs = np.where(basic, 0.0, rng.uniform(0.5, 1, n))
+    c = reduced_costs + A_eq.T @ y_eq - A_ub.T @ y_ub
+    b_ub = A_ub @ x + np.where(active, 0.0, rng.uniform(0.5, 1, m_ub))
+    return {"c": c, "A_ub": A_ub, "b_ub": b_ub, "A_eq": A_eq, "b_eq": A_eq @ x,
+            "lb": np.zeros(n), "ub": np.full(n, np.inf), "x_opt": x,
+            "y_opt": np.concatenate((y_eq, y_ub)), "objective": float(c @ x)}
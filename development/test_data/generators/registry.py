@@ -0,0 +1,50 @@
+"""Family name -> generator, and the size knob used by benchmark sweeps."""
+from utils.bounds import singleton_rows_to_bounds
+from ..generate_transportation import generate_transportation_problem
+from .network_flow import generate_network_flow
+from .planted import generate_planted
+from .set_cover import generate_set_cover
+from .trajectories import generate_trajectories
+
+
+def _transportation(m, n, seed=0):
+    problem = generate_transportation_problem(m, n, seed=seed)
+    A_ub, b_ub, lb, ub = singleton_rows_to_bounds(problem["A_ub"], problem["b_ub"])
+    return {**problem, "A_ub": A_ub, "b_ub": b_ub, "lb": lb, "ub": ub}
+
+
+# Keys every generator returns; the solvers take exactly these as keyword arguments
+LP_KEYS = ("c", "A_ub", "b_ub", "A_eq", "b_eq", "lb", "ub")
+
+
+def lp_arguments(problem):
+    """The LP data of a generated instance, without family-specific extras."""
+    return {key: problem[key] for key in LP_KEYS}
+
+
+FAMILIES = {"transportation": _transportation, "network_flow": generate_network_flow,
+            "trajectories": generate_trajectories, "planted": generate_planted,
+            "set_cover": generate_set_cover}
+
+# Parameters of every family at size s; the LPs grow roughly like s^2 variables
+SIZE_PARAMS = {
+    "transportation": lambda s: {"m": s, "n": s},
+    "network_flow": lambda s: {"n_nodes": s * s // 4 + 2, "degree": 4},
+    "trajectories": lambda s: {"grid": s // 4 + 3, "n_agents": max(s // 8, 1)},
+    "planted": lambda s: {"n": s * s, "m_eq": s * s // 4, "m_ub": s * s // 4},
+    "set_cover": lambda s: {"n_elements": s * s, "n_sets": s * s // 2},
+}
+
+
+def generate(family, seed=0, **params):
+    """Generate one instance of ``family`` without the cache."""
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown problem family {family!r}; expected one of {sorted(FAMILIES)}")
+    return FAMILIES[family](**params, seed=seed)
+
+
+def problem_for_size(family, size, seed=0, cache=True):
+    """Instance of ``family`` at sweep size ``size`` (through the cache by default)."""
+    from .cache import load_problem
+    params = SIZE_PARAMS[family](size)
+    return load_problem(family, seed, **params) if cache else generate(family, seed, **params)
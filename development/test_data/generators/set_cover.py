@@ -0,0 +1,27 @@
+"""LP relaxations of random set-cover instances."""
+import numpy as np
+import scipy.sparse
+
+
+def generate_set_cover(n_elements, n_sets, density=None, seed=0):
+    """Set-cover relaxation  min c^T x  s.t.  A x >= 1, 0 <= x <= 1.
+
+    A is the element-set incidence matrix: random memberships at
+    ``density`` (default about 5 sets per element) plus one random set per
+    element, so every element can be covered. Set costs are uniform in
+    [1, 2]. The covering rows are stored as A_ub = -A, b_ub = -1.
+
+    Returns:
+        dict: c, A_ub, b_ub, A_eq, b_eq, lb, ub.
+    """
+    rng = np.random.default_rng(seed)
+    density = min(1.0, 5 / n_sets) if density is None else density
+    random_members = scipy.sparse.random(n_elements, n_sets, density=density, random_state=rng,
+                                         format="coo")
+    rows = np.concatenate((random_members.row, np.arange(n_elements)))
+    cols = np.concatenate((random_members.col, rng.integers(0, n_sets, n_elements)))
+    A = scipy.sparse.csr_matrix((np.ones(rows.size), (rows, cols)), shape=(n_elements, n_sets))
+    A.data[:] = 1.0  # duplicate memberships were summed
+    return {"c": rng.uniform(1, 2, n_sets), "A_ub": -A, "b_ub": -np.ones(n_elements),
+            "A_eq": scipy.sparse.csr_matrix((0, n_sets)), "b_eq": np.zeros(0),
+            "lb": np.zeros(n_sets), "ub": np.ones(n_sets)}
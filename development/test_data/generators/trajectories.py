@@ -0,0 +1,65 @@
+"""Multi-agent trajectory LPs on a time-expanded grid graph (the swarm navigation use case)."""
+import numpy as np
+import scipy.sparse
+
+
+def _grid_moves(g):
+    """(from, to) cell pairs of one time step: stay, or move to a 4-neighbor."""
+    cells = np.arange(g * g).reshape(g, g)
+    tails = [cells.ravel(), cells[:, :-1].ravel(), cells[:, 1:].ravel(), cells[:-1, :].ravel(),
+             cells[1:, :].ravel()]
+    heads = [cells.ravel(), cells[:, 1:].ravel(), cells[:, :-1].ravel(), cells[1:, :].ravel(),
+             cells[:-1, :].ravel()]
+    return np.concatenate(tails), np.concatenate(heads)
+
+
+def generate_trajectories(grid, n_agents, horizon=None, capacity=1.0, seed=0):
+    """Time-expanded multi-agent routing LP on a ``grid`` x ``grid`` map.
+
+    Each agent sends one unit of flow from its start cell at t = 0 to its goal
+    cell at t = ``horizon`` (default 2 * grid) through the time-expanded graph,
+    whose edges stay in a cell or move to a neighbor for one step. Variable
+    ``(a * horizon + t) * E + e`` is agent a's flow on move e at step t.
+    Equality rows conserve every agent's flow at every (cell, time); the
+    inequality rows cap the total occupancy of every (cell, time) at
+    ``capacity``, which couples the agents. Moves cost 1, waits 0, plus a
+    small random perturbation against degeneracy. Starts and goals are
+    distinct random cells.
+
+    Returns:
+        dict: c, A_ub, b_ub, A_eq, b_eq, lb, ub, plus starts and goals.
+    """
+    rng = np.random.default_rng(seed)
+    horizon = 2 * grid if horizon is None else horizon
+    n_cells = grid * grid
+    if 2 * n_agents > n_cells:
+        raise ValueError(f"{n_agents} agents need distinct starts and goals on {n_cells} cells")
+    tails, heads = _grid_moves(grid)
+    n_moves = tails.size
+    ends = rng.choice(n_cells, size=2 * n_agents, replace=False)
+    starts, goals = ends[:n_agents], ends[n_agents:]
+
+    # One block per (agent, step), moves within the block
+    agent, step, move = (a.ravel() for a in np.meshgrid(np.arange(n_agents), np.arange(horizon),
+                                                         np.arange(n_moves), indexing="ij"))
+    n = agent.size
+    columns = np.arange(n)
+    # Conservation rows (agent, t, cell): outflow - inflow = +1 at the start, -1 at the goal
+    out_rows = (agent * (horizon + 1) + step) * n_cells + tails[move]
+    in_rows = (agent * (horizon + 1) + step + 1) * n_cells + heads[move]
+    n_eq = n_agents * (horizon + 1) * n_cells
+    A_eq = scipy.sparse.csr_matrix((np.concatenate((np.ones(n), -np.ones(n))),
+                                    (np.concatenate((out_rows, in_rows)),
+                                     np.concatenate((columns, columns)))), shape=(n_eq, n))
+    b_eq = np.zeros(n_eq)
+    b_eq[np.arange(n_agents) * (horizon + 1) * n_cells + starts] = 1.0
+    b_eq[(np.arange(n_agents) * (horizon + 1) + horizon) * n_cells + goals] = -1.0
+    # Occupancy rows (t, cell) for t = 1..horizon, summed over agents
+    occupancy = step * n_cells + heads[move]
+    A_ub = scipy.sparse.csr_matrix((np.ones(n), (occupancy, columns)),
+                                   shape=(horizon * n_cells, n))
+    b_ub = np.full(horizon * n_cells, float(capacity))
+
+    c = (tails[move] != heads[move]).astype(np.float64) + 1e-3 * rng.random(n)
+    return {"c": c, "A_ub": A_ub, "b_ub": b_ub, "A_eq": A_eq, "b_eq": b_eq,
+            "lb": np.zeros(n), "ub": np.ones(n), "starts": starts, "goals": goals}
@@ -1,5 +1,5 @@
-import cupy as cp
 import numpy as np
+import scipy.sparse
 from scipy.io import mmwrite
 import os
 
@@ -13,15 +13,16 @@ def save_matrix(filename, matrix):
 TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 
 
-def load_test_data(data_dir=None):
+def load_test_data(data_dir=None, backend="cupy"):
     """
     Load test data from the specified directory or default test_data/data/.
 
     Args:
         data_dir (str, optional): Path to the data directory. Defaults to TEST_DATA_DIR.
+        backend (str, optional): Array backend to load into ("cupy" or "numpy").
 
     Returns:
-        tuple: (c, A_eq, b_eq, A_ub, b_ub) as CuPy arrays.
+        tuple: (c, A_eq, b_eq, A_ub, b_ub) as backend arrays.
 
     Raises:
         FileNotFoundError: If any test data file is missing.
@@ -37,7 +38,22 @@ def load_test_data(data_dir=None):
     except FileNotFoundError as e:
         raise FileNotFoundError(f"Test data file not found: {e}")
 
-    # Convert to CuPy arrays
-    return (cp.array(c, dtype=cp.float32), cp.array(A_eq, dtype=cp.float32),
-            cp.array(b_eq, dtype=cp.float32), cp.array(A_ub, dtype=cp.float32),
-            cp.array(b_ub, dtype=cp.float32))
\ No newline at end of file
+    # Convert to backend arrays; cupy is only imported if it was asked for
+    if backend == "cupy":
+        import cupy as xp
+    else:
+        xp = np
+    return (xp.array(c, dtype=np.float32), xp.array(A_eq, dtype=np.float32),
+            xp.array(b_eq, dtype=np.float32), xp.array(A_ub, dtype=np.float32),
+            xp.array(b_ub, dtype=np.float32))
+
+def load_csr(data_dir, name, mmap_mode="r"):
+    """Load a CSR matrix saved as ``<name>.indptr/.indices/.data/.shape.npy`` arrays.
+
+    With ``mmap_mode`` (default read-only) the arrays are memory-mapped, so
+    even very large matrices are paged in only as they are used.
+    """
+    path = lambda part: os.path.join(data_dir, f"{name}.{part}.npy")
+    shape = tuple(int(v) for v in np.load(path("shape")))
+    arrays = [np.load(path(part), mmap_mode=mmap_mode) for part in ("data", "indices", "indptr")]
+    return scipy.sparse.csr_matrix(tuple(arrays), shape=shape, copy=False)
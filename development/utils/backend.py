@@ -0,0 +1,246 @@
+"""Array/sparse backend layer shared by the PDLP and SCS solvers.
+
+The NumPy + scipy.sparse backend is always available. The CuPy backend is
+only imported when it is selected, either by name or because the problem
+data handed to a solver already lives on the device.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+from scipy.sparse import _sparsetools
+
+# Backend used when none is requested and no input lives on the GPU.
+DEFAULT_BACKEND = os.environ.get("SOLVER_BACKEND", "numpy")
+# Threads used for CPU sparse products when none are requested.
+DEFAULT_THREADS = int(os.environ.get("SOLVER_THREADS", "1"))
+
+_BACKENDS = {}
+
+
+class Backend:
+    """Namespace bundling an array module with its sparse counterparts.
+
+    On CPU, ``threads > 1`` gives the backend a persistent thread pool that
+    ``StackedOperator`` uses to run row blocks of its SpMVs in parallel.
+    """
+
+    def __init__(self, name, xp, sparse, splinalg, threads=1):
+        self.name = name
+        self.xp = xp
+        self.sparse = sparse
+        self.splinalg = splinalg
+        self.threads = 1 if name == "cupy" else max(1, int(threads))
+        self._pool = None
+
+    def __repr__(self):
+        if self.threads > 1:
+            return f"Backend({self.name!r}, threads={self.threads})"
+        return f"Backend({self.name!r})"
+
+    @property
+    def is_gpu(self):
+        return self.name == "cupy"
+
+    @property
+    def pool(self):
+        """Persistent worker pool for CPU kernels (None with a single thread)."""
+        if self._pool is None and self.threads > 1:
+            self._pool = ThreadPoolExecutor(self.threads, thread_name_prefix="spmv")
+        return self._pool
+
+    def asarray(self, a, dtype=None):
+        """Move a host or device vector/dense matrix onto this backend."""
+        if a is None:
+            return None
+        if not self.is_gpu and is_cupy(a):
+            a = a.get()
+        return self.xp.asarray(a, dtype=dtype)
+
+    def issparse(self, A):
+        return scipy.sparse.issparse(A) or (is_cupy(A) and hasattr(A, "tocsr"))
+
+    def csr_matrix(self, A, dtype=None):
+        """Convert a dense or sparse matrix (host or device) to backend CSR."""
+        if is_cupy(A) and not self.is_gpu:
+            A = A.get()
+        if self.is_gpu and scipy.sparse.issparse(A):
+            A = scipy.sparse.csr_matrix(A)
+        elif self.is_gpu and isinstance(A, np.ndarray):
+            A = self.xp.asarray(A)
+        out = self.sparse.csr_matrix(A, dtype=dtype)
+        return out if dtype is None else out.astype(dtype, copy=False)
+
+    def as_matrix(self, A, dtype=None):
+        """Keep dense inputs dense and sparse inputs CSR on this backend."""
+        if A is None:
+            return None
+        if self.issparse(A):
+            return self.csr_matrix(A, dtype=dtype)
+        if isinstance(A, np.ndarray) or is_cupy(A):
+            return self.asarray(A, dtype=dtype)
+        raise ValueError("Matrix format not recognized")
+
+    def spmv(self, A, x, out):
+        """Compute ``out = A @ x`` in place with a single kernel call.
+
+        ``A`` is a backend CSR or dense matrix; ``x`` and ``out`` must share
+        its dtype. A 2-D, C-contiguous ``x`` of shape (n, k) runs as one SpMM
+        over all k columns. No temporaries are allocated.
+        """
+        if not self.issparse(A):
+            return self.xp.dot(A, x, out=out)
+        if not self.is_gpu:
+            return csr_spmv(A.shape, A.indptr, A.indices, A.data, x, out)
+        from cupyx import cusparse
+        if x.ndim == 1 and cusparse.check_availability("spmv"):
+            return cusparse.spmv(A, x, y=out)
+        out[...] = A.dot(x)  # cupyx dispatches 2-D operands to cuSPARSE SpMM
+        return out
+
+    def scatter_max(self, out, indices, values):
+        """Unbuffered ``out[indices] = max(out[indices], values)``."""
+        if self.is_gpu:
+            import cupyx
+            cupyx.scatter_max(out, indices, values)
+        else:
+            np.maximum.at(out, indices, values)
+        return out
+
+    def scatter_add(self, out, indices, values):
+        """Unbuffered ``out[indices] += values``."""
+        if self.is_gpu:
+            import cupyx
+            cupyx.scatter_add(out, indices, values)
+        else:
+            np.add.at(out, indices, values)
+        return out
+
+    def to_host(self, a):
+        """Return a NumPy (or scipy.sparse) copy of ``a``."""
+        if is_cupy(a):
+            return a.get()
+        return a
+
+    def read_async(self, a):
+        """Start copying a small device array to the host without blocking.
+
+        Returns a ``PendingRead``; on CPU the result is available at once.
+        """
+        return PendingRead(self, a)
+
+    def synchronize(self):
+        """Block until queued device work has finished (no-op on CPU)."""
+        if self.is_gpu:
+            self.xp.cuda.get_current_stream().synchronize()
+
+    def timer(self):
+        """Wall-clock timestamp taken after synchronizing the device."""
+        self.synchronize()
+        return time.perf_counter()
+
+    def LinearOperator(self, shape, matvec, rmatvec=None, dtype=None):
+        return self.splinalg.LinearOperator(shape, matvec=matvec,
+                                            rmatvec=rmatvec, dtype=dtype)
+
+
+class PendingRead:
+    """Device-to-host copy of a small array that completes in the background.
+
+    On GPU the copy goes into pinned host memory behind a CUDA event, so
+    ``ready`` can be polled every iteration without stalling the stream.
+    """
+
+    def __init__(self, backend, a):
+        if backend.is_gpu:
+            import cupyx
+            self._host = cupyx.empty_pinned(a.shape, a.dtype)
+            a.get(out=self._host, blocking=False)
+            self._event = backend.xp.cuda.Event()
+            self._event.record()
+        else:
+            self._host, self._event = a, None
+
+    def ready(self):
+        return self._event is None or self._event.done
+
+    def result(self):
+        """The host copy, waiting for the transfer if it has not landed yet."""
+        if self._event is not None:
+            self._event.synchronize()
+        return self._host
+
+
+def csr_spmv(shape, indptr, indices, data, x, out):
+    """Host ``out = A @ x`` for CSR arrays with scipy's sparsetools kernels.
+
+    The kernels release the GIL, so row blocks of one matrix can run
+    concurrently on a thread pool.
+    """
+    out.fill(0)
+    if x.ndim == 1:
+        _sparsetools.csr_matvec(shape[0], shape[1], indptr, indices, data, x, out)
+    else:
+        _sparsetools.csr_matvecs(shape[0], shape[1], x.shape[1], indptr, indices, data, x, out)
+    return out
+
+
+def is_cupy(a):
+    """True if ``a`` is a CuPy array or sparse matrix (without importing cupy)."""
+    return type(a).__module__.split(".")[0] in ("cupy", "cupyx")
+
+
+def _load_numpy(threads=1):
+    return Backend("numpy", np, scipy.sparse, scipy.sparse.linalg, threads)
+
+
+def _load_cupy(threads=1):
+    import cupy
+    import cupyx.scipy.sparse
+    import cupyx.scipy.sparse.linalg
+    return Backend("cupy", cupy, cupyx.scipy.sparse, cupyx.scipy.sparse.linalg)
+
+
+_LOADERS = {"numpy": _load_numpy, "cupy": _load_cupy}
+
+
+def available_backends():
+    """Names of the backends that can be loaded in this environment."""
+    names = []
+    for name in _LOADERS:
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_backend(name=None, *arrays, threads=None):
+    """Resolve a backend by name, instance, or from the location of ``arrays``.
+
+    Args:
+        name (str | Backend | None): ``"numpy"``, ``"cupy"`` or a Backend. If
+            None, CuPy is chosen when any of ``arrays`` already lives on the
+            GPU and ``DEFAULT_BACKEND`` otherwise.
+        *arrays: Problem data used to infer the backend.
+        threads (int, optional): Worker threads for CPU SpMVs
+            (``DEFAULT_THREADS`` if None). Ignored for a Backend instance
+            and on the GPU.
+
+    Returns:
+        Backend: The loaded backend.
+    """
+    if isinstance(name, Backend):
+        return name
+    if name is None:
+        name = "cupy" if any(is_cupy(a) for a in arrays) else DEFAULT_BACKEND
+    if name not in _LOADERS:
+        raise ValueError(f"Unknown backend {name!r}; expected one of {list(_LOADERS)}")
+    threads = 1 if name == "cupy" else max(1, DEFAULT_THREADS if threads is None else int(threads))
+    if (name, threads) not in _BACKENDS:
+        _BACKENDS[name, threads] = _LOADERS[name](threads)
+    return _BACKENDS[name, threads]
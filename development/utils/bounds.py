@@ -0,0 +1,145 @@
+"""Variable bounds lb <= x <= ub.
+
+PDLP handles bounds natively: the primal step projects onto the box and the
+dual residual only counts the part of the reduced costs c - K^T y that no
+finite bound can absorb (Applegate et al., PDLP). Solvers without a box
+projection (SCS) fall back to ``bounds_to_rows``. ``singleton_rows_to_bounds``
+goes the other way, turning rows of A_ub with a single nonzero, such as the
+-I block that encodes x >= 0, into bounds.
+"""
+import numpy as np
+import scipy.sparse
+from utils.backend import get_backend
+
+
+def normalize_bounds(lb, ub, n):
+    """Return host float64 (lb, ub) of shape (n,); None means unbounded.
+
+    Scalars are broadcast. Raises ValueError if some lb_j > ub_j.
+    """
+    lb = np.full(n, -np.inf) if lb is None else np.broadcast_to(np.asarray(lb, float), (n,)).copy()
+    ub = np.full(n, np.inf) if ub is None else np.broadcast_to(np.asarray(ub, float), (n,)).copy()
+    if np.any(lb > ub):
+        raise ValueError(f"Infeasible bounds: lb > ub for {int(np.sum(lb > ub))} variables")
+    return lb, ub
+
+
+def singleton_rows_to_bounds(A_ub, b_ub, lb=None, ub=None):
+    """Move the rows of A_ub with exactly one nonzero into the variable bounds.
+
+    A row a x_j <= b becomes x_j <= b / a for a > 0 and x_j >= b / a for
+    a < 0, tightening any existing bound. Removing them shrinks the dual
+    dimension and the nonzeros touched by every SpMV.
+
+    Args:
+        A_ub (sparse matrix | ndarray): Inequality matrix (format is preserved).
+        b_ub (ndarray): Right-hand side, shape (m,).
+        lb, ub (array | float, optional): Existing bounds.
+
+    Returns:
+        tuple: (A_ub, b_ub, lb, ub) without the singleton rows.
+    """
+    b_ub = np.asarray(b_ub, dtype=np.float64)
+    if b_ub.ndim != 1:
+        raise ValueError("Singleton rows can only become bounds for a single (1-D) b_ub")
+    lb, ub = normalize_bounds(lb, ub, A_ub.shape[1])
+    A = scipy.sparse.csr_matrix(A_ub)
+    A.eliminate_zeros()
+    singleton = np.diff(A.indptr) == 1
+    rows = np.flatnonzero(singleton)
+    cols = A.indices[A.indptr[rows]]
+    coef = A.data[A.indptr[rows]]
+    limit = b_ub[rows] / coef
+    np.minimum.at(ub, cols[coef > 0], limit[coef > 0])
+    np.maximum.at(lb, cols[coef < 0], limit[coef < 0])
+    if np.any(lb > ub):
+        raise ValueError("Singleton rows of A_ub give infeasible bounds (lb > ub)")
+    keep = ~singleton
+    A_ub = A[keep] if scipy.sparse.issparse(A_ub) else np.asarray(A_ub)[keep]
+    return A_ub, b_ub[keep], lb, ub
+
+
+def bounds_to_rows(n, lb=None, ub=None, A_ub=None, b_ub=None):
+    """Append the finite bounds to A_ub as rows -x_j <= -lb_j and x_j <= ub_j.
+
+    For solvers whose cone has no box projection. The appended block is sparse
+    unless A_ub is dense; a batched (m, k) b_ub shares the bound rows.
+
+    Returns:
+        tuple: (A_ub, b_ub) with the bound rows last.
+    """
+    lb, ub = normalize_bounds(lb, ub, n)
+    lower, upper = np.flatnonzero(np.isfinite(lb)), np.flatnonzero(np.isfinite(ub))
+    rows = np.arange(lower.size + upper.size)
+    G = scipy.sparse.csr_matrix(
+        (np.concatenate((-np.ones(lower.size), np.ones(upper.size))),
+         (rows, np.concatenate((lower, upper)))), shape=(rows.size, n))
+    h = np.concatenate((-lb[lower], ub[upper]))
+    if A_ub is None:
+        return G, h
+    if scipy.sparse.issparse(A_ub):
+        A_ub = scipy.sparse.vstack((A_ub, G), format="csr")
+    else:
+        A_ub = np.concatenate((np.asarray(A_ub), G.toarray()))
+    b_ub = np.asarray(b_ub)
+    if b_ub.ndim == 2:
+        h = np.broadcast_to(h[:, None], (h.size, b_ub.shape[1]))
+    return A_ub, np.concatenate((b_ub, h))
+
+
+class DeviceBounds:
+    """Backend-resident bounds for the box projection and bound-aware dual residuals.
+
+    ``lb``/``ub`` are given in original units; with a ``scaling`` they are
+    stored in scaled units, lb~ = lb / D_c, matching x~ = x / D_c.
+    """
+
+    def __init__(self, lb, ub, dtype=np.float32, backend=None, scaling=None):
+        self.backend = backend = get_backend(backend)
+        xp = backend.xp
+        self.lb, self.ub = (backend.asarray(v, dtype) for v in (lb, ub))
+        if scaling is not None:
+            self.lb /= scaling.col
+            self.ub /= scaling.col
+        lb_finite, ub_finite = xp.isfinite(self.lb), xp.isfinite(self.ub)
+        self.lb_finite = xp.where(lb_finite, self.lb, 0).astype(dtype)
+        self.ub_finite = xp.where(ub_finite, self.ub, 0).astype(dtype)
+        # 1 where a sign of the reduced cost cannot be absorbed by a bound
+        self.lb_free = (~lb_finite).astype(dtype)
+        self.ub_free = (~ub_finite).astype(dtype)
+
+    @classmethod
+    def create(cls, lb, ub, n, dtype=np.float32, backend=None, scaling=None):
+        """DeviceBounds for possibly-None ``lb``/``ub``, or None when x is free."""
+        if lb is None and ub is None:
+            return None
+        lb, ub = normalize_bounds(lb, ub, n)
+        if not (np.isfinite(lb).any() or np.isfinite(ub).any()):
+            return None
+        return cls(lb, ub, dtype, backend, scaling)
+
+    @staticmethod
+    def _along_rows(d, v):
+        return d if v.ndim == 1 else d[:, None]
+
+    def project(self, x, out=None):
+        """Clip x (shape (n,) or (n, k)) onto the box."""
+        return self.backend.xp.clip(x, self._along_rows(self.lb, x), self._along_rows(self.ub, x),
+                                    out=out)
+
+    def dual_residual(self, reduced_costs):
+        """Turn reduced costs lambda = c - K^T y into the dual residual, in place.
+
+        A positive lambda_j is absorbed by a finite lower bound and a
+        negative one by a finite upper bound; what remains is the residual.
+        Returns the bound term lb^T lambda^+ - ub^T lambda^- of the dual
+        objective (per column for batched input), accumulated in float64.
+        """
+        xp = self.backend.xp
+        lam = reduced_costs
+        lower = self._along_rows(self.lb_finite, lam) * xp.maximum(lam, 0)
+        upper = self._along_rows(self.ub_finite, lam) * xp.maximum(-lam, 0)
+        bound_term = lower.sum(axis=0, dtype=np.float64) - upper.sum(axis=0, dtype=np.float64)
+        lam *= xp.where(lam > 0, self._along_rows(self.lb_free, lam),
+                        self._along_rows(self.ub_free, lam))
+        return bound_term
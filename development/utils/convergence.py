@@ -0,0 +1,91 @@
+"""Adaptive, non-blocking scheduling of convergence checks.
+
+A check costs a device-to-host sync, which dominates when an iteration takes
+microseconds. ``ConvergenceMonitor`` lets a solver loop launch the residual
+reductions for a check, keep iterating while the result is copied back, and
+pick up the values once they have landed. It also spaces the checks out while
+the residuals are far above tolerance and checks every ``tolcheck``
+iterations once they are close.
+"""
+import math
+
+
+class ConvergenceMonitor:
+    """Schedules convergence checks and reads their results without stalling.
+
+    Per iteration a solver calls ``due(itr)``; when it is true it computes its
+    residual statistics as one small device array and hands it to ``submit``.
+    ``poll`` returns ``(itr, stats)`` once the copy has arrived (immediately
+    on CPU) and ``None`` otherwise. After evaluating the stats the solver
+    reports the worst residual/tolerance ratio to ``update``, which picks the
+    next interval.
+    """
+
+    # Residual/tolerance ratio below which checks run at the shortest interval
+    NEAR = 10.0
+
+    def __init__(self, backend, tolcheck, max_interval=None):
+        self.backend = backend
+        self.min_interval = tolcheck
+        self.max_interval = 16 * tolcheck if max_interval is None else max_interval
+        self.interval = tolcheck
+        self._next = 0
+        self._pending = None
+        self._last = None
+
+    def due(self, itr):
+        return self._pending is None and itr >= self._next
+
+    def submit(self, itr, stats):
+        self._pending = (itr, self.backend.read_async(stats))
+        self._next = itr + self.interval
+
+    def poll(self):
+        if self._pending is None or not self._pending[1].ready():
+            return None
+        itr, read = self._pending
+        self._pending = None
+        return itr, read.result()
+
+    def update(self, itr, ratio):
+        """Set the next check interval from the worst residual/tolerance ratio at ``itr``.
+
+        Within a factor ``NEAR`` of the tolerances, where residuals of
+        first-order methods oscillate, checks run every ``tolcheck``
+        iterations. Farther out, the log-linear rate measured between the
+        last two checks predicts the convergence point and the next check
+        lands about halfway there; without progress the interval doubles.
+        Intervals are clipped to [tolcheck, max_interval].
+        """
+        if ratio < self.NEAR:
+            interval = self.min_interval
+        elif self._last is not None and ratio < self._last[1] and itr > self._last[0]:
+            rate = math.log(self._last[1] / ratio) / (itr - self._last[0])
+            interval = math.log(ratio) / rate / 2
+        else:
+            interval = 2 * self.interval
+        self.interval = int(min(self.max_interval, max(self.min_interval, interval)))
+        self._next = itr + self.interval
+        self._last = (itr, ratio)
+
+
+class StallDetector:
+    """Flags a solve whose residuals stopped improving.
+
+    ``update`` takes the worst residual/tolerance ratio at each check and
+    returns True once ``patience`` iterations have passed without the best
+    ratio improving by at least ``factor``; in low precision this is where
+    the iterates sit at the rounding floor.
+    """
+
+    def __init__(self, patience, factor=0.9):
+        self.patience = patience
+        self.factor = factor
+        self.best = math.inf
+        self._best_itr = 0
+
+    def update(self, itr, ratio):
+        if ratio < self.factor * self.best or self.best == math.inf:
+            self.best = ratio
+            self._best_itr = itr
+        return itr - self._best_itr >= self.patience
@@ -1 +1,200 @@
 # Common matrix operations for solvers
+import numpy as np
+from utils.backend import csr_spmv, get_backend
+
+# Fewest nonzeros per row block worth handing to a worker thread.
+MIN_BLOCK_NNZ = 32768
+
+
+class StackedOperator:
+    """Pre-assembled constraint operator K = [A_eq; ub_sign * A_ub].
+
+    K is stacked into a single CSR matrix once and K^T is kept as an explicit
+    CSR copy, so ``matvec`` and ``rmatvec`` are one SpMV each, with no
+    implicit transposes, slicing of ``y`` or temporaries. PDLP uses
+    ``ub_sign=-1`` (K = [A_eq; -A_ub]) and SCS uses ``ub_sign=1``.
+
+    On a CPU backend with ``threads > 1``, sparse K and K^T are also split
+    into ``RowBlockedCSR`` blocks and multiplied on the backend's pool.
+    """
+
+    def __init__(self, A_eq, A_ub, ub_sign=-1.0, dtype=np.float32, backend=None):
+        self.backend = backend = get_backend(backend, A_eq, A_ub)
+        self.dtype = np.dtype(dtype)
+        self.n_eq = A_eq.shape[0]
+        self.ub_sign = ub_sign
+
+        if backend.issparse(A_eq) or backend.issparse(A_ub):
+            A_eq = backend.csr_matrix(A_eq, dtype=dtype)
+            A_ub = backend.csr_matrix(A_ub, dtype=dtype)
+            self.K = backend.sparse.vstack((A_eq, ub_sign * A_ub), format="csr").astype(dtype)
+            self.Kt = self.K.T.tocsr()
+            self.K.sort_indices()
+            self.Kt.sort_indices()
+        else:
+            xp = backend.xp
+            self.K = xp.concatenate((backend.asarray(A_eq, dtype), ub_sign * backend.asarray(A_ub, dtype)))
+            self.Kt = xp.ascontiguousarray(self.K.T)
+        self._setup_buffers()
+
+    @classmethod
+    def from_matrices(cls, K, Kt, n_eq, ub_sign=-1.0, dtype=np.float32, backend=None):
+        """Operator from an already stacked K and its transpose (copied), e.g. from a cache."""
+        self = cls.__new__(cls)
+        self.backend = backend = get_backend(backend, K)
+        self.dtype = np.dtype(dtype)
+        self.n_eq = n_eq
+        self.ub_sign = ub_sign
+        if backend.issparse(K):
+            self.K = backend.csr_matrix(K, dtype=dtype).copy()
+            self.Kt = backend.csr_matrix(Kt, dtype=dtype).copy()
+        else:
+            self.K = backend.asarray(K, dtype).copy()
+            self.Kt = backend.xp.ascontiguousarray(self.K.T)
+        self._setup_buffers()
+        return self
+
+    def _setup_buffers(self):
+        """Row blocks, index caches and output buffers for the assembled K and K^T."""
+        backend, dtype = self.backend, self.dtype
+        self.shape = self.K.shape
+        self._blocked = {False: None, True: None}
+        n_blocks = min(backend.threads, self.nnz // MIN_BLOCK_NNZ)
+        if not backend.is_gpu and backend.issparse(self.K) and n_blocks > 1:
+            self._blocked = {False: RowBlockedCSR(self.K, n_blocks, backend.pool),
+                             True: RowBlockedCSR(self.Kt, n_blocks, backend.pool)}
+        self._row_ids = {False: None, True: None}
+        self._transpose_order = None
+        self._matvec_out = backend.xp.empty(self.shape[0], dtype=dtype)
+        self._rmatvec_out = backend.xp.empty(self.shape[1], dtype=dtype)
+
+    @property
+    def nnz(self):
+        return self.K.nnz if self.backend.issparse(self.K) else self.K.size
+
+    def matvec(self, x, out=None):
+        """Compute K @ x into ``out`` (an internal buffer by default)."""
+        out = self._matvec_out if out is None else out
+        if self._blocked[False] is not None:
+            return self._blocked[False].spmv(x, out)
+        return self.backend.spmv(self.K, x, out)
+
+    def rmatvec(self, y, out=None):
+        """Compute K^T @ y into ``out`` (an internal buffer by default)."""
+        out = self._rmatvec_out if out is None else out
+        if self._blocked[True] is not None:
+            return self._blocked[True].spmv(y, out)
+        return self.backend.spmv(self.Kt, y, out)
+
+    def row_ids(self, transpose=False):
+        """Row index of every stored entry of K (or K^T), computed once."""
+        if self._row_ids[transpose] is None:
+            A = self.Kt if transpose else self.K
+            xp = self.backend.xp
+            self._row_ids[transpose] = xp.searchsorted(A.indptr, xp.arange(A.nnz),
+                                                       side="right") - 1
+        return self._row_ids[transpose]
+
+    def column_sq_norms(self):
+        """Squared Euclidean norm of every column of K (the diagonal of K^T K)."""
+        if not self.backend.issparse(self.K):
+            return (self.K ** 2).sum(axis=0)
+        out = self.backend.xp.zeros(self.shape[1], dtype=self.dtype)
+        self.backend.scatter_add(out, self.K.indices, self.K.data ** 2)
+        return out
+
+    def scale(self, row, col):
+        """Replace K by diag(row) K diag(col) in place, keeping K^T consistent."""
+        if not self.backend.issparse(self.K):
+            self.K *= row[:, None]
+            self.K *= col[None, :]
+            self.Kt[...] = self.K.T
+            return self
+        self.K.data *= row[self.row_ids()]
+        self.K.data *= col[self.K.indices]
+        self.Kt.data *= col[self.row_ids(transpose=True)]
+        self.Kt.data *= row[self.Kt.indices]
+        return self
+
+    def set_values(self, A_eq, A_ub):
+        """Overwrite the values of K and K^T in place from new A_eq, A_ub blocks.
+
+        The blocks must have the same shapes (and, for sparse K, the same
+        sparsity pattern) as the ones K was built from, so buffers, row ids
+        and the K -> K^T entry mapping are all reused.
+        """
+        backend, xp = self.backend, self.backend.xp
+        if (A_eq.shape[0] + A_ub.shape[0], A_eq.shape[1]) != self.shape:
+            raise ValueError(f"New blocks do not match the operator shape {self.shape}")
+        if not backend.issparse(self.K):
+            self.K[:self.n_eq] = backend.asarray(A_eq, self.dtype)
+            self.K[self.n_eq:] = self.ub_sign * backend.asarray(A_ub, self.dtype)
+            self.Kt[...] = self.K.T
+            return self
+        K = backend.sparse.vstack((backend.csr_matrix(A_eq, dtype=self.dtype),
+                                   self.ub_sign * backend.csr_matrix(A_ub, dtype=self.dtype)),
+                                  format="csr")
+        K.sort_indices()
+        if (K.nnz != self.K.nnz or not bool(xp.array_equal(K.indptr, self.K.indptr))
+                or not bool(xp.array_equal(K.indices, self.K.indices))):
+            raise ValueError("New blocks do not share the sparsity pattern of the operator")
+        if self._transpose_order is None:
+            # K is stored row by row, so a stable sort by column gives K^T's entry order
+            self._transpose_order = xp.argsort(self.K.indices, kind="stable")
+        self.K.data[...] = K.data
+        self.Kt.data[...] = K.data[self._transpose_order]
+        return self
+
+    def as_linear_operator(self):
+        """Wrap as a backend LinearOperator (for CG and friends)."""
+        return self.backend.LinearOperator(self.shape, matvec=self.matvec,
+                                           rmatvec=self.rmatvec, dtype=self.dtype)
+
+
+class RowBlockedCSR:
+    """Host CSR matrix split into row blocks of about equal nonzero count.
+
+    ``spmv`` runs one block in the calling thread and the rest on ``pool``;
+    each block writes its own slice of ``out``, and the sparsetools kernels
+    release the GIL. Blocks are views of the matrix's ``indices`` and
+    ``data``, so in-place value updates (scaling, ``set_values``) carry over.
+    """
+
+    def __init__(self, A, n_blocks, pool):
+        self.shape = A.shape
+        self.pool = pool
+        cuts = np.searchsorted(A.indptr, np.linspace(0, A.nnz, n_blocks + 1)[1:-1])
+        rows = np.unique(np.concatenate(([0], np.clip(cuts, 0, A.shape[0]), [A.shape[0]])))
+        self.blocks = []
+        for r0, r1 in zip(rows[:-1], rows[1:]):
+            p0, p1 = A.indptr[r0], A.indptr[r1]
+            self.blocks.append((slice(r0, r1), (r1 - r0, A.shape[1]), A.indptr[r0:r1 + 1] - p0,
+                                A.indices[p0:p1], A.data[p0:p1]))
+
+    @staticmethod
+    def _block_spmv(block, x, out):
+        rows, shape, indptr, indices, data = block
+        csr_spmv(shape, indptr, indices, data, x, out[rows])
+
+    def spmv(self, x, out):
+        """Compute ``out = A @ x`` (x of shape (n,) or C-contiguous (n, k))."""
+        futures = [self.pool.submit(self._block_spmv, block, x, out) for block in self.blocks[1:]]
+        self._block_spmv(self.blocks[0], x, out)
+        for future in futures:
+            future.result()
+        return out
+
+
+def broadcast_columns(*vectors):
+    """Stack 1-D vectors to (size, k) when any of them is a batched (size, k) array.
+
+    Lets a batched solve share one right-hand side or cost across all k LPs.
+    """
+    n_cols = [v.shape[1] for v in vectors if np.ndim(v) == 2]
+    if not n_cols:
+        return vectors
+    if len(set(n_cols)) > 1:
+        raise ValueError(f"Batched vectors disagree on the number of LPs: {sorted(set(n_cols))}")
+    return tuple(np.ascontiguousarray(np.broadcast_to(v[:, None] if np.ndim(v) == 1 else v,
+                                                      (v.shape[0], n_cols[0])))
+                 for v in vectors)
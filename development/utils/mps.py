@@ -0,0 +1,370 @@
+"""Streaming reader (and a writer) for LPs in MPS and free MPS format.
+
+``read_mps`` parses Netlib / MIPLIB style files in one pass over the lines,
+in memory bounded by the output: nonzeros are collected in Python lists of
+at most ``BLOCK_ENTRIES`` entries and flushed into geometrically growing
+NumPy buffers, so the parse never holds more than one block of tokens.
+Supported sections are NAME, OBJSENSE, ROWS, COLUMNS, RHS, RANGES, BOUNDS
+and ENDATA. Integer markers and integer bound types are read as their LP
+relaxation (BV becomes 0 <= x <= 1), an RHS entry on the objective row is
+the negated objective constant, and only the first RHS / RANGES / BOUNDS
+set is used. Files may be gzip-compressed (``.gz``). Free MPS is the
+default; ``fixed=True`` reads the fixed columns of the original format,
+where names may contain spaces.
+
+The result is the keyword arguments of ``pdlp_gpu``, ``SCSSolver`` and
+``linprog10`` (maximization problems are negated into minimization) plus a
+metadata dict. With ``cache`` the parsed LP is stored next to the source
+(or in a given directory) as a problem file (``utils/problem_file.py``)
+and memory-mapped back on later calls while the source is unchanged.
+"""
+import gzip
+import os
+
+import numpy as np
+import scipy.sparse
+
+from utils.problem_file import ProblemFile, save_problem
+
+# Bump when the parsed output changes, so cached problem files are rebuilt
+MPS_READER_VERSION = 1
+# Nonzeros buffered as Python objects before they are flushed to NumPy arrays
+BLOCK_ENTRIES = 1 << 18
+SECTIONS = {"NAME", "OBJSENSE", "OBJSENS", "ROWS", "COLUMNS", "RHS", "RANGES", "BOUNDS",
+            "ENDATA"}
+UNSUPPORTED_SECTIONS = {"QUADOBJ", "QMATRIX", "QSECTION", "QCMATRIX", "CSECTION", "SOS",
+                        "INDICATORS", "GENCONS", "PWLOBJ", "USERCUTS", "LAZYCONS"}
+# (start, stop) of the six fields of a fixed-format line
+FIXED_FIELDS = ((1, 3), (4, 12), (14, 22), (24, 36), (39, 47), (49, 61))
+_INDEX_LIMIT = np.iinfo(np.int32).max
+
+
+class _GrowingBuffer:
+    """Append-only 1-D array whose capacity doubles when it fills up."""
+
+    def __init__(self, dtype, capacity=1 << 16):
+        self._data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        end = self.size + values.size
+        if end > self._data.size:
+            grown = np.empty(max(end, 2 * self._data.size), dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:end] = values
+        self.size = end
+
+    @property
+    def array(self):
+        return self._data[:self.size]
+
+
+class _Entries:
+    """COO nonzeros: Python lists of at most ``BLOCK_ENTRIES`` flushed into growing buffers."""
+
+    def __init__(self):
+        self.rows, self.cols, self.vals = [], [], []
+        self._buffers = (_GrowingBuffer(np.int32), _GrowingBuffer(np.int32),
+                         _GrowingBuffer(np.float64))
+
+    def flush(self):
+        for buffer, pending in zip(self._buffers, (self.rows, self.cols, self.vals)):
+            buffer.extend(pending)
+            pending.clear()
+
+    def arrays(self):
+        self.flush()
+        return tuple(buffer.array for buffer in self._buffers)
+
+
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="latin-1")
+    return open(path, "r", encoding="latin-1", buffering=1 << 20)
+
+
+def _fixed_fields(line):
+    """Fields of a fixed-format data line: the type field is dropped when blank."""
+    fields = [line[start:stop].strip() for start, stop in FIXED_FIELDS]
+    while fields and not fields[-1]:
+        fields.pop()
+    return fields[1:] if fields and not fields[0] else fields
+
+
+def _keyword(line):
+    """Section keyword of a header line, or None for data, blank and comment lines.
+
+    Headers start in the first column; free MPS also allows unindented data
+    lines, which are told apart by their first token.
+    """
+    if line[:1] in (" ", "\t", "*") or not line.strip():
+        return None
+    keyword = line.split()[0].upper()
+    if keyword in UNSUPPORTED_SECTIONS:
+        raise ValueError(f"Unsupported MPS section {keyword} (LPs only)")
+    return keyword if keyword in SECTIONS else None
+
+
+def _pairs(tokens):
+    """(name, value) pairs of an RHS / RANGES line, without the optional set name."""
+    start = len(tokens) % 2
+    return tokens[:start], zip(tokens[start::2], tokens[start + 1::2])
+
+
+def _read_columns(lines, row_index, col_index, entries, fixed):
+    """Consume the COLUMNS section; returns the next header line ("" at end of file).
+
+    This loop sees nearly every byte of a large file, so it avoids the
+    section dispatch of ``_parse`` and binds the list appends locally.
+    """
+    split = _fixed_fields if fixed else str.split
+    rows, cols, vals = entries.rows.append, entries.cols.append, entries.vals.append
+    current, j, pending = None, -1, 0
+    for line in lines:
+        if line[:1] not in (" ", "\t"):
+            if line[:1] == "*":
+                continue
+            if _keyword(line) is not None:
+                return line
+        tokens = split(line)
+        if len(tokens) < 3:
+            if not tokens:
+                continue
+            raise ValueError(f"Malformed COLUMNS line: {line.strip()!r}")
+        if tokens[1] == "'MARKER'":
+            continue
+        if tokens[0] != current:
+            current = tokens[0]
+            j = col_index.setdefault(current, len(col_index))
+        rows(row_index[tokens[1]])
+        cols(j)
+        vals(float(tokens[2]))
+        if len(tokens) > 4:
+            rows(row_index[tokens[3]])
+            cols(j)
+            vals(float(tokens[4]))
+        pending += 1
+        if pending >= BLOCK_ENTRIES // 2:
+            entries.flush()
+            pending = 0
+    return ""
+
+
+def _parse(stream, fixed):
+    """One pass over the lines of an MPS file; returns the raw rows, columns and entries."""
+    name, sense, section = "", 1, None
+    row_index, row_kinds, objective = {}, [], None
+    col_index, entries = {}, _Entries()
+    rhs = ranges = lb = ub = None
+    sets = {}
+    split = _fixed_fields if fixed else str.split
+
+    lines = iter(stream)
+    for line in lines:
+        keyword = _keyword(line)
+        if keyword == "COLUMNS":
+            line = _read_columns(lines, row_index, col_index, entries, fixed)
+            if len(col_index) > _INDEX_LIMIT:
+                raise ValueError("More than 2^31 - 1 columns are not supported")
+            rhs, ranges = np.zeros(len(row_kinds)), np.full(len(row_kinds), np.nan)
+            lb, ub = np.zeros(len(col_index)), np.full(len(col_index), np.inf)
+            keyword = _keyword(line) if line else "ENDATA"
+        if keyword is not None:
+            tokens = line.split()
+            if keyword == "ENDATA":
+                break
+            if keyword == "NAME":
+                name = " ".join(tokens[1:])
+            elif keyword in ("OBJSENSE", "OBJSENS") and len(tokens) > 1:
+                sense = -1 if tokens[1].upper().startswith("MAX") else 1
+            elif keyword in ("RHS", "RANGES", "BOUNDS") and rhs is None:
+                raise ValueError(f"{keyword} section before COLUMNS")
+            section = "OBJSENSE" if keyword == "OBJSENS" else keyword
+            continue
+        tokens = [] if line[:1] == "*" else split(line)
+        if not tokens:
+            continue
+
+        if section == "ROWS":
+            kind = tokens[0].upper()
+            if kind not in ("N", "E", "L", "G"):
+                raise ValueError(f"Unknown row type {tokens[0]!r}")
+            if kind == "N" and objective is None:
+                objective = len(row_kinds)
+            row_index[tokens[1]] = len(row_kinds)
+            row_kinds.append(kind)
+        elif section in ("RHS", "RANGES"):
+            set_name, pairs = _pairs(tokens)
+            if sets.setdefault(section, set_name) != set_name:
+                continue
+            target = rhs if section == "RHS" else ranges
+            for row, value in pairs:
+                target[row_index[row]] = float(value)
+        elif section == "BOUNDS":
+            kind = tokens[0].upper()
+            has_value = kind not in ("FR", "MI", "PL", "BV") or len(tokens) == 4
+            set_name = tokens[1:len(tokens) - 1 - has_value]
+            if sets.setdefault(section, set_name) != set_name:
+                continue
+            col = tokens[-1 - has_value]
+            if col not in col_index:
+                raise ValueError(f"BOUNDS entry for unknown column {col!r}")
+            k = col_index[col]
+            value = float(tokens[-1]) if has_value else None
+            if kind in ("UP", "UI"):
+                if value < 0 and lb[k] == 0:
+                    lb[k] = -np.inf  # MPS convention for a negative upper bound
+                ub[k] = value
+            elif kind in ("LO", "LI"):
+                lb[k] = value
+            elif kind == "FX":
+                lb[k] = ub[k] = value
+            elif kind == "FR":
+                lb[k], ub[k] = -np.inf, np.inf
+            elif kind == "MI":
+                lb[k] = -np.inf
+            elif kind == "PL":
+                ub[k] = np.inf
+            elif kind == "BV":
+                lb[k], ub[k] = 0.0, 1.0
+            else:
+                raise ValueError(f"Unsupported bound type {tokens[0]!r}")
+        elif section == "OBJSENSE":
+            sense = -1 if tokens[0].upper().startswith("MAX") else 1
+        else:
+            raise ValueError(f"Data line outside of a section: {line.strip()!r}")
+
+    if objective is None:
+        raise ValueError("MPS file has no objective (N) row")
+    if rhs is None:
+        raise ValueError("MPS file has no COLUMNS section")
+    row, col, val = entries.arrays()
+    A = scipy.sparse.csr_matrix((val, (row, col)), shape=(len(row_kinds), len(col_index)))
+    return name, sense, np.array(row_kinds), objective, A, rhs, ranges, lb, ub
+
+
+def _to_lp(name, sense, kinds, objective, A, rhs, ranges, lb, ub):
+    """Solver keyword arguments and metadata from the parsed rows."""
+    c = sense * A[objective].toarray().ravel()
+    offset = 0.0 - sense * rhs[objective]
+
+    # Row activity interval [lo, hi] from the row type, right-hand side and range
+    lo = np.where(np.isin(kinds, ("E", "G")), rhs, -np.inf)
+    hi = np.where(np.isin(kinds, ("E", "L")), rhs, np.inf)
+    ranged = ~np.isnan(ranges)
+    span = np.abs(np.where(ranged, ranges, 0))
+    lo = np.where(ranged & ((kinds == "L") | ((kinds == "E") & (ranges < 0))), rhs - span, lo)
+    hi = np.where(ranged & ((kinds == "G") | ((kinds == "E") & (ranges > 0))), rhs + span, hi)
+
+    constraint = kinds != "N"
+    eq = np.flatnonzero(constraint & (lo == hi))
+    upper = np.flatnonzero(constraint & (lo != hi) & np.isfinite(hi))
+    lower = np.flatnonzero(constraint & (lo != hi) & np.isfinite(lo))
+    problem = {"c": c,
+               "A_ub": scipy.sparse.vstack((A[upper], -A[lower]), format="csr"),
+               "b_ub": np.concatenate((hi[upper], -lo[lower])),
+               "A_eq": A[eq], "b_eq": hi[eq], "lb": lb, "ub": ub}
+    metadata = {"name": name, "sense": "max" if sense < 0 else "min",
+                "objective_offset": float(offset), "rows": int(constraint.sum()),
+                "columns": int(A.shape[1]), "nnz": int(np.diff(A.indptr)[constraint].sum())}
+    return problem, metadata
+
+
+def read_mps(path, fixed=False, cache=None):
+    """Read an LP from an MPS file (free format unless ``fixed``).
+
+    Args:
+        path (str): ``.mps`` file, optionally gzip-compressed (``.gz``).
+        fixed (bool): Parse the fixed-column format instead of whitespace tokens.
+        cache (bool | str, optional): Store the parsed LP as a problem file,
+            ``<path>.lpb`` for True or ``<cache>/<basename>.lpb`` for a
+            directory, and load it from there (memory-mapped) while the
+            source file's size and modification time are unchanged.
+
+    Returns:
+        tuple: ``(problem, metadata)``. ``problem`` holds c, A_ub, b_ub,
+        A_eq, b_eq, lb and ub for the equivalent minimization; ``metadata``
+        has the name, ``sense`` ("min" or "max"), ``objective_offset`` and
+        the sizes. The original objective is
+        ``(c @ x + objective_offset) * (-1 if sense == "max" else 1)``.
+    """
+    stat = os.stat(path)
+    source = {"mps_source": os.path.abspath(path), "mps_size": stat.st_size,
+              "mps_mtime_ns": stat.st_mtime_ns, "mps_reader_version": MPS_READER_VERSION,
+              "mps_fixed": bool(fixed)}
+    cache_path = None
+    if cache:
+        cache_path = (f"{path}.lpb" if cache is True
+                      else os.path.join(cache, f"{os.path.basename(path)}.lpb"))
+        if os.path.exists(cache_path):
+            cached = ProblemFile(cache_path)
+            if all(cached.metadata.get(key) == value for key, value in source.items()):
+                metadata = {key: value for key, value in cached.metadata.items()
+                            if not key.startswith("mps_")}
+                return cached.problem(), metadata
+
+    with _open(path) as stream:
+        try:
+            parsed = _parse(stream, fixed)
+        except KeyError as e:
+            raise ValueError(f"{path}: unknown row name {e.args[0]!r}") from None
+    problem, metadata = _to_lp(*parsed)
+    if cache_path is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        save_problem(cache_path, **problem, metadata={**metadata, **source})
+    return problem, metadata
+
+
+def write_mps(path, c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, lb=None, ub=None,
+              name="LP", block_columns=1 << 14):
+    """Write a minimization LP in free MPS format.
+
+    Columns are named ``x<j>``, equality rows ``e<i>`` and inequality rows
+    ``u<i>``; the columns are written in blocks of ``block_columns`` so
+    large LPs stream out. Values are written with round-trip precision.
+    """
+    c = np.asarray(c, dtype=np.float64)
+    n = c.size
+    A_eq = scipy.sparse.csr_matrix((0, n)) if A_eq is None else scipy.sparse.csr_matrix(A_eq)
+    A_ub = scipy.sparse.csr_matrix((0, n)) if A_ub is None else scipy.sparse.csr_matrix(A_ub)
+    b_eq = np.zeros(0) if b_eq is None else np.asarray(b_eq, dtype=np.float64)
+    b_ub = np.zeros(0) if b_ub is None else np.asarray(b_ub, dtype=np.float64)
+    lb = np.zeros(n) if lb is None else np.broadcast_to(np.asarray(lb, dtype=np.float64), (n,))
+    ub = np.full(n, np.inf) if ub is None else np.broadcast_to(np.asarray(ub, dtype=np.float64),
+                                                                (n,))
+    row_names = np.array(["obj"] + [f"e{i}" for i in range(A_eq.shape[0])]
+                         + [f"u{i}" for i in range(A_ub.shape[0])])
+    K = scipy.sparse.vstack((scipy.sparse.csr_matrix(c), A_eq, A_ub), format="csc")
+
+    with open(path, "w") as f:
+        f.write(f"NAME {name}\nROWS\n N obj\n")
+        f.writelines(f" E e{i}\n" for i in range(A_eq.shape[0]))
+        f.writelines(f" L u{i}\n" for i in range(A_ub.shape[0]))
+        f.write("COLUMNS\n")
+        for start in range(0, n, block_columns):
+            block = K[:, start:start + block_columns]
+            lines = []
+            for j in range(block.shape[1]):
+                lo, hi = block.indptr[j], block.indptr[j + 1]
+                if lo == hi:  # every column must appear at least once
+                    lines.append(f" x{start + j} obj 0\n")
+                lines.extend(f" x{start + j} {row} {value!r}\n" for row, value in
+                             zip(row_names[block.indices[lo:hi]], block.data[lo:hi].tolist()))
+            f.writelines(lines)
+        f.write("RHS\n")
+        f.writelines(f" rhs e{i} {v!r}\n" for i, v in enumerate(b_eq.tolist()) if v != 0)
+        f.writelines(f" rhs u{i} {v!r}\n" for i, v in enumerate(b_ub.tolist()) if v != 0)
+        f.write("BOUNDS\n")
+        for j in np.flatnonzero((lb != 0) | (ub != np.inf)):
+            if lb[j] == ub[j]:
+                f.write(f" FX bnd x{j} {float(lb[j])!r}\n")
+                continue
+            if lb[j] == -np.inf:
+                f.write(f" MI bnd x{j}\n")
+            elif lb[j] != 0:
+                f.write(f" LO bnd x{j} {float(lb[j])!r}\n")
+            if ub[j] != np.inf:
+                f.write(f" UP bnd x{j} {float(ub[j])!r}\n")
+        f.write("ENDATA\n")
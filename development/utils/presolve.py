@@ -0,0 +1,360 @@
+"""LP presolve with postsolve.
+
+``presolve`` reduces
+
+    min c^T x  s.t.  A_eq x = b_eq,  A_ub x <= b_ub,  lb <= x <= ub
+
+before it reaches a device. It repeats, until nothing changes:
+
+- singleton equality rows fix their variable, singleton inequality rows
+  become (tightened) bounds,
+- fixed variables (lb == ub) are substituted into the right-hand sides and
+  the objective,
+- empty rows are checked for feasibility and dropped, empty columns are set
+  to their best bound,
+- inequality rows that no point within the bounds can violate (dominated
+  rows) are dropped,
+- duplicate rows (equal up to a scale factor) are dropped, keeping the
+  tightest inequality.
+
+Every reduction is a vectorized pass over the CSR arrays with row and column
+masks; the matrices themselves are only sliced once at the end. The returned
+``Presolved`` maps solutions of the reduced LP back with ``postsolve``.
+Duals use the PDLP convention y = [y_eq; y_ub] with y_ub >= 0 and reduced
+costs c - A_eq^T y_eq + A_ub^T y_ub. Bounds implied by row activities are
+only used to detect dominated rows, never handed to the solver: an active
+implied bound would need its multiplier pushed back onto the row that
+implied it, which postsolve does only for singleton rows.
+"""
+import time
+import numpy as np
+import scipy.sparse
+from utils.bounds import normalize_bounds
+
+
+class _Rows:
+    """A constraint block in CSR form with a mask of rows still in the problem."""
+
+    def __init__(self, A, b, n):
+        A = scipy.sparse.csr_matrix((0, n) if A is None else A, dtype=np.float64)
+        A.sum_duplicates()
+        A.eliminate_zeros()
+        self.A = A
+        self.b = np.zeros(0) if b is None else np.array(b, dtype=np.float64)
+        if self.b.shape != (A.shape[0],):
+            raise ValueError(f"Right-hand side of shape {self.b.shape} does not match "
+                             f"{A.shape[0]} rows")
+        self.row_ids = np.repeat(np.arange(A.shape[0]), np.diff(A.indptr))
+        self.keep = np.ones(A.shape[0], dtype=bool)
+
+    def live(self, col_keep):
+        """Mask of the stored entries in kept rows and kept columns."""
+        return self.keep[self.row_ids] & col_keep[self.A.indices]
+
+    def counts(self, live):
+        return np.bincount(self.row_ids[live], minlength=self.A.shape[0])
+
+    def singletons(self, live):
+        """(rows, cols, coefficients) of kept rows with exactly one live entry."""
+        single = self.keep & (self.counts(live) == 1)
+        entries = np.flatnonzero(live & single[self.row_ids])
+        return self.row_ids[entries], self.A.indices[entries], self.A.data[entries]
+
+    def substitute(self, x_fixed, cols):
+        """b -= A[:, cols] x_fixed[cols] for newly fixed columns."""
+        hit = np.isin(self.A.indices, cols)
+        weights = self.A.data[hit] * x_fixed[self.A.indices[hit]]
+        self.b -= np.bincount(self.row_ids[hit], weights=weights, minlength=self.A.shape[0])
+
+    def activity(self, live, lb, ub, upper):
+        """Max (``upper``) or min row activity over the box, and its count of infinite terms."""
+        rows, cols, a = self.row_ids[live], self.A.indices[live], self.A.data[live]
+        bound = np.where((a > 0) == upper, ub[cols], lb[cols])
+        term = a * bound
+        finite = np.isfinite(term)
+        m = self.A.shape[0]
+        return (np.bincount(rows[finite], weights=term[finite], minlength=m),
+                np.bincount(rows[~finite], minlength=m))
+
+    def duplicates(self, live, signed):
+        """Group kept rows that are equal up to a scale factor.
+
+        Returns (rows, group, scale) for every row in a group of two or more,
+        with row_i = scale_i * (the group's first row); the scale is positive
+        unless ``signed``. Rows are matched by hashing their pattern and
+        normalized values, then verified entry by entry.
+        """
+        entries = np.flatnonzero(live)
+        if entries.size == 0:
+            return (np.zeros(0, dtype=int),) * 2 + (np.zeros(0),)
+        rows, cols, a = self.row_ids[entries], self.A.indices[entries], self.A.data[entries]
+        row_list, first, nnz = np.unique(rows, return_index=True, return_counts=True)
+        scale = a[first] if signed else np.abs(a[first])
+        pos = np.searchsorted(row_list, rows)
+        v = a / scale[pos]
+        rng = np.random.default_rng(0)
+        w1, w2 = rng.random(self.A.shape[1]), rng.random(self.A.shape[1])
+        h1 = np.bincount(pos, weights=w1[cols] * np.round(v, 9), minlength=row_list.size)
+        h2 = np.bincount(pos, weights=w2[cols], minlength=row_list.size)
+        keys = np.stack((nnz.astype(float), np.round(h1, 9), np.round(h2, 9)), axis=1)
+        _, group, group_size = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+        group = group.ravel()
+        cand = np.flatnonzero(group_size[group] > 1)
+        if cand.size == 0:
+            return (np.zeros(0, dtype=int),) * 2 + (np.zeros(0),)
+
+        # Representative: first candidate of each group; compare live entries position by position
+        order = np.argsort(group[cand], kind="stable")
+        cand = cand[order]
+        rep = cand[np.searchsorted(group[cand], group[cand])]
+        length = nnz[cand]
+        offset = np.arange(length.sum()) - np.repeat(np.cumsum(length) - length, length)
+        mine = np.repeat(first[cand], length) + offset
+        theirs = np.repeat(first[rep], length) + offset
+        ok = (cols[mine] == cols[theirs]) & np.isclose(v[mine], v[theirs], rtol=1e-9, atol=0)
+        same = np.bincount(np.repeat(np.arange(cand.size), length), weights=ok, minlength=cand.size)
+        match = same == length
+        cand, rep = cand[match], rep[match]
+        # Groups reduced to their representative alone are not duplicates
+        multi = np.bincount(rep, minlength=row_list.size)[rep] > 1
+        cand, rep = cand[multi], rep[multi]
+        return row_list[cand], rep, scale[cand] / scale[rep]
+
+
+class Presolved:
+    """A presolved LP: the reduced problem, statistics and the postsolve map.
+
+    Attributes:
+        problem (dict): c, A_ub, b_ub, A_eq, b_eq, lb, ub of the reduced LP.
+        offset (float): Objective constant from substituted variables;
+            c^T x of the original LP is c_reduced^T x_reduced + offset.
+        stats (dict): Counts of every reduction and the problem sizes.
+        time (float): Seconds spent in presolve.
+    """
+
+    def __init__(self, problem, offset, stats, elapsed, postsolve_data):
+        self.problem = problem
+        self.offset = offset
+        self.stats = stats
+        self.time = elapsed
+        self._data = postsolve_data
+
+    def postsolve(self, x, y=None):
+        """Map a reduced solution back to the original LP.
+
+        Args:
+            x (ndarray): Reduced primal solution.
+            y (ndarray, optional): Reduced dual [y_eq; y_ub] (PDLP convention).
+
+        Returns:
+            ndarray | tuple: x, or (x, y) when ``y`` is given.
+        """
+        d = self._data
+        x_full = d["x_fixed"].copy()
+        x_full[d["cols"]] = x
+        if y is None:
+            return x_full
+
+        m_eq = d["A_eq"].shape[0]
+        y_eq, y_ub = np.zeros(m_eq), np.zeros(d["A_ub"].shape[0])
+        y = np.asarray(y, dtype=np.float64)
+        y_eq[d["eq_rows"]] = y[:d["eq_rows"].size]
+        y_ub[d["ub_rows"]] = y[d["eq_rows"].size:]
+        reduced_costs = d["c"] - d["A_eq"].T @ y_eq + d["A_ub"].T @ y_ub
+
+        # A singleton equality row that fixed x_j carries all of x_j's reduced cost
+        rows, cols, a = d["eq_singletons"]
+        y_eq[rows] = reduced_costs[cols] / a
+        reduced_costs[cols] = 0
+        # A singleton inequality row that set a bound carries the reduced cost that bound absorbs
+        rows, cols, a = d["ub_singletons"]
+        absorbed = np.where(a > 0, np.minimum(reduced_costs[cols], 0),
+                            np.maximum(reduced_costs[cols], 0))
+        y_ub[rows] = -absorbed / a
+        return x_full, np.concatenate((y_eq, y_ub))
+
+
+def _first_per_column(rows, cols, a):
+    """Keep the first (row, col, a) triple of every column."""
+    _, first = np.unique(cols, return_index=True)
+    return rows[first], cols[first], a[first]
+
+
+def presolve(c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, lb=None, ub=None, tol=1e-9,
+             max_passes=20):
+    """Reduce an LP and record how to map its solutions back.
+
+    Args:
+        c (ndarray): Cost vector, shape (n,).
+        A_ub, A_eq (sparse matrix | ndarray, optional): Constraint blocks
+            (CSR, COO or any scipy.sparse format, or dense).
+        b_ub, b_eq (ndarray, optional): Right-hand sides.
+        lb, ub (array | float, optional): Variable bounds (default: free).
+        tol (float): Feasibility tolerance for the infeasibility checks.
+        max_passes (int): Cap on the number of reduction rounds.
+
+    Returns:
+        Presolved: reduced problem (``.problem``), ``.postsolve``, ``.stats``
+        and ``.time``.
+
+    Raises:
+        ValueError: If presolve proves the LP infeasible or unbounded.
+    """
+    start = time.perf_counter()
+    c = np.array(c, dtype=np.float64)
+    if c.ndim != 1:
+        raise ValueError("presolve handles a single LP; c must be 1-D")
+    n = c.shape[0]
+    dense = any(A is not None and not scipy.sparse.issparse(A) for A in (A_ub, A_eq))
+    eq, ineq = _Rows(A_eq, b_eq, n), _Rows(A_ub, b_ub, n)
+    lb, ub = normalize_bounds(lb, ub, n)
+    lb0, ub0 = lb.copy(), ub.copy()
+    col_keep = np.ones(n, dtype=bool)
+    x_fixed = np.zeros(n)
+    offset = 0.0
+    stats = dict.fromkeys(("singleton_eq_rows", "singleton_ub_rows", "fixed_columns", "empty_rows",
+                           "empty_columns", "dominated_rows", "duplicate_rows"), 0)
+    eq_singletons, ub_singletons = [], []
+    scale = lambda v: tol * (1 + np.abs(v))
+
+    for passes in range(1, max_passes + 1):
+        changed = 0
+
+        # Singleton equality rows fix their variable
+        rows, cols, a = eq.singletons(eq.live(col_keep))
+        if rows.size:
+            value = eq.b[rows] / a
+            src_rows, src_cols, src_a = _first_per_column(rows, cols, a)
+            fix = np.full(n, np.nan)
+            fix[src_cols] = eq.b[src_rows] / src_a
+            if np.any(np.abs(value - fix[cols]) > scale(value)):
+                raise ValueError("Presolve: singleton equality rows fix a variable to two values")
+            if np.any((fix[src_cols] < lb[src_cols] - scale(lb[src_cols]))
+                      | (fix[src_cols] > ub[src_cols] + scale(ub[src_cols]))):
+                raise ValueError("Presolve: singleton equality row outside the variable bounds")
+            lb[src_cols] = ub[src_cols] = fix[src_cols]
+            eq_singletons.append((src_rows, src_cols, src_a))
+            eq.keep[rows] = False
+            stats["singleton_eq_rows"] += rows.size
+            changed += rows.size
+
+        # Singleton inequality rows become bounds
+        rows, cols, a = ineq.singletons(ineq.live(col_keep))
+        if rows.size:
+            limit = ineq.b[rows] / a
+            upper = a > 0
+            np.minimum.at(ub, cols[upper], limit[upper])
+            np.maximum.at(lb, cols[~upper], limit[~upper])
+            ub_singletons.append((rows, cols, a, limit))
+            ineq.keep[rows] = False
+            stats["singleton_ub_rows"] += rows.size
+            changed += rows.size
+        crossed = lb > ub
+        if np.any(lb - ub > scale(ub)):
+            raise ValueError("Presolve: bounds cross (lb > ub); the LP is infeasible")
+        lb[crossed] = ub[crossed]
+
+        # Fixed variables are substituted out
+        cols = np.flatnonzero(col_keep & (lb == ub))
+        if cols.size:
+            x_fixed[cols] = lb[cols]
+            offset += c[cols] @ x_fixed[cols]
+            eq.substitute(x_fixed, cols)
+            ineq.substitute(x_fixed, cols)
+            col_keep[cols] = False
+            stats["fixed_columns"] += cols.size
+            changed += cols.size
+
+        # Empty rows
+        live_eq, live_ub = eq.live(col_keep), ineq.live(col_keep)
+        empty_eq = np.flatnonzero(eq.keep & (eq.counts(live_eq) == 0))
+        empty_ub = np.flatnonzero(ineq.keep & (ineq.counts(live_ub) == 0))
+        if np.any(np.abs(eq.b[empty_eq]) > tol) or np.any(ineq.b[empty_ub] < -tol):
+            raise ValueError("Presolve: an empty row has an infeasible right-hand side")
+        eq.keep[empty_eq] = ineq.keep[empty_ub] = False
+        stats["empty_rows"] += empty_eq.size + empty_ub.size
+        changed += empty_eq.size + empty_ub.size
+
+        # Empty columns go to the bound their cost prefers
+        live_eq, live_ub = eq.live(col_keep), ineq.live(col_keep)
+        used = np.zeros(n, dtype=bool)
+        used[eq.A.indices[live_eq]] = used[ineq.A.indices[live_ub]] = True
+        cols = np.flatnonzero(col_keep & ~used)
+        if cols.size:
+            value = np.where(c[cols] > 0, lb[cols],
+                             np.where(c[cols] < 0, ub[cols], np.clip(0, lb[cols], ub[cols])))
+            if not np.all(np.isfinite(value)):
+                raise ValueError("Presolve: an unconstrained variable makes the LP unbounded")
+            x_fixed[cols] = value
+            offset += c[cols] @ value
+            col_keep[cols] = False
+            stats["empty_columns"] += cols.size
+            changed += cols.size
+
+        # Dominated inequality rows: even the largest activity over the box satisfies them
+        live_ub = ineq.live(col_keep)
+        max_act, max_inf = ineq.activity(live_ub, lb, ub, upper=True)
+        min_act, min_inf = ineq.activity(live_ub, lb, ub, upper=False)
+        if np.any(ineq.keep & (min_inf == 0) & (min_act > ineq.b + scale(ineq.b))):
+            raise ValueError("Presolve: an inequality row cannot be satisfied within the bounds")
+        dominated = np.flatnonzero(ineq.keep & (max_inf == 0) & (max_act <= ineq.b))
+        ineq.keep[dominated] = False
+        stats["dominated_rows"] += dominated.size
+        changed += dominated.size
+
+        # Duplicate rows: keep one equality, or the tightest inequality, per group
+        rows, rep, s = eq.duplicates(eq.live(col_keep), signed=True)
+        if rows.size:
+            rhs = eq.b[rows] / s
+            if np.any(np.abs(rhs - eq.b[rep]) > scale(rhs)):
+                raise ValueError("Presolve: parallel equality rows with different right-hand sides")
+            drop = rows[rows != rep]
+            eq.keep[drop] = False
+            stats["duplicate_rows"] += drop.size
+            changed += drop.size
+        rows, rep, s = ineq.duplicates(ineq.live(col_keep), signed=False)
+        if rows.size:
+            order = np.lexsort((ineq.b[rows] / s, rep))
+            rows, rep = rows[order], rep[order]
+            tightest = np.r_[True, rep[1:] != rep[:-1]]
+            drop = rows[~tightest]
+            ineq.keep[drop] = False
+            stats["duplicate_rows"] += drop.size
+            changed += drop.size
+
+        if not changed:
+            break
+
+    # Slice the reduced problem once
+    cols = np.flatnonzero(col_keep)
+    eq_rows, ub_rows = np.flatnonzero(eq.keep), np.flatnonzero(ineq.keep)
+    A_eq_red, A_ub_red = eq.A[eq_rows][:, cols], ineq.A[ub_rows][:, cols]
+    if dense:
+        A_eq_red, A_ub_red = A_eq_red.toarray(), A_ub_red.toarray()
+    problem = {"c": c[cols], "A_ub": A_ub_red, "b_ub": ineq.b[ub_rows], "A_eq": A_eq_red,
+               "b_eq": eq.b[eq_rows], "lb": lb[cols], "ub": ub[cols]}
+    stats.update(passes=passes,
+                 rows=(eq.A.shape[0] + ineq.A.shape[0], eq_rows.size + ub_rows.size),
+                 columns=(n, cols.size),
+                 nnz=(eq.A.nnz + ineq.A.nnz,
+                      int(eq.live(col_keep).sum() + ineq.live(col_keep).sum())))
+
+    # Only singleton inequality rows whose limit is the final, strictly tighter bound get duals
+    if ub_singletons:
+        rows, cols_s, a, limit = (np.concatenate(v) for v in zip(*ub_singletons))
+        binding = np.where(a > 0, (limit == ub[cols_s]) & (limit < ub0[cols_s]),
+                           (limit == lb[cols_s]) & (limit > lb0[cols_s]))
+        rows, cols_s, a = rows[binding], cols_s[binding], a[binding]
+        side = np.where(a > 0, 1, 0)
+        _, first = np.unique(cols_s * 2 + side, return_index=True)
+        ub_singletons = (rows[first], cols_s[first], a[first])
+    else:
+        ub_singletons = (np.zeros(0, dtype=int),) * 2 + (np.zeros(0),)
+    eq_singletons = tuple(np.concatenate(v) for v in zip(*eq_singletons)) if eq_singletons \
+        else (np.zeros(0, dtype=int),) * 2 + (np.zeros(0),)
+
+    x_fixed[cols] = 0
+    postsolve_data = {"x_fixed": x_fixed, "cols": cols, "eq_rows": eq_rows, "ub_rows": ub_rows,
+                      "c": c, "A_eq": eq.A, "A_ub": ineq.A, "eq_singletons": eq_singletons,
+                      "ub_singletons": ub_singletons}
+    return Presolved(problem, offset, stats, time.perf_counter() - start, postsolve_data)
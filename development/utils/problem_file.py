@@ -0,0 +1,289 @@
+"""Single-file binary LP container that is memory-mapped on load.
+
+A problem file (``.lpb``) holds the LP
+
+    min c^T x  s.t.  A_eq x = b_eq,  A_ub x <= b_ub,  lb <= x <= ub
+
+as raw arrays: the vectors c, b_eq, b_ub, lb, ub and each matrix as its
+CSR ``indptr``/``indices``/``data``. The layout is
+
+- 8 bytes ``MAGIC``, then the header length as a little-endian uint64,
+- a JSON header: format version, the table of arrays (dtype, shape, byte
+  offset), the matrix shapes and nonzero counts, free-form ``metadata`` and
+  a BLAKE2b checksum of the array bytes,
+- the array bytes, each starting on an ``ALIGNMENT``-byte boundary.
+
+``ProblemFile`` reads only the header and maps the rest read-only, so a
+10 GB instance opens at once and the OS pages in only what the solver
+touches. The CSR matrices it returns are scipy views on the mapping (int32
+indices are kept as stored, so scipy neither scans nor copies them).
+``to_backend`` hands the mapped arrays straight to the solver backend: no
+copy on the host when the dtype matches, and a single host-to-device copy
+on GPU (casts happen on the device). The checksum is only recomputed by
+``verify``, which reads the whole file.
+
+``save_problem`` writes arrays in chunks, so memory-mapped inputs (such as
+``test_data.utils.load_csr`` matrices) are converted without loading them;
+``convert_directory`` converts the existing ``.npy`` / ``.mtx`` layouts:
+
+    python -m utils.problem_file test_data/data problem.lpb
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+
+import numpy as np
+import scipy.io
+import scipy.sparse
+
+from utils.backend import get_backend
+from utils.operator_cache import _host
+
+MAGIC = b"LPBFILE\x01"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+# Bytes hashed and written per step, bounding the memory used by save/verify
+CHUNK_BYTES = 1 << 26
+VECTORS = ("c", "b_ub", "b_eq", "lb", "ub")
+MATRICES = ("A_ub", "A_eq")
+CSR_PARTS = ("indptr", "indices", "data")
+_CHECKSUM_PLACEHOLDER = "0" * 40
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _chunks(array):
+    """Consecutive byte views of ``array`` of at most ``CHUNK_BYTES`` each."""
+    flat = array.reshape(-1)
+    step = max(1, CHUNK_BYTES // max(1, flat.itemsize))
+    for start in range(0, flat.size, step):
+        yield np.ascontiguousarray(flat[start:start + step]).view(np.uint8)
+
+
+def _collect_arrays(c, A_ub, b_ub, A_eq, b_eq, lb, ub):
+    """Flat dict of named host arrays plus the matrix table; None entries are left out."""
+    arrays, matrices = {}, {}
+    for name, value in zip(VECTORS, (c, b_ub, b_eq, lb, ub)):
+        if value is not None:
+            arrays[name] = np.asarray(_host(value))
+    for name, A in zip(MATRICES, (A_ub, A_eq)):
+        if A is None:
+            continue
+        A = _host(A)
+        A = A.tocsr() if scipy.sparse.issparse(A) else scipy.sparse.csr_matrix(A)
+        matrices[name] = {"shape": [int(s) for s in A.shape], "nnz": int(A.nnz)}
+        for part in CSR_PARTS:
+            arrays[f"{name}.{part}"] = getattr(A, part)
+    return arrays, matrices
+
+
+def save_problem(path, c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, lb=None, ub=None,
+                 metadata=None):
+    """Write an LP to ``path`` in the problem file format.
+
+    Matrices may be dense or sparse, on the host or a CuPy device; arrays
+    are stored with their own dtypes. ``metadata`` is any JSON-serializable
+    dict (source, generator parameters, ...). The file is written to a
+    temporary name first and moved into place, so readers never see a
+    partial file.
+
+    Returns:
+        str: The checksum of the stored arrays.
+    """
+    arrays, matrices = _collect_arrays(c, A_ub, b_ub, A_eq, b_eq, lb, ub)
+    table, offset = {}, 0
+    for name, array in arrays.items():
+        table[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+    header = {"format_version": FORMAT_VERSION, "arrays": table, "matrices": matrices,
+              "metadata": metadata or {}, "checksum": _CHECKSUM_PLACEHOLDER}
+    # Offsets are relative to the data start, so the real checksum fits the same header size
+    header_size = _align(len(MAGIC) + 8 + len(json.dumps(header).encode())) - len(MAGIC) - 8
+
+    h = hashlib.blake2b(digest_size=20)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * (len(MAGIC) + 8 + header_size))
+        data_start = f.tell()
+        for name, array in arrays.items():
+            f.seek(data_start + table[name]["offset"])
+            for chunk in _chunks(array):
+                h.update(chunk)
+                f.write(chunk)
+        f.truncate(data_start + offset)
+        header["checksum"] = h.hexdigest()
+        f.seek(0)
+        f.write(MAGIC + np.uint64(header_size).tobytes()
+                + json.dumps(header).encode().ljust(header_size))
+    os.replace(tmp, path)
+    return header["checksum"]
+
+
+class ProblemFile:
+    """Read-only, memory-mapped view of a problem file.
+
+    Opening parses the header only. ``array`` and ``matrix`` (and item
+    access by LP name: ``f["c"]``, ``f["A_ub"]``) return host views on the
+    mapping; absent entries are None.
+    """
+
+    def __init__(self, path, verify=False):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a problem file")
+            header_size = int(np.frombuffer(f.read(8), dtype="<u8")[0])
+            self.header = json.loads(f.read(header_size))
+            if self.header["format_version"] != FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported problem file version {self.header['format_version']}")
+            self._data_start = len(MAGIC) + 8 + header_size
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if verify:
+            self.verify()
+
+    def __repr__(self):
+        shapes = {name: tuple(m["shape"]) for name, m in self.header["matrices"].items()}
+        return f"ProblemFile({self.path!r}, {shapes})"
+
+    @property
+    def metadata(self):
+        return self.header["metadata"]
+
+    @property
+    def checksum(self):
+        return self.header["checksum"]
+
+    def __getitem__(self, name):
+        return self.matrix(name) if name in MATRICES else self.array(name)
+
+    def array(self, name):
+        """Host array ``name`` as a read-only view on the mapping, or None if absent."""
+        entry = self.header["arrays"].get(name)
+        if entry is None:
+            return None
+        dtype, shape = np.dtype(entry["dtype"]), tuple(entry["shape"])
+        count = int(np.prod(shape, dtype=np.int64))
+        return np.frombuffer(self._buffer, dtype=dtype, count=count,
+                             offset=self._data_start + entry["offset"]).reshape(shape)
+
+    def matrix(self, name):
+        """scipy CSR matrix ``name`` sharing memory with the mapping, or None if absent."""
+        entry = self.header["matrices"].get(name)
+        if entry is None:
+            return None
+        parts = [self.array(f"{name}.{part}") for part in CSR_PARTS[::-1]]
+        return scipy.sparse.csr_matrix(tuple(parts), shape=tuple(entry["shape"]), copy=False)
+
+    def problem(self):
+        """All LP entries as a dict of host views, the keyword arguments of the solvers."""
+        return {name: self[name] for name in VECTORS + MATRICES}
+
+    def to_backend(self, backend=None, dtype=None):
+        """LP entries on ``backend``, with c, b and matrix values cast to ``dtype``.
+
+        On CPU arrays already in ``dtype`` stay views on the mapping; on GPU
+        each array is copied to the device once, straight from the mapped
+        pages, and cast there. lb and ub stay on the host, where the solvers
+        normalize the bounds.
+        """
+        backend = backend if hasattr(backend, "xp") else get_backend(backend)
+        xp = backend.xp
+
+        def move(a):
+            if a is None:
+                return None
+            a = xp.asarray(a)
+            return a if dtype is None else a.astype(dtype, copy=False)
+
+        problem = {name: move(self.array(name)) for name in ("c", "b_ub", "b_eq")}
+        problem.update(lb=self.array("lb"), ub=self.array("ub"))
+        for name in MATRICES:
+            entry = self.header["matrices"].get(name)
+            if entry is None:
+                problem[name] = None
+                continue
+            data, indices, indptr = (self.array(f"{name}.{part}") for part in CSR_PARTS[::-1])
+            problem[name] = backend.sparse.csr_matrix(
+                (move(data), xp.asarray(indices), xp.asarray(indptr)), shape=tuple(entry["shape"]))
+        return problem
+
+    def verify(self):
+        """Recompute the checksum over all arrays; raises ValueError on a mismatch."""
+        h = hashlib.blake2b(digest_size=20)
+        for name in self.header["arrays"]:
+            for chunk in _chunks(self.array(name)):
+                h.update(chunk)
+        if h.hexdigest() != self.checksum:
+            raise ValueError(f"Checksum mismatch in {self.path}: the file is corrupted")
+        return True
+
+
+def load_problem_file(path, backend=None, dtype=None, verify=False):
+    """Open ``path`` and return the LP as solver keyword arguments.
+
+    Without ``backend`` and ``dtype`` the arrays are host views on the
+    memory mapping; otherwise see ``ProblemFile.to_backend``.
+    """
+    f = ProblemFile(path, verify=verify)
+    if backend is None and dtype is None:
+        return f.problem()
+    return f.to_backend(backend, dtype)
+
+
+def _read_matrix(data_dir, name):
+    """Matrix ``name`` from ``data_dir`` in any of the existing layouts, or None.
+
+    Tried in order: split CSR ``.npy`` arrays (memory-mapped), a dense
+    ``.npy`` array, and Matrix Market ``.mtx``.
+    """
+    path = lambda suffix: os.path.join(data_dir, f"{name}{suffix}")
+    if os.path.exists(path(".indptr.npy")):
+        shape = tuple(int(v) for v in np.load(path(".shape.npy")))
+        parts = [np.load(path(f".{part}.npy"), mmap_mode="r") for part in CSR_PARTS[::-1]]
+        return scipy.sparse.csr_matrix(tuple(parts), shape=shape, copy=False)
+    if os.path.exists(path(".npy")):
+        return scipy.sparse.csr_matrix(np.load(path(".npy"), mmap_mode="r"))
+    if os.path.exists(path(".mtx")):
+        return scipy.sparse.csr_matrix(scipy.io.mmread(path(".mtx")))
+    return None
+
+
+def convert_directory(data_dir, path, metadata=None):
+    """Convert an LP saved as files in ``data_dir`` into the problem file ``path``.
+
+    Vectors are read from ``<name>.npy`` (c is required; b_ub, b_eq, lb and
+    ub are optional) and matrices from split CSR ``.npy`` arrays, dense
+    ``.npy`` or ``.mtx`` files (see ``_read_matrix``). The source directory
+    is recorded in the metadata.
+
+    Returns:
+        str: The checksum of the stored arrays.
+    """
+    vectors = {}
+    for name in VECTORS:
+        file = os.path.join(data_dir, f"{name}.npy")
+        vectors[name] = np.load(file, mmap_mode="r") if os.path.exists(file) else None
+    if vectors["c"] is None:
+        raise ValueError(f"No c.npy in {data_dir}")
+    matrices = {name: _read_matrix(data_dir, name) for name in MATRICES}
+    metadata = {"source": os.path.abspath(data_dir), **(metadata or {})}
+    return save_problem(path, **vectors, **matrices, metadata=metadata)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert an LP directory (.npy / .mtx files) to a problem file.")
+    parser.add_argument("data_dir")
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+    checksum = convert_directory(args.data_dir, args.path)
+    print(f"Wrote {ProblemFile(args.path)} (checksum {checksum})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Solver telemetry: per-check records and callbacks, phase timers and an exportable trace.
+
+The solvers (``pdlp_gpu``, ``PDLPSolver``, ``SCSSolver``, ``linprog10``,
+``decentralized_pdhg``) take ``telemetry=Telemetry(...)``:
+
+- every convergence check appends a record (solver, iteration, residuals,
+  step sizes where the method has them, and seconds since the
+  ``Telemetry`` was created) to ``checks`` and hands it to ``callback``;
+- ``phase(name)`` times the solve phases ``transfer``, ``setup``,
+  ``spectral_norm`` (part of setup), ``iterations`` and ``checks`` (part of
+  iterations). On GPU the phases are bracketed by CUDA events, so timing
+  adds no host synchronization; the events are only resolved when the trace
+  is read. On CPU they use ``time.perf_counter``;
+- ``event`` keeps one-off messages (status, presolve, polishing);
+- ``trace()`` returns all of it as a dict, ``to_json`` / ``to_csv`` export it.
+
+With ``verbose=True`` checks and events are also printed, the progress
+output the solvers used to print unconditionally. Without telemetry the
+solvers use ``NO_TELEMETRY``: its ``enabled`` is False, and the loops only
+consult it at check points, so the iteration itself is untouched.
+"""
+import contextlib
+import csv
+import json
+import time
+
+# Shared no-op context of disabled phases
+_NULL_PHASE = contextlib.nullcontext()
+
+
+class Telemetry:
+    """Collects check records, phase timings and events of solver runs."""
+
+    enabled = True
+
+    def __init__(self, callback=None, verbose=False):
+        self.callback = callback
+        self.verbose = verbose
+        self.backend = None
+        self.checks = []
+        self.events = []
+        self._timings = []
+        self._start = time.perf_counter()
+
+    def bind(self, backend):
+        """Use ``backend`` for phase timing (device events on GPU); returns self."""
+        self.backend = backend
+        return self
+
+    def elapsed(self):
+        """Seconds since this ``Telemetry`` was created."""
+        return time.perf_counter() - self._start
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time the enclosed block as phase ``name``; repeated phases add up."""
+        if self.backend is not None and self.backend.is_gpu:
+            cuda = self.backend.xp.cuda
+            start, end = cuda.Event(), cuda.Event()
+            start.record()
+            try:
+                yield
+            finally:
+                end.record()
+                self._timings.append((name, start, end))
+        else:
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self._timings.append((name, start, time.perf_counter()))
+
+    def check(self, solver, iteration, **values):
+        """Record one convergence check and pass it to the callback."""
+        record = {"solver": solver, "iteration": int(iteration), "elapsed": self.elapsed(),
+                  **values}
+        self.checks.append(record)
+        if self.verbose:
+            print(f"{solver} itr {record['iteration']:6d}: " + ", ".join(
+                f"{key} {_format(value)}" for key, value in values.items()))
+        if self.callback is not None:
+            self.callback(record)
+
+    def event(self, solver, message, **values):
+        """Record a one-off message, such as the final status."""
+        self.events.append({"solver": solver, "message": message, "elapsed": self.elapsed(),
+                            **values})
+        if self.verbose:
+            print(message)
+
+    @property
+    def phases(self):
+        """Total seconds and count per phase (device time on GPU)."""
+        totals = {}
+        for name, start, end in self._timings:
+            if isinstance(start, float):
+                seconds = end - start
+            else:
+                end.synchronize()
+                seconds = self.backend.xp.cuda.get_elapsed_time(start, end) / 1000
+            entry = totals.setdefault(name, {"seconds": 0.0, "count": 0})
+            entry["seconds"] += seconds
+            entry["count"] += 1
+        return totals
+
+    def trace(self):
+        return {"phases": self.phases, "checks": list(self.checks), "events": list(self.events)}
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.trace(), f, indent=1, default=float)
+
+    def to_csv(self, path):
+        """Write the check records as CSV, one column per field seen in any record."""
+        fields = list(dict.fromkeys(key for record in self.checks for key in record))
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fields)
+            writer.writeheader()
+            writer.writerows(self.checks)
+
+
+class _DisabledTelemetry:
+    """Stand-in used when no telemetry is requested; every method is a no-op."""
+
+    enabled = False
+    verbose = False
+
+    def bind(self, backend):
+        return self
+
+    def phase(self, name):
+        return _NULL_PHASE
+
+    def check(self, solver, iteration, **values):
+        pass
+
+    def event(self, solver, message, **values):
+        pass
+
+
+NO_TELEMETRY = _DisabledTelemetry()
+
+
+def resolve(telemetry, backend):
+    """``telemetry`` bound to ``backend``, or ``NO_TELEMETRY`` for None."""
+    return NO_TELEMETRY if telemetry is None else telemetry.bind(backend)
+
+
+def _format(value):
+    if isinstance(value, float) or type(value).__name__.startswith("float"):
+        return f"{float(value):.2e}"
+    return str(value)
@@ -1,95 +1,120 @@
+import os
+import sys
 import numpy as np
 import scipy.linalg
 import scipy.optimize
-import cupy as cp
-import cupyx.scipy.sparse, cupyx.scipy.sparse.linalg
-import time
+import scipy.sparse
 
-def linprog10(c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, tolcheck=10, eps_pri=1e-6, eps_dual=1e-4, eps_gap=1e-4, eps_ubdd=1e-4, eps_infeas=1e-4, max_itr=100000, dtype=cp.float32):
-    #move data over to GPU. This really isn't fair to this method
-    start = time.time()
-    b = np.concatenate((b_eq, b_ub))
-    b_norm = np.linalg.norm(b)
-    c_norm = np.linalg.norm(c)
-    h = np.concatenate((c, b))
-    h = cp.asarray(h, dtype=dtype)
-    c = h[:c.shape[0]]
-    b = h[c.shape[0]:]
-    if type(A_ub) == np.ndarray and type(A_eq) == np.ndarray:
-        A_ub, A_eq = cp.asarray(A_ub, dtype=dtype), cp.asarray(A_eq, dtype=dtype)
-    elif scipy.sparse.issparse(A_ub) and scipy.sparse.issparse(A_eq):
-        A_ub, A_eq = cupyx.scipy.sparse.csr_matrix(A_ub, dtype=dtype), cupyx.scipy.sparse.csr_matrix(A_eq, dtype=dtype)
-    else:
-        assert False, "Matrix format not recognized"
-    print(f"Took {time.time() - start} seconds to move problem data to GPU")
-    apply_A_out = cp.empty(A_eq.shape[0] + A_ub.shape[0], dtype=dtype) #prevents an allocation when matmuling
-    def apply_A(x, out=apply_A_out):
-        out[:A_eq.shape[0]] = A_eq.dot(x)
-        out[A_eq.shape[0]:] = A_ub.dot(x)
-        return out
-    apply_At_out = cp.empty(c.shape[0], dtype=dtype) #prevent an allocation when matmuling
-    def apply_At(y, out=apply_At_out):
-        out[:] = A_eq.T.dot(y[:A_eq.shape[0]])
-        out[:] += A_ub.T.dot(y[A_eq.shape[0]:])
-        return out
-    def apply_IpAtA(x, out=apply_At_out):
-        apply_At(apply_A(x)) #populate apply_At_out
-        out[:] += x #add identity
-        return out
-    IpAtA = cupyx.scipy.sparse.linalg.LinearOperator((A_ub.shape[1], A_ub.shape[1]), matvec=apply_IpAtA)
-    Minvh = cp.empty(h.shape[0], dtype=dtype)
-    Minvh[:c.shape[0]], _ = cupyx.scipy.sparse.linalg.cg(IpAtA, h[:c.shape[0]] - apply_At(h[c.shape[0]:]))
-    Minvh[c.shape[0]:] = h[c.shape[0]:] + apply_A(Minvh[:c.shape[0]])
-    u = cp.zeros(h.shape[0]+1, dtype=dtype)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "development"))
+from utils.backend import get_backend
+from utils.bounds import bounds_to_rows
+from utils.telemetry import resolve
+from scs_implementation.src.linsys import DirectSolver, IndirectSolver
+
+def linprog10(c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, tolcheck=10, eps_pri=1e-6, eps_dual=1e-4, eps_gap=1e-4, eps_ubdd=1e-4, eps_infeas=1e-4, max_itr=100000, dtype=np.float32, backend=None, linsys="indirect", lb=None, ub=None, telemetry=None):
+    backend = get_backend(backend, c, A_ub, A_eq)
+    telemetry = resolve(telemetry, backend) #utils.telemetry.Telemetry: check records and phase timers
+    if lb is not None or ub is not None: #no box cone here: finite bounds become +-I rows of A_ub
+        A_ub, b_ub = bounds_to_rows(c.shape[0], lb, ub, backend.to_host(A_ub), backend.to_host(b_ub))
+    xp = backend.xp #numpy or cupy, depending on the selected backend
+    with telemetry.phase("transfer"):
+        #move data over to GPU. This really isn't fair to this method
+        b = np.concatenate((b_eq, b_ub))
+        b_norm = np.linalg.norm(b)
+        c_norm = np.linalg.norm(c)
+        h = np.concatenate((c, b))
+        h = xp.asarray(h, dtype=dtype)
+        c = h[:c.shape[0]]
+        b = h[c.shape[0]:]
+        if type(A_ub) == np.ndarray and type(A_eq) == np.ndarray:
+            A_ub, A_eq = backend.asarray(A_ub, dtype=dtype), backend.asarray(A_eq, dtype=dtype)
+        elif scipy.sparse.issparse(A_ub) and scipy.sparse.issparse(A_eq):
+            A_ub, A_eq = backend.csr_matrix(A_ub, dtype=dtype), backend.csr_matrix(A_eq, dtype=dtype)
+        else:
+            assert False, "Matrix format not recognized"
+    with telemetry.phase("setup"):
+        apply_A_out = xp.empty(A_eq.shape[0] + A_ub.shape[0], dtype=dtype) #prevents an allocation when matmuling
+        def apply_A(x, out=apply_A_out):
+            out[:A_eq.shape[0]] = A_eq.dot(x)
+            out[A_eq.shape[0]:] = A_ub.dot(x)
+            return out
+        apply_At_out = xp.empty(c.shape[0], dtype=dtype) #prevent an allocation when matmuling
+        def apply_At(y, out=apply_At_out):
+            out[:] = A_eq.T.dot(y[:A_eq.shape[0]])
+            out[:] += A_ub.T.dot(y[A_eq.shape[0]:])
+            return out
+        def column_sq_norms(M): #squared norm of every column of a block of A
+            if not backend.issparse(M):
+                return (M**2).sum(axis=0)
+            M = M.tocsr()
+            out = xp.zeros(M.shape[1], dtype=dtype)
+            backend.scatter_add(out, M.indices, M.data**2)
+            return out
+        if linsys == "direct": #factor the KKT matrix once; every solve is then two triangular solves
+            A = backend.sparse.vstack((A_eq, A_ub), format="csr") if backend.issparse(A_eq) else xp.concatenate((A_eq, A_ub))
+            solver = DirectSolver(A, backend)
+        else: #warm-started CG on I + A^T A, Jacobi preconditioned with 1 + ||A_j||^2, tolerance (itr + 1)^-1.5
+            solver = IndirectSolver(apply_A, apply_At, c.shape[0], diag=1 + column_sq_norms(A_eq) + column_sq_norms(A_ub),
+                                    min_tol=max(1e-8, 10*np.finfo(dtype).eps), backend=backend)
+        Minvh = solver.solve(h, warm_start=False) #fixed for the whole solve, so solved to min_tol
+    u = xp.zeros(h.shape[0]+1, dtype=dtype)
     #u[-1] = 1.0
-    v = cp.zeros(h.shape[0]+1, dtype=dtype)
+    v = xp.zeros(h.shape[0]+1, dtype=dtype)
     v[-1] = 1.0
-    utilde = cp.empty(h.shape[0]+1, dtype=dtype)
-    w = cp.empty(h.shape[0]+1, dtype=dtype) #prevent an allocation in the loop
-    rhs = cp.empty(h.shape[0], dtype=dtype) #prevent an allocation in the loop
-    vstep = cp.empty(h.shape[0]+1, dtype=dtype)
+    utilde = xp.zeros(h.shape[0]+1, dtype=dtype) #prevent an allocation in the loop
+    w = xp.empty(h.shape[0]+1, dtype=dtype) #prevent an allocation in the loop
+    rhs = xp.empty(h.shape[0], dtype=dtype) #prevent an allocation in the loop
+    vstep = xp.empty(h.shape[0]+1, dtype=dtype)
     itr=0
-    while itr < max_itr:
-        itr += 1
-        cp.add(u, v, out=w)
-        cp.add(w[:-1], cp.multiply(-1.0*w[-1], h, out=rhs), out=rhs)
-        utilde[:c.shape[0]], _ = cupyx.scipy.sparse.linalg.cg(IpAtA, rhs[:c.shape[0]] - apply_At(rhs[c.shape[0]:]))
-        utilde[c.shape[0]:-1] = rhs[c.shape[0]:] + apply_A(utilde[:c.shape[0]])
-        utilde[:-1] -= (h.T@utilde[:-1])/(1 + h.T @ Minvh)*Minvh
-        ###
-        utilde[-1] = w[-1] + h.T @ utilde[:-1] #this is the equation preceeding (28). I expressed it w/ h instead
-        u[:(A_eq.shape[1]+A_eq.shape[0])] = utilde[:(A_eq.shape[1]+A_eq.shape[0])] \
-                                            - v[:(A_eq.shape[1]+A_eq.shape[0])]
-        u[(A_eq.shape[1]+A_eq.shape[0]):] = cp.maximum(0,\
-                                             utilde[(A_eq.shape[1]+A_eq.shape[0]):] \
-                                                - v[(A_eq.shape[1]+A_eq.shape[0]):])
-        vstep[:] = u - utilde
-        v += vstep
-        #stopping condition check every tolcheck
-        if itr%tolcheck==0:
-            if u[-1] > 0: #we're optimal
-                x = u[:c.shape[0]]/u[-1]
-                s = v[c.shape[0]:c.shape[0]+b.shape[0]]/u[-1]
-                y = u[c.shape[0]:(c.shape[0]+b.shape[0])]/u[-1]
-                p_feas = cp.linalg.norm(apply_A(x) + s - b)/(1+b_norm)
-                d_feas = cp.linalg.norm(apply_At(y) + c)/(1+c_norm)
-                dual_gap = cp.abs(c.T@x + b.T@y)/(1 + cp.abs(c.T@x) + cp.abs(b.T@y))
-                print("| itr | primal_feas |  dual_feas  | primal/dual gap | ")
-                print(itr, p_feas, d_feas, dual_gap)
-                if p_feas < eps_pri and d_feas < eps_dual and dual_gap < eps_gap:
-                    print("We're optimal. Terminating...")
-                    break
-            unbdd_chk = cp.linalg.norm(apply_A(u[:c.shape[0]])\
-                + v[c.shape[0]:c.shape[0]+b.shape[0]]) \
-                    <= (-c.T@u[:c.shape[0]]/c_norm)*eps_ubdd
-            if unbdd_chk:
-                print("Problem is unbounded. Terminating...")
-                break
-            infeas_check = cp.linalg.norm(apply_At(u[c.shape[0]:c.shape[0]+b.shape[0]]))\
-                <= (-b.T@u[c.shape[0]:c.shape[0]+b.shape[0]]/b_norm)*eps_infeas
-            if infeas_check:
-                print("Problem is infeasible. Terminating...")
-                break
+    residual = np.inf #latest max(primal, dual) residual, tightens the CG tolerance
+    cg_its, cg_since = 0, 0 #CG iterations since the last check record, and the itr it started at
+    with telemetry.phase("iterations"):
+        while itr < max_itr:
+            itr += 1
+            xp.add(u, v, out=w)
+            xp.add(w[:-1], xp.multiply(-1.0*w[-1], h, out=rhs), out=rhs)
+            solver.set_accuracy(itr, residual)
+            utilde[:-1] = solver.solve(rhs)
+            cg_its += solver.last_iterations
+            utilde[:-1] -= (h.T@utilde[:-1])/(1 + h.T @ Minvh)*Minvh
+            ###
+            utilde[-1] = w[-1] + h.T @ utilde[:-1] #this is the equation preceeding (28). I expressed it w/ h instead
+            u[:(A_eq.shape[1]+A_eq.shape[0])] = utilde[:(A_eq.shape[1]+A_eq.shape[0])] \
+                                                - v[:(A_eq.shape[1]+A_eq.shape[0])]
+            u[(A_eq.shape[1]+A_eq.shape[0]):] = xp.maximum(0,\
+                                                 utilde[(A_eq.shape[1]+A_eq.shape[0]):] \
+                                                    - v[(A_eq.shape[1]+A_eq.shape[0]):])
+            vstep[:] = u - utilde
+            v += vstep
+            #stopping condition check every tolcheck
+            if itr%tolcheck==0:
+                with telemetry.phase("checks"):
+                    if u[-1] > 0: #we're optimal
+                        x = u[:c.shape[0]]/u[-1]
+                        s = v[c.shape[0]:c.shape[0]+b.shape[0]]/u[-1]
+                        y = u[c.shape[0]:(c.shape[0]+b.shape[0])]/u[-1]
+                        p_feas = xp.linalg.norm(apply_A(x) + s - b)/(1+b_norm)
+                        d_feas = xp.linalg.norm(apply_At(y) + c)/(1+c_norm)
+                        dual_gap = xp.abs(c.T@x + b.T@y)/(1 + xp.abs(c.T@x) + xp.abs(b.T@y))
+                        residual = float(max(p_feas, d_feas))
+                        if telemetry.enabled:
+                            cg = {"cg_iterations": cg_its/(itr - cg_since)} if linsys != "direct" else {}
+                            telemetry.check("linprog10", itr, primal_feas=float(p_feas), dual_feas=float(d_feas), dual_gap=float(dual_gap), **cg)
+                            cg_its, cg_since = 0, itr
+                        if p_feas < eps_pri and d_feas < eps_dual and dual_gap < eps_gap:
+                            telemetry.event("linprog10", "We're optimal. Terminating...")
+                            break
+                    unbdd_chk = xp.linalg.norm(apply_A(u[:c.shape[0]])\
+                        + v[c.shape[0]:c.shape[0]+b.shape[0]]) \
+                            <= (-c.T@u[:c.shape[0]]/c_norm)*eps_ubdd
+                    if unbdd_chk:
+                        telemetry.event("linprog10", "Problem is unbounded. Terminating...")
+                        break
+                    infeas_check = xp.linalg.norm(apply_At(u[c.shape[0]:c.shape[0]+b.shape[0]]))\
+                        <= (-b.T@u[c.shape[0]:c.shape[0]+b.shape[0]]/b_norm)*eps_infeas
+                    if infeas_check:
+                        telemetry.event("linprog10", "Problem is infeasible. Terminating...")
+                        break
     if itr == max_itr:
-        print("Iteration limit hit")
+        telemetry.event("linprog10", "Iteration limit hit")
     return u[:A_eq.shape[1]]/u[-1] #the x component of u. See (8)